@@ -1,58 +1,370 @@
-from langchain_openai import ChatOpenAI
-from langchain.schema import HumanMessage, SystemMessage, AIMessage
-from agent.prompts import SYSTEM_PROMPT, EXTRACTION_PROMPT
+from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
+from agent.prompts import SYSTEM_PROMPT, EXTRACTION_PROMPT, TOOL_SYSTEM_PROMPT
+from agent.filter_parser import FilterParser, ParseResult
+from agent.history import HistoryManager
+import asyncio
 import json
 import logging
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict, NamedTuple, Optional, Tuple
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+SEARCH_TOOL_NAME = "buscar_veiculos"
+
+# Tool no formato OpenAI: os argumentos são os filtros da API de busca
+SEARCH_TOOL = {
+    "type": "function",
+    "function": {
+        "name": SEARCH_TOOL_NAME,
+        "description": "Busca veículos no estoque com os filtros da ÚLTIMA intenção do cliente.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "marca": {"type": "string"},
+                "modelo": {"type": "string"},
+                "ano_min": {"type": "integer"},
+                "ano_max": {"type": "integer"},
+                "combustivel": {
+                    "type": "string",
+                    "enum": ["Gasolina", "Etanol", "Flex", "Diesel", "Elétrico", "Híbrido"],
+                },
+                "preco_min": {"type": "number"},
+                "preco_max": {"type": "number"},
+                "transmissao": {
+                    "type": "string",
+                    "enum": ["Manual", "Automática", "CVT", "Automatizada"],
+                },
+                "cor": {"type": "string"},
+                "quilometragem_max": {"type": "integer"},
+                "sort": {
+                    "type": "string",
+                    "enum": ["preco_asc", "preco_desc", "ano_desc", "quilometragem_asc", "relevancia"],
+                },
+            },
+        },
+    },
+}
+
+
+class AgentTurn(NamedTuple):
+    """Resultado de um turno: resposta ao usuário e filtros (None = não buscar)."""
+    reply: str
+    filters: Optional[Dict] = None
+
+    @property
+    def should_search(self) -> bool:
+        return self.filters is not None
+
+
+async def _resolved(value):
+    return value
+
 
 class VehicleAgent:
     """Agente conversacional para busca de veículos.
 
     Usa LangChain + OpenAI, extrair filtros de busca.
+
+    Com `tool_calling=True`, uma única chamada ao LLM devolve a resposta e,
+    se for hora de buscar, os filtros como argumentos da tool
+    `buscar_veiculos`. No modo padrão são duas chamadas: `chat` e depois
+    `extract_filters`, decididas pela heurística `should_search`.
+
+    `achat`, `achat_turn` e `aextract_filters` são as versões assíncronas
+    (`ainvoke`), para uso dentro do event loop sem bloqueá-lo.
     """
 
     # Filtros válidos aceitos pela API de busca
     VALID_FILTERS = {
         "marca", "modelo", "ano_min", "ano_max", "combustivel",
-        "preco_min", "preco_max", "transmissao", "cor", "quilometragem_max"
+        "preco_min", "preco_max", "transmissao", "cor", "quilometragem_max", "sort"
     }
 
-    def __init__(self, api_key: str):
-        self.llm = ChatOpenAI(
+    # Frases que indicam busca já no meio da resposta (ver SYSTEM_PROMPT)
+    SEARCH_PHRASES = [
+        "vou buscar", "vou procurar", "vou encontrar",
+        "deixa eu buscar", "deixa eu procurar",
+        "irei buscar", "irei procurar",
+        "vamos buscar", "vamos procurar"
+    ]
+
+    def __init__(self, api_key: str, tool_calling: bool = False, llm=None,
+                 fast_extraction: bool = True, catalog: Optional[Dict[str, List[str]]] = None,
+                 history: Optional[HistoryManager] = None):
+        # `llm` permite injetar outro chat model (ex.: fake nos testes)
+        self.llm = llm or self._openai_llm(api_key)
+        self.tool_calling = tool_calling
+        system_prompt = TOOL_SYSTEM_PROMPT if tool_calling else SYSTEM_PROMPT
+        self.conversation_history: List = [SystemMessage(content=system_prompt)]
+        self._tool_llm = self.llm.bind_tools([SEARCH_TOOL]) if tool_calling else None
+        # Extrator por regras tentado antes do LLM (catalog: marca → modelos)
+        self.filter_parser = FilterParser(catalog) if fast_extraction else None
+        # Orçamento de tokens do histórico enviado ao LLM
+        self.history = history or HistoryManager()
+        # Filtros do turno atual de `chat_stream` (None = sem busca até agora)
+        self.pending_filters: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _openai_llm(api_key: str):
+        """Cliente OpenAI; o langchain_openai (~1 s de import) só carrega aqui."""
+        if not api_key:
+            raise ValueError(
+                "OPENAI_API_KEY não configurada!\n"
+                "Adicione no arquivo .env ou como variável de ambiente."
+            )
+        from langchain_openai import ChatOpenAI
+
+        return ChatOpenAI(
             model="gpt-4o-mini",
             temperature=0.7,
             api_key=api_key
         )
-        self.conversation_history: List = [SystemMessage(content=SYSTEM_PROMPT)]
 
     def chat(self, user_message: str) -> str:
         """Processa mensagem e retorna resposta do agente."""
-        if not user_message or not user_message.strip():
-            raise ValueError("Mensagem do usuário não pode estar vazia")
-
+        self._start_turn(user_message)
         try:
-            self.conversation_history.append(HumanMessage(content=user_message))
             response = self.llm.invoke(self.conversation_history)
-            self.conversation_history.append(AIMessage(content=response.content))
-            return response.content
-
-        except Exception as e:
+        except Exception:
             # Reverte histórico se deu erro
-            if self.conversation_history and isinstance(self.conversation_history[-1], HumanMessage):
-                self.conversation_history.pop()
+            self.conversation_history.pop()
+            raise
+        self._finish_turn(response.content)
+        return response.content
+
+    async def achat(self, user_message: str) -> str:
+        """Versão assíncrona de `chat` (`ainvoke`, sem bloquear o event loop)."""
+        self._start_turn(user_message)
+        try:
+            response = await self.llm.ainvoke(list(self.conversation_history))
+        except BaseException:
+            self.conversation_history.pop()
+            raise
+        self._finish_turn(response.content)
+        return response.content
+
+    def chat_turn(self, user_message: str) -> AgentTurn:
+        """Processa um turno completo: resposta e, se for buscar, os filtros.
+
+        No modo tool calling é uma única chamada ao LLM; no modo padrão,
+        `chat` + `should_search` + `extract_filters`.
+        """
+        if not self.tool_calling:
+            reply = self.chat(user_message)
+            filters = self.extract_filters() if self.should_search(reply) else None
+            return AgentTurn(reply, filters)
+
+        self._start_turn(user_message)
+        try:
+            response = self._tool_llm.invoke(self.conversation_history)
+        except Exception:
+            self.conversation_history.pop()
+            raise
+
+        reply, filters, wants_search = self._parse_tool_response(response)
+        # Só o texto vai para o histórico: a tool call não tem ToolMessage de retorno
+        self._finish_turn(reply)
+
+        if filters is None and wants_search:
+            # Argumentos malformados: cai para a extração em chamada separada
+            filters = self.extract_filters()
+        else:
+            self.history.update_search_state(filters)
+        return AgentTurn(reply, filters)
+
+    async def achat_turn(self, user_message: str) -> AgentTurn:
+        """Versão assíncrona de `chat_turn`.
+
+        No modo padrão, quando o extrator por regras já vê filtros na
+        mensagem do usuário, a extração roda junto com a resposta
+        (especulativa): o turno de busca leva o tempo da chamada mais
+        lenta, não a soma das duas. Se a resposta não levar a uma busca, a
+        extração é cancelada. Sem filtros na mensagem (ex.: saudação), a
+        extração só acontece depois da resposta, com ela no histórico.
+        """
+        self._start_turn(user_message)
+        history = list(self.conversation_history)
+        extraction = None
+        if not self.tool_calling:
+            parsed = self._parse_last_user(history)
+            if parsed is not None and parsed.filters:
+                extraction = asyncio.create_task(self._aextract(history))
+        try:
+            llm = self._tool_llm if self.tool_calling else self.llm
+            response = await llm.ainvoke(history)
+        except BaseException:
+            self.conversation_history.pop()
+            if extraction is not None:
+                extraction.cancel()
+            raise
+
+        if not self.tool_calling:
+            reply = response.content
+            self._finish_turn(reply)
+            if not self.should_search(reply):
+                if extraction is not None:
+                    extraction.cancel()
+                return AgentTurn(reply, None)
+            if extraction is None:
+                return AgentTurn(reply, await self.aextract_filters())
+            filters = await extraction
+            self.history.update_search_state(filters)
+            return AgentTurn(reply, filters)
+
+        reply, filters, wants_search = self._parse_tool_response(response)
+        self._finish_turn(reply)
+        if filters is None and wants_search:
+            filters = await self.aextract_filters()
+        else:
+            self.history.update_search_state(filters)
+        return AgentTurn(reply, filters)
+
+    async def chat_stream(self, user_message: str) -> AsyncIterator[str]:
+        """Como `chat_turn`, mas devolve o texto da resposta conforme o LLM gera.
+
+        Quando o turno leva a uma busca, `pending_filters` recebe uma task
+        com os filtros. No modo padrão ela começa assim que uma frase de
+        busca ("Vou buscar...") aparece no stream, antes do fim da
+        resposta; no modo tool calling, ao fim do stream. A mensagem
+        completa entra no histórico no final.
+        """
+        self._start_turn(user_message)
+        self.pending_filters = None
+        llm = self._tool_llm if self.tool_calling else self.llm
+        response = None
+        try:
+            async for chunk in llm.astream(list(self.conversation_history)):
+                response = chunk if response is None else response + chunk
+                if not chunk.content:
+                    continue
+                if not self.tool_calling and self.pending_filters is None \
+                        and self.search_intent(response.content):
+                    self.pending_filters = asyncio.create_task(self.aextract_filters())
+                yield chunk.content
+        except BaseException:
+            self.conversation_history.pop()
+            if self.pending_filters is not None:
+                self.pending_filters.cancel()
+                self.pending_filters = None
             raise
 
+        response = response or AIMessage(content="")
+        if self.tool_calling:
+            reply, filters, wants_search = self._parse_tool_response(response)
+            if reply != response.content:
+                yield reply[len(response.content):]
+            if filters is not None:
+                self.history.update_search_state(filters)
+                self.pending_filters = asyncio.create_task(_resolved(filters))
+            elif wants_search:
+                self.pending_filters = asyncio.create_task(self.aextract_filters())
+        else:
+            reply = response.content
+            if self.pending_filters is None and self.should_search(reply):
+                self.pending_filters = asyncio.create_task(self.aextract_filters())
+
+        self._finish_turn(reply)
+
+    def _start_turn(self, user_message: str) -> None:
+        if not user_message or not user_message.strip():
+            raise ValueError("Mensagem do usuário não pode estar vazia")
+        self.conversation_history.append(HumanMessage(content=user_message))
+
+    def _finish_turn(self, reply: str) -> None:
+        self.conversation_history.append(AIMessage(content=reply))
+        self.history.compact(self.conversation_history)
+
+    def _parse_tool_response(self, response) -> Tuple[str, Optional[Dict], bool]:
+        """(resposta, filtros da tool call, se o LLM quis buscar)."""
+        filters = next(
+            (self._clean_filters(call["args"]) for call in response.tool_calls
+             if call["name"] == SEARCH_TOOL_NAME),
+            None
+        )
+        invalid = getattr(response, "invalid_tool_calls", None)
+        if filters is None and invalid:
+            logger.warning(f"Tool call inválida do LLM: {invalid[0].get('error')}")
+        wants_search = filters is not None or bool(invalid)
+        reply = response.content or ("Vou buscar veículos. Um momento..." if wants_search else "")
+        return reply, filters, wants_search
+
+    def _clean_filters(self, filters: Dict) -> Dict:
+        """Remove filtros desconhecidos e valores vazios."""
+        return {
+            k: v for k, v in filters.items()
+            if k in self.VALID_FILTERS and v not in (None, "")
+        }
+
     def extract_filters(self) -> Dict:
         """Extrai filtros da conversa (marca, modelo, preço, etc).
 
-        Retorna dict vazio se o LLM não retornar JSON válido.
+        Mensagens simples ("Corolla 2020 até 80k") são resolvidas pelo
+        extrator por regras, sem chamada ao LLM. Retorna dict vazio se o
+        LLM não retornar JSON válido.
         """
+        history = list(self.conversation_history)
+        filters = self._fast_filters(history)
+        if filters is None:
+            filters = self._extract_filters_llm(history)
+        self.history.update_search_state(filters)
+        return filters
+
+    async def aextract_filters(self) -> Dict:
+        """Versão assíncrona de `extract_filters` (`ainvoke`)."""
+        # Cópia: `chat_stream` roda a extração enquanto o stream continua
+        filters = await self._aextract(list(self.conversation_history))
+        self.history.update_search_state(filters)
+        return filters
+
+    async def _aextract(self, history: List) -> Dict:
+        filters = self._fast_filters(history)
+        if filters is None:
+            filters = await self._aextract_filters_llm(history)
+        return filters
+
+    def _parse_last_user(self, history: List) -> Optional[ParseResult]:
+        """Resultado do extrator por regras para a última mensagem do usuário."""
+        if not self.filter_parser:
+            return None
+        last_user = next(
+            (msg for msg in reversed(history) if isinstance(msg, HumanMessage)),
+            None
+        )
+        if last_user is None:
+            return None
+        return self.filter_parser.parse(last_user.content)
+
+    def _fast_filters(self, history: List) -> Optional[Dict]:
+        """Filtros do extrator por regras, ou None se a confiança for baixa."""
+        result = self._parse_last_user(history)
+        if result is None:
+            return None
+        if result.confidence >= self.filter_parser.min_confidence:
+            logger.debug(f"Filtros extraídos por regras (confiança {result.confidence:.2f})")
+            return result.filters
+        logger.debug(f"Confiança baixa ({result.confidence:.2f}), usando LLM: {result.unknown}")
+        return None
+
+    def _extract_filters_llm(self, history: List) -> Dict:
+        """Extração pelo LLM com o EXTRACTION_PROMPT e as últimas 6 mensagens."""
+        try:
+            response = self.llm.invoke(self._extraction_messages(history))
+            return self._parse_extraction(response.content)
+        except Exception:
+            return {}
+
+    async def _aextract_filters_llm(self, history: List) -> Dict:
+        try:
+            response = await self.llm.ainvoke(self._extraction_messages(history))
+            return self._parse_extraction(response.content)
+        except Exception:
+            return {}
+
+    @staticmethod
+    def _extraction_messages(history: List) -> List:
         recent_messages = [
-            msg for msg in self.conversation_history
+            msg for msg in history
             if not isinstance(msg, SystemMessage)
         ][-6:]
 
@@ -62,43 +374,40 @@ class VehicleAgent:
         ])
 
         prompt = EXTRACTION_PROMPT.format(conversation=conversation_text)
+        return [HumanMessage(content=prompt)]
 
-        try:
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-
-            # Remove markdown code fence se existir
-            content = response.content.strip()
-            if content.startswith("```"):
+    def _parse_extraction(self, content: str) -> Dict:
+        """JSON da resposta de extração; dict vazio se inválido."""
+        # Remove markdown code fence se existir
+        content = content.strip()
+        if content.startswith("```"):
 
-                content = content.split("\n", 1)[1]
-                content = content.rsplit("\n```", 1)[0]
-                content = content.strip()
+            content = content.split("\n", 1)[1]
+            content = content.rsplit("\n```", 1)[0]
+            content = content.strip()
 
+        try:
             filters = json.loads(content)
+        except json.JSONDecodeError:
+            return {}
 
-            # Remove filtros inválidos
-            invalid_keys = set(filters.keys()) - self.VALID_FILTERS
-            if invalid_keys:
-                filters = {k: v for k, v in filters.items() if k in self.VALID_FILTERS}
+        # Remove filtros inválidos
+        invalid_keys = set(filters.keys()) - self.VALID_FILTERS
+        if invalid_keys:
+            filters = {k: v for k, v in filters.items() if k in self.VALID_FILTERS}
 
-            return filters
+        return filters
 
-        except json.JSONDecodeError:
-            return {}
-        except Exception:
-            return {}
+    def search_intent(self, partial_response: str) -> bool:
+        """Frase explícita de busca no texto, mesmo incompleto (ex.: durante o stream)."""
+        response_lower = partial_response.lower()
+        return any(phrase in response_lower for phrase in self.SEARCH_PHRASES)
 
     def should_search(self, agent_response: str) -> bool:
         """Detecta se agente quer executar busca (baseado em keywords)."""
         response_lower = agent_response.lower()
-        search_phrases = [
-            "vou buscar", "vou procurar", "vou encontrar",
-            "deixa eu buscar", "deixa eu procurar",
-            "irei buscar", "irei procurar",
-            "vamos buscar", "vamos procurar"
-        ]
-
-        if any(phrase in response_lower for phrase in search_phrases):
+
+        if self.search_intent(agent_response):
             return True
 
         keywords = ["buscar", "procurar", "encontrar", "mostrar veículos", "mostrar carros"]
@@ -0,0 +1,290 @@
+"""Extração de filtros por regras, sem LLM, para mensagens simples.
+
+Aplica localmente as regras do EXTRACTION_PROMPT (modelo → marca, "80 mil"
+/ "80k" como preço máximo, "50 mil km" como quilometragem máxima, ano único
+vira mínimo e máximo, enums de combustível e câmbio). Cada trecho reconhecido é consumido do texto; as
+palavras que sobram (fora de uma lista de palavras neutras) baixam a
+confiança. O agente só usa o resultado acima de `min_confidence` e cai
+para o LLM nos demais casos.
+"""
+import re
+import unicodedata
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from app.catalog import CORES, MODELOS
+
+# Apelidos comuns de marca (texto normalizado → marca do catálogo)
+BRAND_ALIASES = {
+    "vw": "Volkswagen", "volks": "Volkswagen",
+    "chevy": "Chevrolet", "gm": "Chevrolet",
+    "mercedes": "Mercedes-Benz", "benz": "Mercedes-Benz",
+}
+
+FUELS = {
+    r"flex": "Flex",
+    r"gasolina": "Gasolina",
+    r"(?:etanol|alcool)": "Etanol",
+    r"diesel": "Diesel",
+    r"eletric[oa]s?": "Elétrico",
+    r"hibrid[oa]s?": "Híbrido",
+}
+
+TRANSMISSIONS = {
+    r"manual": "Manual",
+    r"automatic[oa]s?": "Automática",
+    r"cvt": "CVT",
+    r"automatizad[oa]s?": "Automatizada",
+}
+
+SORTS = {
+    r"(?:mais barat[oa]s?|menor preco)": "preco_asc",
+    r"(?:mais car[oa]s?|maior preco)": "preco_desc",
+    r"(?:mais nov[oa]s?|mais recentes?)": "ano_desc",
+    r"(?:menos rodad[oa]s?|menor (?:km|quilometragem))": "quilometragem_asc",
+    r"(?:melhor )?custo[\s-]?beneficio": "relevancia",
+}
+
+# Palavras que não mudam os filtros
+STOPWORDS = frozenset("""
+    quero queria gostaria procuro procurando busco buscando buscar procurar
+    preciso precisando tem teria tenho voces voce vc algum alguma alguns algumas
+    um uma uns umas o a os as de do da dos das com e em no na nos nas para pra
+    por me mostra mostre mostrar ver veja carro carros veiculo veiculos modelo
+    ano cambio combustivel preco reais valor opcoes opcao oi ola bom boa dia
+    tarde noite favor qualquer disponivel disponiveis estoque ai agora
+    entao quanto quais qual
+""".split())
+
+# Palavras que tornam a intenção dependente de contexto ou negativa
+BLOCKERS = frozenset("""
+    nao sem exceto outro outra outros outras mesmo mesma esse essa esses essas
+    desse dessa ou tambem anterior parecido parecida similar
+""".split())
+
+MIN_CONFIDENCE = 0.8
+# Sem marca/modelo, a mensagem pode estar refinando a busca anterior
+NO_VEHICLE_CONFIDENCE = 0.5
+
+# Grupos: "r$" (se houver), número, unidade ("mil"/"k")
+_AMOUNT = r"(?:\b(r\$)\s*)?\b(\d+(?:[.,]\d+)*)(?:\s*(mil|k))?\b"
+_MIN_QUALIFIERS = r"a partir de|acima de|mais de|minimo de|no minimo|pelo menos|maior que"
+_MAX_QUALIFIERS = r"ate|abaixo de|menos de|no maximo|maximo de|maximo|menor que|por"
+_SINGLE = re.compile(
+    rf"(?:\b({_MIN_QUALIFIERS}|{_MAX_QUALIFIERS})\s+)?{_AMOUNT}"
+    r"(?:\s+(em diante|pra cima|para cima|ou mais))?"
+)
+_RANGE = re.compile(rf"(?:\b(?:entre|de)\s+)?{_AMOUNT}\s+(?:e|a|ate)\s+{_AMOUNT}")
+_MILEAGE = re.compile(
+    rf"(?:\b({_MIN_QUALIFIERS}|{_MAX_QUALIFIERS})\s+)?"
+    r"\b(\d+(?:[.,]\d+)*)(?:\s*(mil|k))?\s*(?:km|quilometros?)\b(?:\s+rodados?)?"
+)
+_MIN_RE = re.compile(rf"^(?:{_MIN_QUALIFIERS})$")
+_WORD = re.compile(r"[a-z0-9]+")
+_YEARS = range(1950, 2036)
+
+
+class ParseResult(NamedTuple):
+    filters: Dict
+    confidence: float
+    unknown: Tuple[str, ...] = ()
+
+
+def normalize(text: str) -> str:
+    """Minúsculas e sem acentos."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def _name_pattern(name: str) -> str:
+    """Nome do catálogo como regex: "HR-V" casa "hr-v", "hr v" e "hrv"."""
+    parts = re.split(r"[\s-]+", normalize(name))
+    return r"[\s-]?".join(re.escape(p) for p in parts)
+
+
+def _name_key(text: str) -> str:
+    return re.sub(r"[\s-]+", "", text)
+
+
+def _alternation(names) -> re.Pattern:
+    patterns = sorted((_name_pattern(n) for n in names), key=len, reverse=True)
+    return re.compile(r"\b(?:" + "|".join(patterns) + r")\b")
+
+
+def _number(raw: str) -> float:
+    if re.fullmatch(r"\d{1,3}(?:\.\d{3})+(?:,\d+)?", raw):
+        raw = raw.replace(".", "").replace(",", ".")
+    return float(raw.replace(",", "."))
+
+
+def _amount(raw: str, unit: Optional[str], currency: bool) -> Optional[Tuple[str, float]]:
+    """Classifica um número como ("preco", valor) ou ("ano", valor)."""
+    try:
+        value = _number(raw)
+    except ValueError:
+        return None
+    if unit:
+        return "preco", value * 1000
+    if not currency and value.is_integer() and int(value) in _YEARS:
+        return "ano", value
+    if currency or value >= 5000:
+        return "preco", value
+    return None
+
+
+def _year_like(raw: str, unit: Optional[str]) -> bool:
+    """"2022" sem "mil"/"k": num intervalo, não herda o "R$" do outro número."""
+    return not unit and re.fullmatch(r"\d{4}", raw) is not None and int(raw) in _YEARS
+
+
+def _clean(value: float):
+    return int(value) if float(value).is_integer() else value
+
+
+class _Text:
+    """Texto normalizado do qual os trechos reconhecidos vão sendo removidos."""
+
+    def __init__(self, text: str):
+        self.text = normalize(text)
+        self.recognized = 0
+
+    def consume(self, match: re.Match) -> None:
+        start, end = match.span()
+        self.recognized += len(_WORD.findall(match.group(0)))
+        self.text = self.text[:start] + " " * (end - start) + self.text[end:]
+
+    def take(self, pattern) -> List[re.Match]:
+        matches = list(re.finditer(pattern, self.text))
+        for match in matches:
+            self.consume(match)
+        return matches
+
+
+class FilterParser:
+    """Extrator de filtros por regras, sem chamada ao LLM.
+
+    `catalog` segue o formato de `MODELOS` (marca → modelos); em produção
+    vem do banco via `app.catalog.load_model_brands`.
+    """
+
+    def __init__(self, catalog: Optional[Dict[str, List[str]]] = None,
+                 min_confidence: float = MIN_CONFIDENCE):
+        catalog = catalog or MODELOS
+        self.min_confidence = min_confidence
+
+        self._models = {}
+        for marca, modelos in catalog.items():
+            for modelo in modelos:
+                self._models.setdefault(_name_key(normalize(modelo)), (marca, modelo))
+        self._brands = {_name_key(normalize(marca)): marca for marca in catalog}
+        self._brands.update(BRAND_ALIASES)
+        self._colors = {normalize(cor): cor for cor in CORES}
+
+        self._model_re = _alternation(m for _, m in self._models.values())
+        self._brand_re = _alternation(list(catalog) + list(BRAND_ALIASES))
+        self._color_re = re.compile(r"\b(" + "|".join(self._colors) + r")s?\b")
+
+    def parse(self, message: str) -> ParseResult:
+        """Extrai filtros de uma mensagem e estima a confiança (0 a 1)."""
+        text = _Text(message)
+        filters: Dict = {}
+        conflicts = []
+
+        def put(key, value):
+            if key in filters and filters[key] != value:
+                conflicts.append(key)
+            filters[key] = value
+
+        for match in text.take(self._model_re):
+            marca, modelo = self._models[_name_key(match.group(0))]
+            put("marca", marca)
+            put("modelo", modelo)
+        for match in text.take(self._brand_re):
+            put("marca", self._brands[_name_key(match.group(0))])
+
+        for pattern, sort in SORTS.items():
+            if text.take(rf"\b{pattern}\b"):
+                put("sort", sort)
+
+        # Antes dos preços: "50 mil km" é quilometragem, não teto de preço
+        mileage_ok = self._parse_mileage(text, put)
+        self._parse_ranges(text, put)
+        self._parse_amounts(text, put)
+
+        for pattern, fuel in FUELS.items():
+            if text.take(rf"\b(?:a )?{pattern}\b"):
+                put("combustivel", fuel)
+        for pattern, transmission in TRANSMISSIONS.items():
+            if text.take(rf"\b{pattern}\b"):
+                put("transmissao", transmission)
+        for match in text.take(self._color_re):
+            put("cor", self._colors[match.group(1)])
+
+        words = _WORD.findall(text.text)
+        unknown = tuple(w for w in words if w not in STOPWORDS)
+        if conflicts or not filters or not mileage_ok or any(w in BLOCKERS for w in unknown):
+            return ParseResult(filters, 0.0, unknown)
+
+        confidence = text.recognized / (text.recognized + len(unknown))
+        if "marca" not in filters:
+            confidence = min(confidence, NO_VEHICLE_CONFIDENCE)
+        return ParseResult(filters, confidence, unknown)
+
+    @staticmethod
+    def _parse_mileage(text: _Text, put) -> bool:
+        """"menos de 50 mil km": quilometragem máxima.
+
+        Retorna False para mínimos ("mais de 100 mil km"), que a busca não
+        aceita: o trecho sai do texto (não vira preço) e a mensagem vai ao LLM.
+        """
+        supported = True
+        for match in list(_MILEAGE.finditer(text.text)):
+            qualifier, raw, unit = match.groups()
+            value = _number(raw) * (1000 if unit else 1)
+            text.consume(match)
+            if qualifier and _MIN_RE.match(qualifier):
+                supported = False
+            else:
+                put("quilometragem_max", _clean(value))
+        return supported
+
+    @staticmethod
+    def _parse_ranges(text: _Text, put) -> None:
+        """"2018 a 2022", "entre 50 e 80 mil": o segundo número empresta a unidade."""
+        for match in list(_RANGE.finditer(text.text)):
+            low_cur, low_raw, low_unit, high_cur, high_raw, high_unit = match.groups()
+            # "50 a 80 mil" empresta o "mil"; "2020 até 80k" não
+            borrowed = high_unit if _number(low_raw) < 1000 else None
+            low_unit = low_unit or borrowed
+            # O "R$" vale para o próprio número e só é emprestado por quem não parece ano:
+            # em "2022 até R$ 150.000" o 2022 continua sendo ano
+            low_currency = bool(low_cur) or (bool(high_cur) and not _year_like(low_raw, low_unit))
+            high_currency = bool(high_cur) or (bool(low_cur) and not _year_like(high_raw, high_unit))
+            low = _amount(low_raw, low_unit, low_currency)
+            high = _amount(high_raw, high_unit, high_currency)
+            if not low or not high or low[0] != high[0]:
+                continue
+            kind = low[0]
+            text.consume(match)
+            put(f"{kind}_min", _clean(min(low[1], high[1])))
+            put(f"{kind}_max", _clean(max(low[1], high[1])))
+
+    @staticmethod
+    def _parse_amounts(text: _Text, put) -> None:
+        """Números soltos: ano (mínimo e máximo) ou preço (máximo por padrão)."""
+        for match in list(_SINGLE.finditer(text.text)):
+            qualifier, currency, raw, unit, suffix = match.groups()
+            amount = _amount(raw, unit, bool(currency))
+            if amount is None:
+                continue
+            kind, value = amount
+            value = _clean(value)
+            is_min = bool(suffix) or bool(qualifier and _MIN_RE.match(qualifier))
+            text.consume(match)
+
+            if kind == "ano":
+                if is_min or not qualifier:
+                    put("ano_min", value)
+                if not is_min:
+                    put("ano_max", value)
+            else:
+                put("preco_min" if is_min else "preco_max", value)
@@ -0,0 +1,110 @@
+"""Histórico da conversa com orçamento de tokens.
+
+O histórico completo ia ao LLM em toda chamada, então prompt, latência e
+memória cresciam a cada turno. `HistoryManager.compact` mantém sempre o
+SystemMessage e os últimos `keep_turns` turnos; quando o total passa de
+`max_tokens`, os turnos mais antigos são dobrados num resumo compacto
+(pedidos recentes do cliente + estado atual da busca), sem chamada extra
+ao LLM.
+"""
+import logging
+from typing import Callable, Dict, List, Optional, Sequence
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_HEADER = "RESUMO DA CONVERSA ANTERIOR (turnos antigos omitidos):"
+# Pedidos antigos do cliente guardados no resumo (os mais recentes)
+SUMMARY_MAX_REQUESTS = 5
+SUMMARY_REQUEST_CHARS = 120
+# Overhead aproximado por mensagem no formato de chat da OpenAI
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def approx_tokens(messages: Sequence[BaseMessage]) -> int:
+    """Estimativa de tokens (~4 caracteres por token), sem tokenizer."""
+    return sum(len(msg.content) // 4 + MESSAGE_OVERHEAD_TOKENS for msg in messages)
+
+
+def _is_summary(message: BaseMessage) -> bool:
+    return isinstance(message, SystemMessage) and message.content.startswith(SUMMARY_HEADER)
+
+
+def _split_turns(messages: Sequence[BaseMessage]) -> List[List[BaseMessage]]:
+    """Agrupa mensagens em turnos, cada um começando numa HumanMessage."""
+    turns: List[List[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+class HistoryManager:
+    """Mantém o histórico dentro de um orçamento de tokens."""
+
+    def __init__(self, max_tokens: int = 2000, keep_turns: int = 4,
+                 count_tokens: Callable[[Sequence[BaseMessage]], int] = approx_tokens):
+        if keep_turns < 1:
+            raise ValueError("keep_turns deve ser maior que 0")
+        self.max_tokens = max_tokens
+        self.keep_turns = keep_turns
+        self.count_tokens = count_tokens
+        self.search_state: Optional[Dict] = None
+        self._requests: List[str] = []
+
+    def update_search_state(self, filters: Optional[Dict]) -> None:
+        """Registra os filtros da última busca (entram no resumo)."""
+        if filters is not None:
+            self.search_state = dict(filters)
+
+    def compact(self, history: List[BaseMessage]) -> List[BaseMessage]:
+        """Dobra turnos antigos no resumo até caber no orçamento.
+
+        Altera e retorna a própria lista. Enquanto não houver resumo e o
+        orçamento não estourar, o histórico fica intacto.
+        """
+        system, rest = history[0], history[1:]
+        has_summary = bool(rest) and _is_summary(rest[0])
+        if has_summary:
+            rest = rest[1:]
+        elif self.count_tokens(history) <= self.max_tokens:
+            return history
+
+        turns = _split_turns(rest)
+        folded = 0
+        while len(turns) > self.keep_turns and self.count_tokens(self._build(system, turns)) > self.max_tokens:
+            self._fold(turns.pop(0))
+            folded += 1
+
+        history[:] = self._build(system, turns)
+        if folded:
+            logger.debug(f"Histórico compactado: {folded} turno(s) no resumo, "
+                         f"~{self.count_tokens(history)} tokens")
+        return history
+
+    def summary(self) -> Optional[SystemMessage]:
+        """Mensagem de resumo com pedidos antigos e estado da busca."""
+        if not self._requests and self.search_state is None:
+            return None
+        lines = [SUMMARY_HEADER]
+        if self._requests:
+            lines.append("- Pedidos anteriores do cliente: " + "; ".join(f'"{r}"' for r in self._requests))
+        if self.search_state is not None:
+            state = ", ".join(f"{k}={v}" for k, v in self.search_state.items()) or "sem filtros"
+            lines.append(f"- Última busca realizada: {state}")
+        return SystemMessage(content="\n".join(lines))
+
+    def _fold(self, turn: List[BaseMessage]) -> None:
+        for message in turn:
+            if isinstance(message, HumanMessage):
+                self._requests.append(message.content[:SUMMARY_REQUEST_CHARS])
+        del self._requests[:-SUMMARY_MAX_REQUESTS]
+
+    def _build(self, system: BaseMessage, turns: List[List[BaseMessage]]) -> List[BaseMessage]:
+        summary = self.summary()
+        messages = [system] + ([summary] if summary else [])
+        for turn in turns:
+            messages.extend(turn)
+        return messages
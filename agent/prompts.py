@@ -17,9 +17,10 @@ REGRAS CRÍTICAS:
 Seja amigável, prestativo e objetivo. Não use menus ou formulários rígidos."""
 
 
-EXTRACTION_PROMPT = """Você é um extrator de filtros de busca de veículos. Analise APENAS a ÚLTIMA intenção de busca do usuário.
-
-MAPEAMENTO MODELO → MARCA (use sempre):
+# Regras de extração compartilhadas pelo EXTRACTION_PROMPT (modo de duas
+# chamadas) e pelo TOOL_SYSTEM_PROMPT (chamada única com tool calling).
+# Chaves duplicadas porque o texto passa por str.format().
+FILTER_RULES = """MAPEAMENTO MODELO → MARCA (use sempre):
 - Gol, Polo, Virtus, T-Cross, Tiguan, Jetta → Volkswagen
 - Corolla, Hilux, Etios, Yaris, Camry, RAV4 → Toyota
 - Civic, HR-V, City, Fit, Accord, CR-V → Honda
@@ -50,7 +51,14 @@ REGRAS DE EXTRAÇÃO:
    - "2018 a 2022" → {{"ano_min": 2018, "ano_max": 2022}}
    - Se NÃO mencionado, NÃO inclua ano
 
-4. **NOVA BUSCA**: Se usuário perguntar sobre outro veículo, IGNORE filtros anteriores
+4. **ORDENAÇÃO**: Só se o usuário pedir explicitamente
+   - "mais barato" → {{"sort": "preco_asc"}}
+   - "mais caro" → {{"sort": "preco_desc"}}
+   - "mais novo" → {{"sort": "ano_desc"}}
+   - "menos rodado" / "menor km" → {{"sort": "quilometragem_asc"}}
+   - "melhor custo-benefício" → {{"sort": "relevancia"}}
+
+5. **NOVA BUSCA**: Se usuário perguntar sobre outro veículo, IGNORE filtros anteriores
    - Primeira: "Corolla 2024" → Depois: "tem Mobi?" → USE APENAS Mobi (sem ano)
 
 FILTROS DISPONÍVEIS:
@@ -62,6 +70,12 @@ FILTROS DISPONÍVEIS:
 - preco_min (float) - RARO, só se explícito
 - preco_max (float) - padrão para números
 - transmissao (string: "Manual", "Automática", "CVT", "Automatizada")
+- sort (string: "preco_asc", "preco_desc", "ano_desc", "quilometragem_asc", "relevancia")"""
+
+
+EXTRACTION_PROMPT = """Você é um extrator de filtros de busca de veículos. Analise APENAS a ÚLTIMA intenção de busca do usuário.
+
+""" + FILTER_RULES + """
 
 IMPORTANTE:
 - Retorne APENAS JSON válido
@@ -71,3 +85,13 @@ IMPORTANTE:
 Conversa: {conversation}
 
 JSON:"""
+
+
+TOOL_SYSTEM_PROMPT = SYSTEM_PROMPT + """
+
+FERRAMENTA DE BUSCA:
+- Quando for buscar, chame a ferramenta buscar_veiculos NA MESMA resposta em que diz "Vou buscar [descrição]. Um momento..."
+- Se ainda for perguntar algo ao cliente, NÃO chame a ferramenta
+- Os argumentos da ferramenta seguem as regras abaixo, considerando APENAS a ÚLTIMA intenção de busca
+
+""" + FILTER_RULES.format()
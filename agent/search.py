@@ -0,0 +1,143 @@
+"""Execução da busca decidida pelo agente (compartilhada pelo terminal e pelo serviço).
+
+A busca usa /search/relaxed: se nada casar com os filtros exatos, o
+servidor relaxa ano, preço e enums na mesma requisição e informa o que
+mudou, que vira um aviso para o usuário.
+
+Busca especulativa: no início do turno o extrator por regras prevê os
+filtros a partir da mensagem do usuário e a busca no MCP já começa,
+em paralelo com a resposta do LLM. Se os filtros finais do agente forem
+os mesmos, `run_search` usa o resultado adiantado; se não, ele é
+descartado e a busca normal é feita.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from agent.filter_parser import FilterParser
+from app.views.vehicle_view import VehicleView
+from mcp_client.client import MCPClient
+
+logger = logging.getLogger(__name__)
+
+# Abaixo disso a previsão erra demais para valer uma busca extra
+SPECULATION_MIN_CONFIDENCE = 0.5
+
+
+class Speculation:
+    """Busca iniciada com os filtros previstos, antes de o agente decidir."""
+
+    def __init__(self, owner: "SpeculativeSearch", filters: Dict):
+        self.owner = owner
+        self.filters = filters
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.task = asyncio.create_task(self._search())
+
+    async def _search(self) -> Dict:
+        response = await self.owner.mcp_client.search_vehicles_relaxed(dict(self.filters))
+        self.finished = time.perf_counter()
+        return response
+
+    async def take(self, filters: Dict) -> Optional[Dict]:
+        """Resposta adiantada se `filters` for igual ao previsto; senão None."""
+        if filters != self.filters:
+            self.owner.misses += 1
+            self._cancel()
+            return None
+
+        ready = time.perf_counter()
+        try:
+            response = await self.task
+        except Exception as e:
+            logger.warning(f"Busca especulativa falhou, refazendo: {e}")
+            self.owner.misses += 1
+            return None
+
+        # Sem especulação a busca começaria agora e levaria o mesmo tempo
+        saved = min(self.finished - self.started, ready - self.started)
+        self.owner.hits += 1
+        self.owner.saved_ms += saved * 1000
+        logger.debug(f"Busca especulativa aproveitada (~{saved * 1000:.0f} ms economizados)")
+        return response
+
+    def discard(self) -> None:
+        """Turno terminou sem busca: a especulação foi desperdiçada."""
+        self.owner.discarded += 1
+        self._cancel()
+
+    def _cancel(self) -> None:
+        if self.task.done():
+            if not self.task.cancelled():
+                self.task.exception()  # evita "exception was never retrieved"
+        else:
+            self.task.cancel()
+
+
+class SpeculativeSearch:
+    """Inicia buscas especulativas e acumula as métricas de acerto."""
+
+    def __init__(self, mcp_client: MCPClient, parser: Optional[FilterParser] = None,
+                 min_confidence: float = SPECULATION_MIN_CONFIDENCE):
+        self.mcp_client = mcp_client
+        self.parser = parser or FilterParser()
+        self.min_confidence = min_confidence
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+        self.saved_ms = 0.0
+
+    def start(self, message: str, parser: Optional[FilterParser] = None) -> Optional[Speculation]:
+        """Prevê os filtros da mensagem e começa a busca; None se a previsão for fraca.
+
+        `parser` permite usar o extrator do agente (catálogo do banco).
+        """
+        result = (parser or self.parser).parse(message)
+        if not result.filters or result.confidence < self.min_confidence:
+            return None
+        return Speculation(self, result.filters)
+
+    def stats(self) -> Dict[str, Any]:
+        decided = self.hits + self.misses
+        return {
+            "speculative_searches": decided + self.discarded,
+            "hits": self.hits,
+            "misses": self.misses,
+            "discarded": self.discarded,
+            "hit_rate": round(self.hits / decided, 3) if decided else None,
+            "saved_ms_total": round(self.saved_ms, 1),
+            "saved_ms_per_hit": round(self.saved_ms / self.hits, 1) if self.hits else None,
+        }
+
+
+async def run_search(mcp_client: MCPClient, pending_filters: asyncio.Task,
+                     speculation: Optional[Speculation] = None) -> Tuple[List[Dict], Dict, List[str]]:
+    """Aguarda os filtros do agente e busca; retorna (veículos, filtros, avisos).
+
+    Com `speculation`, o resultado adiantado é usado se os filtros baterem.
+    """
+    try:
+        filters = await pending_filters
+    except BaseException:
+        if speculation is not None:
+            speculation.discard()
+        raise
+    notices = []
+
+    response = await speculation.take(filters) if speculation is not None else None
+    if response is None:
+        response = await mcp_client.search_vehicles_relaxed(filters)
+    vehicles = response["results"]
+    logger.info(f"Encontrados {len(vehicles)} veículos")
+
+    if response["relaxed"]:
+        for relaxation in response["relaxed"]:
+            for key, value in relaxation["relaxed"].items():
+                if value is None:
+                    filters.pop(key, None)
+                else:
+                    filters[key] = value
+        notices.append(VehicleView.format_relaxation(response["relaxed"]))
+
+    return vehicles, filters, notices
@@ -0,0 +1,9 @@
+from pydantic import BaseModel, Field
+
+
+class ChatMessageRequest(BaseModel):
+    message: str = Field(min_length=1, max_length=2000)
+
+
+class SessionCreated(BaseModel):
+    session_id: str
@@ -0,0 +1,275 @@
+"""Serviço de conversa multi-sessão sobre o VehicleAgent (WebSocket e SSE).
+
+Cada sessão tem o próprio VehicleAgent (histórico), guardado num registro
+com despejo LRU e por ociosidade. Turnos de uma mesma sessão são
+serializados e o número de turnos usando o LLM ao mesmo tempo é limitado
+por um semáforo; as buscas vão ao servidor MCP por um único MCPClient
+com pool de conexões. Com `speculative_search`, a busca com os filtros
+previstos da mensagem começa antes da resposta do LLM (métricas de acerto
+em /stats).
+
+Uso:
+    uvicorn agent_server.server:app --port 8001
+
+Eventos (JSON, um por mensagem WebSocket ou `data:` do SSE):
+    {"type": "token", "content": "..."}
+    {"type": "results", "filters": {...}, "notices": [...], "vehicles": [...], "text": "..."}
+    {"type": "error", "detail": "..."}
+    {"type": "done"}
+"""
+import asyncio
+import json
+import logging
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from fastapi import FastAPI, HTTPException, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from agent.agent import VehicleAgent
+from agent.history import HistoryManager
+from agent.search import SpeculativeSearch, run_search
+from agent_server.schemas import ChatMessageRequest, SessionCreated
+from agent_server.sessions import SessionRegistry
+from app.config import (
+    AGENT_FAST_EXTRACTION, AGENT_HISTORY_KEEP_TURNS, AGENT_HISTORY_MAX_TOKENS,
+    AGENT_MAX_CONCURRENT_LLM, AGENT_MAX_SESSIONS, AGENT_SESSION_IDLE_TIMEOUT,
+    AGENT_SPECULATIVE_SEARCH, AGENT_TOOL_CALLING, MCP_SERVER_PORT, OPENAI_API_KEY
+)
+from app.views.vehicle_view import VehicleView
+from mcp_client.client import MCPClient
+
+logger = logging.getLogger(__name__)
+
+SESSION_NOT_FOUND = "Sessão não encontrada"
+# Código de fechamento do WebSocket para sessão inexistente (faixa 4000-4999 é da aplicação)
+SESSION_NOT_FOUND_CLOSE = 4404
+
+
+class DefaultAgentFactory:
+    """Agentes configurados pelo .env; o chat model e o catálogo são compartilhados.
+
+    `prepare` consulta o catálogo no banco; o app a chama numa thread ao
+    subir (`asyncio.to_thread`), para a consulta não bloquear o event loop.
+    """
+
+    def __init__(self):
+        self.llm = None
+        self.catalog: Optional[Dict[str, List[str]]] = None
+        self.prepared = False
+
+    def prepare(self) -> None:
+        if self.prepared:
+            return
+        from app.catalog import load_model_brands
+        from app.database import ReadSessionLocal
+        db = ReadSessionLocal()
+        try:
+            self.catalog = load_model_brands(db) or None
+        finally:
+            db.close()
+        self.prepared = True
+
+    def __call__(self) -> VehicleAgent:
+        # Fora do app (sem lifespan) o catálogo ainda carrega no primeiro agente
+        self.prepare()
+        agent = VehicleAgent(
+            api_key=OPENAI_API_KEY,
+            tool_calling=AGENT_TOOL_CALLING,
+            llm=self.llm,
+            fast_extraction=AGENT_FAST_EXTRACTION,
+            catalog=self.catalog,
+            history=HistoryManager(AGENT_HISTORY_MAX_TOKENS, AGENT_HISTORY_KEEP_TURNS)
+        )
+        if self.llm is None:
+            self.llm = agent.llm
+        return agent
+
+
+class AgentService:
+    """Sessões, limite de concorrência do LLM e execução dos turnos."""
+
+    def __init__(self, agent_factory: Callable[[], VehicleAgent], mcp_client: MCPClient,
+                 max_sessions: int = 1000, idle_timeout: float = 1800.0,
+                 max_concurrent_llm: int = 32, speculative_search: bool = False):
+        self.registry = SessionRegistry(agent_factory, max_sessions, idle_timeout)
+        self.mcp_client = mcp_client
+        self.speculator = SpeculativeSearch(mcp_client) if speculative_search else None
+        self.max_concurrent_llm = max_concurrent_llm
+        self.active_llm_turns = 0
+        self.peak_llm_turns = 0
+        self._llm_slots = asyncio.Semaphore(max_concurrent_llm)
+
+    async def prepare(self) -> None:
+        """Carrega o que a fábrica de agentes precisa (ex.: catálogo) fora do event loop."""
+        prepare = getattr(self.registry.agent_factory, "prepare", None)
+        if prepare is not None:
+            await asyncio.to_thread(prepare)
+
+    @asynccontextmanager
+    async def _llm_slot(self):
+        async with self._llm_slots:
+            self.active_llm_turns += 1
+            self.peak_llm_turns = max(self.peak_llm_turns, self.active_llm_turns)
+            try:
+                yield
+            finally:
+                self.active_llm_turns -= 1
+
+    async def turn(self, session_id: str, message: str) -> AsyncIterator[Dict[str, Any]]:
+        """Executa um turno da sessão e produz os eventos (tokens, resultados, fim)."""
+        session = None
+        search_task: Optional[asyncio.Task] = None
+        speculation = None
+        try:
+            # Criar a sessão pode falhar (ex.: OPENAI_API_KEY ausente): vira evento de erro
+            session = self.registry.get(session_id)
+            async with session.lock:
+                agent = session.agent
+                if self.speculator is not None and message.strip():
+                    speculation = self.speculator.start(message, agent.filter_parser)
+                async with self._llm_slot():
+                    async for token in agent.chat_stream(message):
+                        yield {"type": "token", "content": token}
+                        if search_task is None and agent.pending_filters is not None:
+                            search_task = asyncio.create_task(
+                                run_search(self.mcp_client, agent.pending_filters, speculation)
+                            )
+                    if search_task is None and agent.pending_filters is not None:
+                        search_task = asyncio.create_task(
+                            run_search(self.mcp_client, agent.pending_filters, speculation)
+                        )
+                    if search_task is not None:
+                        # A extração de filtros ainda pode estar usando o LLM
+                        await asyncio.wait([agent.pending_filters])
+
+                if search_task is not None:
+                    vehicles, filters, notices = await search_task
+                    yield {
+                        "type": "results",
+                        "filters": filters,
+                        "notices": notices,
+                        "vehicles": vehicles,
+                        "text": VehicleView.format_results(vehicles, sort=filters.get("sort")),
+                    }
+        except ValueError as e:
+            yield {"type": "error", "detail": str(e)}
+        except Exception as e:
+            logger.error(f"Erro no turno da sessão {session_id}: {e}", exc_info=True)
+            yield {"type": "error", "detail": "Erro ao processar a mensagem"}
+        finally:
+            if search_task is not None and not search_task.done():
+                search_task.cancel()
+            elif search_task is None and speculation is not None:
+                speculation.discard()
+            if session is not None:
+                session.turns += 1
+                self.registry.touch(session)
+        yield {"type": "done"}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.registry.stats(),
+            "max_concurrent_llm": self.max_concurrent_llm,
+            "active_llm_turns": self.active_llm_turns,
+            "peak_llm_turns": self.peak_llm_turns,
+            "speculation": self.speculator.stats() if self.speculator else None,
+        }
+
+
+def _sse(event: Dict[str, Any]) -> str:
+    return f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+def create_app(service: AgentService) -> FastAPI:
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await service.prepare()
+        yield
+        await service.mcp_client.aclose()
+
+    app = FastAPI(title="Vehicle Agent Service", lifespan=lifespan)
+    app.state.service = service
+
+    @app.post("/sessions", response_model=SessionCreated, status_code=201)
+    async def create_session():
+        session_id = uuid.uuid4().hex
+        service.registry.get(session_id)
+        return {"session_id": session_id}
+
+    @app.delete("/sessions/{session_id}", status_code=204)
+    async def delete_session(session_id: str):
+        if not service.registry.remove(session_id):
+            raise HTTPException(status_code=404, detail=SESSION_NOT_FOUND)
+        return Response(status_code=204)
+
+    @app.post("/sessions/{session_id}/messages")
+    async def send_message(session_id: str, request: ChatMessageRequest):
+        """Turno via SSE: um evento `data:` por token e os resultados no fim.
+
+        A sessão precisa existir (POST /sessions): id desconhecido, expirado
+        ou despejado responde 404, em vez de recomeçar a conversa sem aviso.
+        """
+        if session_id not in service.registry:
+            raise HTTPException(status_code=404, detail=SESSION_NOT_FOUND)
+
+        async def events():
+            async for event in service.turn(session_id, request.message):
+                yield _sse(event)
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.websocket("/sessions/{session_id}/ws")
+    async def chat_websocket(websocket: WebSocket, session_id: str):
+        """Conversa via WebSocket: recebe {"message": "..."} e envia os eventos do turno.
+
+        Sessão desconhecida recusa a conexão; se ela expirar no meio da
+        conversa, o servidor envia um evento de erro e fecha com o código 4404.
+        """
+        if session_id not in service.registry:
+            await websocket.close(code=SESSION_NOT_FOUND_CLOSE)
+            return
+        await websocket.accept()
+        try:
+            while True:
+                payload = await websocket.receive_json()
+                message = payload.get("message", "") if isinstance(payload, dict) else ""
+                if session_id not in service.registry:
+                    await websocket.send_json({"type": "error", "detail": SESSION_NOT_FOUND})
+                    await websocket.close(code=SESSION_NOT_FOUND_CLOSE)
+                    return
+                async for event in service.turn(session_id, message):
+                    await websocket.send_json(event)
+        except WebSocketDisconnect:
+            logger.debug(f"WebSocket da sessão {session_id} desconectado")
+
+    @app.get("/stats")
+    async def stats():
+        return service.stats()
+
+    @app.get("/health")
+    async def health_check():
+        return {"status": "healthy"}
+
+    return app
+
+
+service = AgentService(
+    agent_factory=DefaultAgentFactory(),
+    mcp_client=MCPClient(
+        server_url=f"http://localhost:{MCP_SERVER_PORT}",
+        max_connections=max(10, AGENT_MAX_CONCURRENT_LLM)
+    ),
+    max_sessions=AGENT_MAX_SESSIONS,
+    idle_timeout=AGENT_SESSION_IDLE_TIMEOUT,
+    max_concurrent_llm=AGENT_MAX_CONCURRENT_LLM,
+    speculative_search=AGENT_SPECULATIVE_SEARCH
+)
+app = create_app(service)
+
+
+if __name__ == "__main__":
+    import uvicorn
+    from app.config import MCP_SERVER_HOST, AGENT_SERVER_PORT
+    uvicorn.run(app, host=MCP_SERVER_HOST, port=AGENT_SERVER_PORT)
@@ -0,0 +1,125 @@
+"""Registro de sessões de conversa: um VehicleAgent por sessão, com despejo LRU e por ociosidade."""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from agent.agent import VehicleAgent
+
+logger = logging.getLogger(__name__)
+
+
+class AgentSession:
+    """Agente de uma sessão e o lock que serializa os turnos dela."""
+
+    def __init__(self, session_id: str, agent: VehicleAgent):
+        self.session_id = session_id
+        self.agent = agent
+        self.lock = asyncio.Lock()
+        self.last_active = time.monotonic()
+        self.turns = 0
+
+    def touch(self) -> None:
+        self.last_active = time.monotonic()
+
+
+class SessionRegistry:
+    """Sessões ativas em ordem de uso (a menos recente primeiro).
+
+    Memória limitada por `max_sessions` (despejo LRU) e sessões paradas há
+    mais de `idle_timeout` segundos são descartadas. Uma sessão despejada
+    recomeça do zero na próxima mensagem.
+    """
+
+    def __init__(self, agent_factory: Callable[[], VehicleAgent],
+                 max_sessions: int = 1000, idle_timeout: float = 1800.0):
+        if max_sessions < 1:
+            raise ValueError("max_sessions deve ser maior que 0")
+        self.agent_factory = agent_factory
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.created = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._sessions: "OrderedDict[str, AgentSession]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def get(self, session_id: str) -> AgentSession:
+        """Retorna a sessão (criando se preciso) e a marca como usada."""
+        self.expire_idle()
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = AgentSession(session_id, self.agent_factory())
+            self._sessions[session_id] = session
+            self.created += 1
+            self._evict()
+        else:
+            self._sessions.move_to_end(session_id)
+        session.touch()
+        return session
+
+    def touch(self, session: AgentSession) -> None:
+        """Marca uso da sessão e a move para o fim: a ordem do registro é
+        sempre a de `last_active`, da qual `expire_idle` depende."""
+        session.touch()
+        if self._sessions.get(session.session_id) is session:
+            self._sessions.move_to_end(session.session_id)
+
+    def remove(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def expire_idle(self, now: Optional[float] = None) -> int:
+        """Remove sessões ociosas, da menos recente em diante.
+
+        `get` e `touch` mantêm o registro em ordem de `last_active`, então a
+        varredura para na primeira sessão ainda ativa. Sessões com turno em
+        andamento (lock tomado) ficam.
+        """
+        now = time.monotonic() if now is None else now
+        idle = []
+        for session_id, session in self._sessions.items():
+            if now - session.last_active <= self.idle_timeout:
+                break
+            if not session.lock.locked():
+                idle.append(session_id)
+        for session_id in idle:
+            del self._sessions[session_id]
+        self.expirations += len(idle)
+        return len(idle)
+
+    def _evict(self) -> None:
+        """Despeja as menos recentes acima de `max_sessions`, exceto as com turno em andamento.
+
+        Se todas as mais antigas estiverem ocupadas, o registro passa do
+        limite até os turnos terminarem.
+        """
+        excess = len(self._sessions) - self.max_sessions
+        if excess <= 0:
+            return
+        newest = next(reversed(self._sessions))
+        evicted = []
+        for session_id, session in self._sessions.items():
+            if len(evicted) == excess:
+                break
+            if session_id != newest and not session.lock.locked():
+                evicted.append(session_id)
+        for session_id in evicted:
+            del self._sessions[session_id]
+            logger.info(f"Sessão {session_id} despejada (limite de {self.max_sessions})")
+        self.evictions += len(evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "idle_timeout": self.idle_timeout,
+            "created": self.created,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,39 @@
+"""Catálogo de marcas, modelos e atributos usados pelo seed e pelo agente."""
+from collections import defaultdict
+from typing import TYPE_CHECKING, Dict, List
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
+MARCAS = ["Toyota", "Honda", "Ford", "Chevrolet", "Volkswagen", "Fiat",
+          "Hyundai", "Nissan", "Renault", "Jeep", "BMW", "Mercedes-Benz"]
+
+MODELOS = {
+    "Toyota": ["Corolla", "Hilux", "Etios", "Yaris", "Camry", "RAV4"],
+    "Honda": ["Civic", "HR-V", "City", "Fit", "Accord", "CR-V"],
+    "Ford": ["Ka", "Ranger", "EcoSport", "Fusion", "Focus", "Edge"],
+    "Chevrolet": ["Onix", "S10", "Tracker", "Cruze", "Spin", "Trailblazer"],
+    "Volkswagen": ["Gol", "Polo", "Virtus", "T-Cross", "Tiguan", "Jetta"],
+    "Fiat": ["Uno", "Argo", "Toro", "Mobi", "Pulse", "Strada"],
+    "Hyundai": ["HB20", "Creta", "Tucson", "i30", "Santa Fe", "Azera"],
+    "Nissan": ["Kicks", "Versa", "Frontier", "Sentra", "March", "Leaf"],
+    "Renault": ["Kwid", "Sandero", "Duster", "Captur", "Oroch", "Fluence"],
+    "Jeep": ["Renegade", "Compass", "Commander", "Wrangler", "Grand Cherokee"],
+    "BMW": ["320i", "X1", "X3", "X5", "M3", "530i"],
+    "Mercedes-Benz": ["C180", "GLA", "GLC", "A200", "E250", "S500"]
+}
+
+CORES = ["Branco", "Preto", "Prata", "Vermelho", "Azul", "Cinza", "Verde", "Dourado", "Marrom"]
+MOTORIZACOES = ["1.0", "1.4", "1.6", "1.8", "2.0", "2.4", "3.0", "3.5"]
+
+
+def load_model_brands(db: "Session") -> Dict[str, List[str]]:
+    """Marcas e modelos presentes no estoque, no mesmo formato de `MODELOS`."""
+    # Import local: o extrator de filtros usa as constantes sem carregar o SQLAlchemy
+    from sqlalchemy import select
+    from app.models.vehicle import Vehicle
+
+    catalog = defaultdict(list)
+    for marca, modelo in db.execute(select(Vehicle.marca, Vehicle.modelo).distinct()):
+        catalog[marca].append(modelo)
+    return dict(catalog)
@@ -4,15 +4,51 @@ from dotenv import load_dotenv
 load_dotenv()
 
 DB_PATH = os.getenv("DB_PATH", "vehicles.db")
+# Threads para queries síncronas chamadas de handlers async (0 = inline)
+DB_THREAD_POOL_SIZE = int(os.getenv("DB_THREAD_POOL_SIZE", "8"))
+# PRAGMAs do SQLite por perfil (ver app.database.STORAGE_PROFILES):
+# "default", "read_heavy" ou "bulk_load"
+DB_STORAGE_PROFILE = os.getenv("DB_STORAGE_PROFILE", "default")
+# Conexões do pool só de leitura usado pelas buscas
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "8"))
 
 MCP_SERVER_HOST = os.getenv("MCP_SERVER_HOST", "0.0.0.0")
 MCP_SERVER_PORT = int(os.getenv("MCP_SERVER_PORT", "8000"))
+# Terminal (main.py): "asgi" chama o app do servidor MCP no próprio processo;
+# "http" sobe o uvicorn numa thread e conversa por TCP
+MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "asgi")
+# Espera máxima (segundos) pelo /health do servidor no modo "http"
+MCP_STARTUP_TIMEOUT = float(os.getenv("MCP_STARTUP_TIMEOUT", "30"))
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+# Motor de busca: "sql" (query SQLAlchemy) ou "columnar" (índice em memória)
+SEARCH_ENGINE = os.getenv("SEARCH_ENGINE", "sql")
+# Idade máxima (segundos) do índice colunar antes de recarregar; 0 = só por escrita
+SEARCH_INDEX_MAX_AGE = float(os.getenv("SEARCH_INDEX_MAX_AGE", "0"))
+
+# Cache de resultados do /search (0 entradas desliga o cache)
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "1024"))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "300"))
+# Respostas de busca montadas de tuplas de colunas e codificadas com orjson,
+# sem validação Pydantic por linha (mesmo JSON)
+SEARCH_FAST_SERIALIZATION = os.getenv("SEARCH_FAST_SERIALIZATION", "false").lower() in ("1", "true", "yes")
 
+# Agente: uma chamada ao LLM por turno (tool calling) em vez de chat + extração
+AGENT_TOOL_CALLING = os.getenv("AGENT_TOOL_CALLING", "false").lower() in ("1", "true", "yes")
+# Extrai filtros de mensagens simples por regras, sem chamar o LLM
+AGENT_FAST_EXTRACTION = os.getenv("AGENT_FAST_EXTRACTION", "true").lower() in ("1", "true", "yes")
+# Orçamento (tokens estimados) do histórico enviado ao LLM e turnos sempre mantidos
+AGENT_HISTORY_MAX_TOKENS = int(os.getenv("AGENT_HISTORY_MAX_TOKENS", "2000"))
+AGENT_HISTORY_KEEP_TURNS = int(os.getenv("AGENT_HISTORY_KEEP_TURNS", "4"))
+# Começa a busca com filtros previstos da mensagem enquanto o LLM responde
+AGENT_SPECULATIVE_SEARCH = os.getenv("AGENT_SPECULATIVE_SEARCH", "false").lower() in ("1", "true", "yes")
 
-if not OPENAI_API_KEY:
-    raise ValueError(
-        "OPENAI_API_KEY não configurada!\n"
-        "Adicione no arquivo .env ou como variável de ambiente."
-    )
+# Serviço de conversa multi-sessão (agent_server)
+AGENT_SERVER_PORT = int(os.getenv("AGENT_SERVER_PORT", "8001"))
+AGENT_MAX_SESSIONS = int(os.getenv("AGENT_MAX_SESSIONS", "1000"))
+AGENT_SESSION_IDLE_TIMEOUT = float(os.getenv("AGENT_SESSION_IDLE_TIMEOUT", "1800"))
+# Turnos usando o LLM ao mesmo tempo (os demais aguardam na fila)
+AGENT_MAX_CONCURRENT_LLM = int(os.getenv("AGENT_MAX_CONCURRENT_LLM", "32"))
+
+# Só é exigida quando o agente cria o cliente OpenAI (ver VehicleAgent);
+# servidor MCP, scripts e testes sobem sem ela
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
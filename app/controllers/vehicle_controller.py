@@ -1,7 +1,14 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Query, Session
 from app.models.vehicle import Vehicle
-from typing import Optional, List
+from app.config import SEARCH_ENGINE, SEARCH_INDEX_MAX_AGE
+from app.database import run_db
+from app.index.text import text_conditions
+from app.ranking import RELEVANCE, SORT_COLUMNS, relevance_score, validate_sort
+from typing import Any, Dict, Iterator, Optional, List, Sequence, Tuple
+import heapq
 import logging
+import sys
 
 logger = logging.getLogger(__name__)
 
@@ -9,6 +16,111 @@ logger = logging.getLogger(__name__)
 class VehicleController:
     """Controller para operações de busca de veículos."""
 
+    DEFAULT_LIMIT = 10
+    MAX_LIMIT = 100
+    # Anos aceitos: MIN_YEAR..CURRENT_YEAR + 1
+    MIN_YEAR = 1900
+    CURRENT_YEAR = 2026
+
+    @staticmethod
+    def clamp_limit(limit: int) -> int:
+        """Aplica o limite padrão (<= 0) e o teto de resultados (> 100)."""
+        if limit <= 0:
+            logger.warning(f"Limit inválido: {limit}. Usando padrão 10.")
+            return VehicleController.DEFAULT_LIMIT
+        if limit > VehicleController.MAX_LIMIT:
+            logger.warning(f"Limit muito alto: {limit}. Limitando a 100.")
+            return VehicleController.MAX_LIMIT
+        return limit
+
+    @staticmethod
+    def ordered_range(name: str, low, high) -> Tuple:
+        """Corrige ranges invertidos (min > max) trocando os valores."""
+        if low is not None and high is not None and low > high:
+            logger.warning(f"{name}_min ({low}) > {name}_max ({high}). Corrigindo automaticamente.")
+            return high, low
+        return low, high
+
+    @staticmethod
+    def validate_ranges(
+        ano_min: Optional[int] = None,
+        ano_max: Optional[int] = None,
+        preco_min: Optional[float] = None,
+        preco_max: Optional[float] = None
+    ) -> Tuple[Optional[int], Optional[int], Optional[float], Optional[float]]:
+        """Corrige ranges invertidos e valida anos e preços.
+
+        Returns:
+            (ano_min, ano_max, preco_min, preco_max) já corrigidos
+
+        Raises:
+            ValueError: Se ano fora de 1900..ano atual+1 ou preço negativo
+        """
+        ano_min, ano_max = VehicleController.ordered_range("ano", ano_min, ano_max)
+        preco_min, preco_max = VehicleController.ordered_range("preco", preco_min, preco_max)
+
+        # Validação de anos (não pode ser negativo ou muito futuro)
+        min_year = VehicleController.MIN_YEAR
+        current_year = VehicleController.CURRENT_YEAR
+        if ano_min is not None and (ano_min < min_year or ano_min > current_year + 1):
+            logger.warning(f"ano_min fora do range válido: {ano_min}")
+            raise ValueError(f"ano_min deve estar entre {min_year} e {current_year + 1}")
+
+        if ano_max is not None and (ano_max < min_year or ano_max > current_year + 1):
+            logger.warning(f"ano_max fora do range válido: {ano_max}")
+            raise ValueError(f"ano_max deve estar entre {min_year} e {current_year + 1}")
+
+        # Validação de preços (não pode ser negativo)
+        if preco_min is not None and preco_min < 0:
+            logger.warning(f"preco_min negativo: {preco_min}")
+            raise ValueError("preco_min não pode ser negativo")
+
+        if preco_max is not None and preco_max < 0:
+            logger.warning(f"preco_max negativo: {preco_max}")
+            raise ValueError("preco_max não pode ser negativo")
+
+        return ano_min, ano_max, preco_min, preco_max
+
+    @staticmethod
+    def build_query(
+        db: Session,
+        marca: Optional[str] = None,
+        modelo: Optional[str] = None,
+        ano_min: Optional[int] = None,
+        ano_max: Optional[int] = None,
+        combustivel: Optional[str] = None,
+        preco_min: Optional[float] = None,
+        preco_max: Optional[float] = None,
+        transmissao: Optional[str] = None
+    ) -> Query:
+        """Monta a query filtrada (sem limit nem ordenação).
+
+        Espera filtros já validados por `validate_ranges`.
+        """
+        query = db.query(Vehicle)
+
+        # Índice de texto (se existir) troca a varredura do ilike por busca
+        # no índice de marca/modelo; o ilike abaixo continua valendo.
+        for condition in text_conditions(db, marca=marca, modelo=modelo):
+            query = query.filter(condition)
+        if marca:
+            query = query.filter(Vehicle.marca.ilike(f"%{marca}%"))
+        if modelo:
+            query = query.filter(Vehicle.modelo.ilike(f"%{modelo}%"))
+        if ano_min:
+            query = query.filter(Vehicle.ano >= ano_min)
+        if ano_max:
+            query = query.filter(Vehicle.ano <= ano_max)
+        if combustivel:
+            query = query.filter(Vehicle.combustivel == combustivel)
+        if preco_min:
+            query = query.filter(Vehicle.preco >= preco_min)
+        if preco_max:
+            query = query.filter(Vehicle.preco <= preco_max)
+        if transmissao:
+            query = query.filter(Vehicle.transmissao == transmissao)
+        return query
+
     @staticmethod
     def search_vehicles(
         db: Session,
@@ -20,7 +132,9 @@ class VehicleController:
         preco_min: Optional[float] = None,
         preco_max: Optional[float] = None,
         transmissao: Optional[str] = None,
-        limit: int = 10
+        limit: int = 10,
+        sort: Optional[str] = None,
+        columns: Optional[Sequence] = None
     ) -> List[Vehicle]:
         """Busca veículos no banco de dados com filtros estruturados.
 
@@ -35,6 +149,9 @@ class VehicleController:
             preco_max: Preço máximo (inclusivo)
             transmissao: Tipo de transmissão (exato)
             limit: Número máximo de resultados (padrão: 10, máx: 100)
+            sort: Ordenação (ver `app.ranking.SORT_OPTIONS`); None = ordem do banco
+            columns: Colunas a selecionar (ex: `Vehicle.id, Vehicle.marca`);
+                com elas o retorno são tuplas (Row), sem objetos ORM
 
         Returns:
             Lista de veículos que correspondem aos filtros
@@ -45,41 +162,12 @@ class VehicleController:
         Nota: Se usuário fornecer min > max (ex: ano_min=2020, ano_max=2015),
         os valores são automaticamente corrigidos (swapped). Ver CHANGELOG.
         """
-        # Validação de limit
-        if limit <= 0:
-            logger.warning(f"Limit inválido: {limit}. Usando padrão 10.")
-            limit = 10
-        if limit > 100:
-            logger.warning(f"Limit muito alto: {limit}. Limitando a 100.")
-            limit = 100
-
-        # Validação e correção de ranges
-        if ano_min is not None and ano_max is not None and ano_min > ano_max:
-            logger.warning(f"ano_min ({ano_min}) > ano_max ({ano_max}). Corrigindo automaticamente.")
-            ano_min, ano_max = ano_max, ano_min
-
-        if preco_min is not None and preco_max is not None and preco_min > preco_max:
-            logger.warning(f"preco_min ({preco_min}) > preco_max ({preco_max}). Corrigindo automaticamente.")
-            preco_min, preco_max = preco_max, preco_min
-
-        # Validação de anos (não pode ser negativo ou muito futuro)
-        current_year = 2026
-        if ano_min is not None and (ano_min < 1900 or ano_min > current_year + 1):
-            logger.warning(f"ano_min fora do range válido: {ano_min}")
-            raise ValueError(f"ano_min deve estar entre 1900 e {current_year + 1}")
-
-        if ano_max is not None and (ano_max < 1900 or ano_max > current_year + 1):
-            logger.warning(f"ano_max fora do range válido: {ano_max}")
-            raise ValueError(f"ano_max deve estar entre 1900 e {current_year + 1}")
-
-        # Validação de preços (não pode ser negativo)
-        if preco_min is not None and preco_min < 0:
-            logger.warning(f"preco_min negativo: {preco_min}")
-            raise ValueError("preco_min não pode ser negativo")
-
-        if preco_max is not None and preco_max < 0:
-            logger.warning(f"preco_max negativo: {preco_max}")
-            raise ValueError("preco_max não pode ser negativo")
+        limit = VehicleController.clamp_limit(limit)
+        ano_min, ano_max, preco_min, preco_max = VehicleController.validate_ranges(
+            ano_min, ano_max, preco_min, preco_max
+        )
+        if sort is not None:
+            validate_sort(sort)
 
         # Log dos filtros aplicados
         filters_applied = {
@@ -91,32 +179,209 @@ class VehicleController:
             "preco_min": preco_min,
             "preco_max": preco_max,
             "transmissao": transmissao,
-            "limit": limit
+            "limit": limit,
+            "sort": sort
         }
         active_filters = {k: v for k, v in filters_applied.items() if v is not None}
         logger.info(f"Buscando veículos com filtros: {active_filters}")
 
-        # Construção da query
-        query = db.query(Vehicle)
+        if SEARCH_ENGINE == "columnar":
+            from app.index.columnar import get_columnar_index
 
-        if marca:
-            query = query.filter(Vehicle.marca.ilike(f"%{marca}%"))
-        if modelo:
-            query = query.filter(Vehicle.modelo.ilike(f"%{modelo}%"))
-        if ano_min:
-            query = query.filter(Vehicle.ano >= ano_min)
-        if ano_max:
-            query = query.filter(Vehicle.ano <= ano_max)
-        if combustivel:
-            query = query.filter(Vehicle.combustivel == combustivel)
-        if preco_min:
-            query = query.filter(Vehicle.preco >= preco_min)
-        if preco_max:
-            query = query.filter(Vehicle.preco <= preco_max)
-        if transmissao:
-            query = query.filter(Vehicle.transmissao == transmissao)
+            results = get_columnar_index(db, max_age=SEARCH_INDEX_MAX_AGE).search(
+                db,
+                marca=marca,
+                modelo=modelo,
+                ano_min=ano_min,
+                ano_max=ano_max,
+                combustivel=combustivel,
+                preco_min=preco_min,
+                preco_max=preco_max,
+                transmissao=transmissao,
+                limit=limit,
+                sort=sort,
+                columns=columns
+            )
+            logger.info(f"Encontrados {len(results)} veículos (índice colunar)")
+            return results
 
-        results = query.limit(limit).all()
+        query = VehicleController.build_query(
+            db,
+            marca=marca,
+            modelo=modelo,
+            ano_min=ano_min,
+            ano_max=ano_max,
+            combustivel=combustivel,
+            preco_min=preco_min,
+            preco_max=preco_max,
+            transmissao=transmissao
+        )
+        if sort == RELEVANCE:
+            results = VehicleController._top_k_relevance(query, limit, columns)
+        else:
+            if sort is not None:
+                query = VehicleController._ordered(query, sort)
+            results = VehicleController._select(query, columns).limit(limit).all()
         logger.info(f"Encontrados {len(results)} veículos")
 
         return results
+
+    @staticmethod
+    def count_vehicles(db: Session, limit: Optional[int] = None, **filters) -> int:
+        """Conta os veículos que passam nos filtros, parando em `limit`.
+
+        Com `limit=1` vira uma sonda de existência barata: `COUNT(*)` sobre
+        uma subquery com `LIMIT 1`, que para na primeira linha. Com
+        SEARCH_ENGINE=columnar, conta pelo índice em memória.
+        """
+        filters = VehicleController._validated(filters)
+        if SEARCH_ENGINE == "columnar":
+            from app.index.columnar import get_columnar_index
+
+            index = get_columnar_index(db, max_age=SEARCH_INDEX_MAX_AGE)
+            return len(index.search_ids(db, limit=sys.maxsize if limit is None else limit, **filters))
+
+        query = VehicleController.build_query(db, **filters).with_entities(Vehicle.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return db.query(func.count()).select_from(query.subquery()).scalar()
+
+    @staticmethod
+    def _ordered(query: Query, sort: Optional[str], after: Optional[Tuple] = None) -> Query:
+        """Aplica ORDER BY (coluna, id) e, opcionalmente, a posição keyset.
+
+        Args:
+            sort: Ordenação por coluna (ver `SORT_COLUMNS`) ou None para id
+            after: Chave do último item já visto: (id,) sem sort, (valor, id) com sort
+        """
+        if sort is None:
+            if after is not None:
+                query = query.filter(Vehicle.id > after[-1])
+            return query.order_by(Vehicle.id)
+
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"sort '{sort}' não suporta paginação")
+        column_name, descending = SORT_COLUMNS[sort]
+        column = getattr(Vehicle, column_name)
+        if after is not None:
+            key, position = tuple_(column, Vehicle.id), tuple_(*after)
+            query = query.filter(key < position if descending else key > position)
+        if descending:
+            return query.order_by(column.desc(), Vehicle.id.desc())
+        return query.order_by(column.asc(), Vehicle.id.asc())
+
+    @staticmethod
+    def _top_k_relevance(query: Query, limit: int, columns: Optional[Sequence] = None) -> List[Vehicle]:
+        """Top-k por score de relevância com heap de tamanho `limit`.
+
+        Lê só as colunas do score, em streaming, e nunca ordena o conjunto
+        inteiro; depois carrega os `limit` veículos escolhidos.
+        """
+        rows = query.with_entities(
+            Vehicle.id, Vehicle.ano, Vehicle.preco, Vehicle.quilometragem
+        ).yield_per(5000)
+        # Empate no score: menor id primeiro (por isso -id no heap de máximos)
+        best = heapq.nlargest(
+            limit, ((relevance_score(ano, preco, km), -vid) for vid, ano, preco, km in rows)
+        )
+        ids = [-neg_id for _, neg_id in best]
+        if not ids:
+            return []
+        chosen = query.session.query(*(columns or (Vehicle,))).filter(Vehicle.id.in_(ids))
+        by_id = {v.id: v for v in chosen}
+        return [by_id[i] for i in ids]
+
+    @staticmethod
+    def _select(query: Query, columns: Optional[Sequence]) -> Query:
+        """Troca as entidades da query pelas colunas pedidas, se houver."""
+        return query.with_entities(*columns) if columns else query
+
+    @staticmethod
+    def _validated(filters: Dict[str, Any]) -> Dict[str, Any]:
+        filters = dict(filters)
+        (filters["ano_min"], filters["ano_max"],
+         filters["preco_min"], filters["preco_max"]) = VehicleController.validate_ranges(
+            filters.get("ano_min"), filters.get("ano_max"),
+            filters.get("preco_min"), filters.get("preco_max")
+        )
+        return filters
+
+    @staticmethod
+    def search_vehicles_page(
+        db: Session,
+        after: Optional[Tuple] = None,
+        limit: int = 10,
+        sort: Optional[str] = None,
+        columns: Optional[Sequence] = None,
+        **filters
+    ) -> Tuple[List[Vehicle], bool]:
+        """Página de resultados com paginação keyset.
+
+        Args:
+            db: Sessão do banco de dados
+            after: Chave do último item da página anterior (None = primeira):
+                (id,) sem sort, (valor, id) com sort por coluna
+            limit: Tamanho da página (padrão: 10, máx: 100)
+            sort: Ordenação por coluna; None = ordem de id
+            columns: Como em `search_vehicles` (devem incluir id e a coluna do sort)
+            **filters: Mesmos filtros de `search_vehicles`
+
+        Returns:
+            (veículos da página, se existe próxima página)
+
+        Raises:
+            ValueError: Filtros inválidos ou sort sem suporte a keyset (relevância)
+        """
+        limit = VehicleController.clamp_limit(limit)
+        query = VehicleController.build_query(db, **VehicleController._validated(filters))
+        query = VehicleController._select(VehicleController._ordered(query, sort, after), columns)
+
+        # Um registro a mais só para saber se há próxima página
+        rows = query.limit(limit + 1).all()
+        return rows[:limit], len(rows) > limit
+
+    @staticmethod
+    def page_key(vehicle: Vehicle, sort: Optional[str] = None) -> Tuple:
+        """Chave keyset de um veículo, no formato esperado por `after`."""
+        if sort is None:
+            return (vehicle.id,)
+        return (getattr(vehicle, SORT_COLUMNS[sort][0]), vehicle.id)
+
+    @staticmethod
+    def iter_vehicles(
+        db: Session,
+        batch_size: int = 500,
+        max_results: Optional[int] = None,
+        sort: Optional[str] = None,
+        columns: Optional[Sequence] = None,
+        **filters
+    ) -> Iterator[Vehicle]:
+        """Percorre todos os resultados, sem o teto de 100, em lotes keyset.
+
+        Cada lote é uma query curta (`chave > última ORDER BY chave LIMIT n`),
+        então nada mantém o banco travado entre lotes e a memória fica
+        limitada ao tamanho do lote. `columns` como em `search_vehicles_page`.
+        """
+        query = VehicleController.build_query(db, **VehicleController._validated(filters))
+        after = None
+        sent = 0
+        while max_results is None or sent < max_results:
+            size = batch_size if max_results is None else min(batch_size, max_results - sent)
+            batch = VehicleController._ordered(query, sort, after)
+            batch = VehicleController._select(batch, columns).limit(size).all()
+            for vehicle in batch:
+                yield vehicle
+            sent += len(batch)
+            if len(batch) < size:
+                break
+            after = VehicleController.page_key(batch[-1], sort)
+            db.expunge_all()
+
+    @staticmethod
+    async def asearch_vehicles(db: Session, **filters) -> List[Vehicle]:
+        """Versão async de `search_vehicles` para handlers async.
+
+        Aceita os mesmos filtros; a query roda no pool de threads do banco
+        (ver `app.database.run_db`), sem bloquear o event loop.
+        """
+        return await run_db(VehicleController.search_vehicles, db, **filters)
@@ -1,14 +1,91 @@
-from sqlalchemy import create_engine
+import asyncio
+import functools
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from app.config import DB_PATH
+from app.config import DB_PATH, DB_READ_POOL_SIZE, DB_STORAGE_PROFILE, DB_THREAD_POOL_SIZE
 
 DATABASE_URL = f"sqlite:///{DB_PATH}"
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False}
-)
+# Perfis de armazenamento: PRAGMAs aplicados a cada conexão aberta.
+# journal_mode é gravado no arquivo; os demais valem só para a conexão.
+STORAGE_PROFILES: Dict[str, Dict[str, Any]] = {
+    # Padrões do SQLite: nenhum PRAGMA. O journal_mode fica o que o arquivo
+    # já tem (um banco WAL continua WAL; um novo usa journal de rollback)
+    "default": {},
+    # Servidor de busca: WAL (leituras concorrentes com uma escrita), páginas
+    # lidas por mmap, cache de 64 MB e fsync só nos checkpoints
+    "read_heavy": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64_000,
+        "temp_store": "MEMORY",
+    },
+    # Cargas em massa: sem fsync (uma queda do sistema pode corromper o banco;
+    # refaça a carga), cache grande para recriar índices
+    "bulk_load": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -256_000,
+        "temp_store": "MEMORY",
+    },
+}
+
+
+def create_db_engine(
+    url: str = DATABASE_URL,
+    profile: str = DB_STORAGE_PROFILE,
+    read_only: bool = False,
+    **kwargs
+) -> Engine:
+    """Engine SQLite com os PRAGMAs do perfil em cada conexão nova.
+
+    Args:
+        url: URL do banco
+        profile: Chave de STORAGE_PROFILES
+        read_only: Conexões com `query_only` (qualquer escrita falha)
+        **kwargs: Repassados ao `create_engine` (pool_size etc.)
+
+    Raises:
+        ValueError: Perfil desconhecido
+    """
+    if profile not in STORAGE_PROFILES:
+        raise ValueError(f"Perfil de armazenamento desconhecido: {profile} (use {', '.join(STORAGE_PROFILES)})")
+    pragmas = dict(STORAGE_PROFILES[profile])
+    if read_only:
+        pragmas["query_only"] = "ON"
+
+    new_engine = create_engine(url, connect_args={"check_same_thread": False}, **kwargs)
+
+    @event.listens_for(new_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+    return new_engine
+
+
+def create_writer_engine(url: str = DATABASE_URL, profile: str = "bulk_load") -> Engine:
+    """Engine de uma conexão só, para importações e cargas em massa."""
+    return create_db_engine(url, profile=profile, pool_size=1, max_overflow=0)
+
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Pool separado só de leitura para o tráfego de busca: não disputa conexões
+# com escritas e não consegue escrever por engano
+read_engine = create_db_engine(read_only=True, pool_size=DB_READ_POOL_SIZE)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 Base = declarative_base()
 
 
@@ -18,3 +95,124 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Pool de threads dedicado ao banco: handlers async delegam as queries
+# síncronas para cá e o event loop continua livre. Tamanho 0 executa
+# inline (bloqueando o loop, como antes).
+_db_executor: Optional[ThreadPoolExecutor] = None
+_db_executor_size = DB_THREAD_POOL_SIZE
+
+
+def configure_db_executor(size: int) -> None:
+    """Redimensiona o pool de threads do banco (0 = executar inline)."""
+    global _db_executor, _db_executor_size
+    if _db_executor is not None:
+        _db_executor.shutdown(wait=True)
+        _db_executor = None
+    _db_executor_size = size
+
+
+async def run_db(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Executa uma função síncrona de banco sem bloquear o event loop."""
+    global _db_executor
+    if _db_executor_size <= 0:
+        return fn(*args, **kwargs)
+    if _db_executor is None:
+        _db_executor = ThreadPoolExecutor(max_workers=_db_executor_size, thread_name_prefix="db")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, functools.partial(fn, *args, **kwargs))
+
+
+# Versão do inventário: incrementada a cada commit que escreve em `vehicles`.
+# Índices e caches em memória comparam essa versão para saber se estão velhos.
+_WRITE_VERBS = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+_inventory_lock = threading.Lock()
+_inventory_version = 0
+_inventory_listeners: List[Callable[[int], None]] = []
+
+
+def inventory_version() -> int:
+    """Retorna a versão atual do inventário (tabela vehicles)."""
+    return _inventory_version
+
+
+def on_inventory_change(callback: Callable[[int], None]) -> None:
+    """Registra callback chamado com a nova versão após cada escrita."""
+    _inventory_listeners.append(callback)
+
+
+def notify_inventory_changed() -> int:
+    """Marca o inventário como alterado e avisa os listeners.
+
+    Chamado automaticamente no commit de qualquer escrita em `vehicles`
+    feita por este processo; escritas de outros processos são percebidas
+    por `sync_external_writes`.
+    """
+    global _inventory_version
+    with _inventory_lock:
+        _inventory_version += 1
+        version = _inventory_version
+    for callback in list(_inventory_listeners):
+        callback(version)
+    return version
+
+
+# Escritas de outros processos (seed, importação) não passam pelos eventos
+# abaixo. O SQLite incrementa `PRAGMA data_version` numa conexão sempre que
+# outra conexão faz commit no arquivo; uma conexão dedicada por arquivo
+# observa esse contador e, quando ele muda, a versão do inventário sobe.
+_watch_lock = threading.Lock()
+_watchers: Dict[str, sqlite3.Connection] = {}
+_watched_versions: Dict[str, int] = {}
+
+
+def sync_external_writes(bind: Optional[Engine] = None) -> int:
+    """Incorpora à versão do inventário os commits feitos fora deste processo.
+
+    Args:
+        bind: Engine cujo arquivo é observado (padrão: banco do app)
+
+    Returns:
+        Versão atual do inventário
+    """
+    database = (bind or engine).url.database
+    if not database or database == ":memory:":
+        return _inventory_version
+    path = os.path.abspath(database)
+    with _watch_lock:
+        watcher = _watchers.get(path)
+        if watcher is None:
+            watcher = _watchers[path] = sqlite3.connect(path, check_same_thread=False)
+        current = watcher.execute("PRAGMA data_version").fetchone()[0]
+        changed = path in _watched_versions and _watched_versions[path] != current
+        _watched_versions[path] = current
+    if changed:
+        notify_inventory_changed()
+    return _inventory_version
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _track_vehicle_writes(conn, cursor, statement, parameters, context, executemany):
+    head = statement.lstrip()[:7].upper()
+    if head.startswith(_WRITE_VERBS) and "vehicles" in statement.lower():
+        conn.info["vehicles_dirty"] = True
+
+
+@event.listens_for(Engine, "commit")
+def _bump_on_commit(conn):
+    if conn.info.pop("vehicles_dirty", False):
+        notify_inventory_changed()
+
+
+@event.listens_for(Engine, "rollback")
+def _discard_on_rollback(conn):
+    conn.info.pop("vehicles_dirty", None)
@@ -0,0 +1,62 @@
+"""Avaliação em Python das mesmas regras de filtro do VehicleController.
+
+Usado por caminhos que filtram fora do SQLite (índice colunar, lotes de
+busca) e precisam retornar exatamente o que a query SQL retornaria.
+"""
+import re
+from typing import Any, Callable, Dict, Optional
+
+from app.models.vehicle import FuelType, TransmissionType
+
+TEXT_FILTERS = ("marca", "modelo")
+ENUM_FILTERS = {"combustivel": FuelType, "transmissao": TransmissionType}
+
+
+def like_matcher(term: str) -> Callable[[str], Optional[re.Match]]:
+    """Reproduz `ilike('%term%')` do SQLite em Python.
+
+    O SQLite só faz case-folding de ASCII e trata `%` e `_` do termo como
+    curingas, então o regex segue as mesmas regras.
+    """
+    parts = []
+    for ch in term:
+        if ch == "%":
+            parts.append(".*")
+        elif ch == "_":
+            parts.append(".")
+        else:
+            parts.append(re.escape(ch))
+    pattern = re.compile(".*" + "".join(parts) + ".*", re.IGNORECASE | re.ASCII | re.DOTALL)
+    return pattern.fullmatch
+
+
+def enum_db_value(enum_cls, value: str) -> str:
+    """Converte valor do filtro para o que o SQLAlchemy grava (nome do enum)."""
+    if value in enum_cls.__members__:
+        return value
+    for member in enum_cls:
+        if member.value == value:
+            return member.name
+    return value
+
+
+def matches_filters(vehicle: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    """Indica se um veículo serializado (VehicleResponse) passa nos filtros.
+
+    Filtros com valor "falsy" são ignorados, como no controller.
+    """
+    for name in TEXT_FILTERS:
+        term = filters.get(name)
+        if term and not like_matcher(term)(vehicle[name]):
+            return False
+    for name, enum_cls in ENUM_FILTERS.items():
+        value = filters.get(name)
+        if value and enum_db_value(enum_cls, value) != enum_db_value(enum_cls, vehicle[name]):
+            return False
+    for field in ("ano", "preco"):
+        low, high = filters.get(f"{field}_min"), filters.get(f"{field}_max")
+        if low and vehicle[field] < low:
+            return False
+        if high and vehicle[field] > high:
+            return False
+    return True
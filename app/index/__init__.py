@@ -0,0 +1,55 @@
+"""Índices auxiliares de `vehicles`: texto, facetas e colunar.
+
+Os índices de texto e de facetas são tabelas derivadas criadas por
+scripts/init_db.py; `table_present` diz se o banco de uma sessão já as tem.
+"""
+import threading
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.database import sync_external_writes
+
+# (engine, tabela) -> presença conhecida (False só quando desligada à mão)
+_present: Dict[Tuple[Engine, str], bool] = {}
+# (engine, tabela) -> versão do inventário em que o banco não tinha a tabela
+_missing: Dict[Tuple[Engine, str], int] = {}
+_lock = threading.Lock()
+
+
+def table_present(db: Session, name: str) -> bool:
+    """Indica se o banco da sessão tem a tabela `name`.
+
+    Presença fica em cache por (engine, tabela); ausência é reconferida
+    quando o banco muda (ex.: scripts/init_db.py rodando com o servidor no ar).
+    """
+    bind = db.get_bind()
+    key = (bind, name)
+    present = _present.get(key)
+    if present is not None:
+        return present
+    version = sync_external_writes(bind)
+    if _missing.get(key) == version:
+        return False
+    with _lock, bind.connect() as conn:
+        found = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE name = ?", (name,)
+        ).first() is not None
+    if found:
+        _present[key] = True
+    else:
+        _missing[key] = version
+    return found
+
+
+def set_table_present(engine: Engine, name: str, present: Optional[bool]) -> None:
+    """Fixa a presença da tabela no cache (True depois de criá-la; False
+    desliga o índice, em testes e benchmarks) ou volta a consultar o banco (None).
+    """
+    key = (engine, name)
+    _missing.pop(key, None)
+    if present is None:
+        _present.pop(key, None)
+    else:
+        _present[key] = present
@@ -0,0 +1,255 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.database import inventory_version, sync_external_writes
+from app.filters import like_matcher, enum_db_value
+from app.models.vehicle import Vehicle, FuelType, TransmissionType
+from app.ranking import RELEVANCE, SORT_COLUMNS, relevance_score
+
+logger = logging.getLogger(__name__)
+
+_LOAD_SQL = (
+    "SELECT id, marca, modelo, ano, combustivel, transmissao, preco, quilometragem "
+    "FROM vehicles ORDER BY id"
+)
+_CHUNK_SIZE = 100_000
+_BLOCK_SIZE = 65_536
+
+
+@dataclass(frozen=True)
+class _Columns:
+    """Snapshot imutável das colunas (trocado de uma vez no refresh)."""
+    ids: np.ndarray
+    ano: np.ndarray
+    preco: np.ndarray
+    quilometragem: np.ndarray
+    marca: np.ndarray
+    modelo: np.ndarray
+    combustivel: np.ndarray
+    transmissao: np.ndarray
+    dictionaries: Dict[str, List[str]]
+    version: int
+    loaded_at: float
+
+
+def _encode(values: List[str], lookup: Dict[str, int]) -> np.ndarray:
+    """Dictionary encoding: string -> código inteiro estável."""
+    return np.fromiter(
+        (lookup.setdefault(v, len(lookup)) for v in values),
+        dtype=np.int32,
+        count=len(values)
+    )
+
+
+class ColumnarIndex:
+    """Índice colunar em memória da tabela vehicles.
+
+    `ano`, `preco` e `quilometragem` ficam em arrays NumPy; `marca`, `modelo`,
+    `combustivel` e `transmissao` ficam como códigos inteiros (dictionary
+    encoding). Filtros viram máscaras vetorizadas e o resultado é o mesmo
+    conjunto que a query SQL retornaria, em ordem de id.
+
+    O índice é recarregado quando a versão do inventário muda (qualquer
+    commit que escreve em `vehicles`, inclusive de outro processo, como os
+    scripts de seed e importação) ou quando passa de `max_age` segundos.
+    """
+
+    def __init__(self, max_age: float = 0):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._columns: Optional[_Columns] = None
+
+    @property
+    def size(self) -> int:
+        return 0 if self._columns is None else len(self._columns.ids)
+
+    def is_stale(self) -> bool:
+        columns = self._columns
+        if columns is None or columns.version != inventory_version():
+            return True
+        return bool(self.max_age) and time.monotonic() - columns.loaded_at > self.max_age
+
+    def refresh(self, db: Session) -> None:
+        """Carrega (ou recarrega) as colunas a partir do banco."""
+        # Versão lida antes da carga: se alguém escrever durante a leitura,
+        # o índice já nasce velho e será recarregado na próxima busca.
+        version = inventory_version()
+        started = time.perf_counter()
+
+        lookups: Dict[str, Dict[str, int]] = {
+            "marca": {}, "modelo": {}, "combustivel": {}, "transmissao": {}
+        }
+        chunks: Dict[str, List[np.ndarray]] = {
+            name: [] for name in ("ids", "ano", "preco", "quilometragem", *lookups)
+        }
+
+        result = db.connection().exec_driver_sql(_LOAD_SQL)
+        while True:
+            rows = result.fetchmany(_CHUNK_SIZE)
+            if not rows:
+                break
+            ids, marca, modelo, ano, combustivel, transmissao, preco, km = zip(*rows)
+            chunks["ids"].append(np.array(ids, dtype=np.int64))
+            chunks["ano"].append(np.array(ano, dtype=np.int32))
+            chunks["preco"].append(np.array(preco, dtype=np.float64))
+            chunks["quilometragem"].append(np.array(km, dtype=np.int64))
+            chunks["marca"].append(_encode(marca, lookups["marca"]))
+            chunks["modelo"].append(_encode(modelo, lookups["modelo"]))
+            chunks["combustivel"].append(_encode(combustivel, lookups["combustivel"]))
+            chunks["transmissao"].append(_encode(transmissao, lookups["transmissao"]))
+
+        dtypes = {"ids": np.int64, "ano": np.int32, "preco": np.float64, "quilometragem": np.int64}
+        arrays = {
+            name: np.concatenate(parts) if parts else np.empty(0, dtype=dtypes.get(name, np.int32))
+            for name, parts in chunks.items()
+        }
+
+        self._columns = _Columns(
+            **arrays,
+            dictionaries={name: list(lookup) for name, lookup in lookups.items()},
+            version=version,
+            loaded_at=time.monotonic()
+        )
+        logger.info(
+            f"Índice colunar carregado: {len(arrays['ids'])} veículos "
+            f"em {time.perf_counter() - started:.2f}s"
+        )
+
+    def _ensure_fresh(self, db: Session) -> _Columns:
+        sync_external_writes(db.get_bind())
+        if self.is_stale():
+            with self._lock:
+                if self.is_stale():
+                    self.refresh(db)
+        return self._columns
+
+    def search_ids(
+        self,
+        db: Session,
+        marca: Optional[str] = None,
+        modelo: Optional[str] = None,
+        ano_min: Optional[int] = None,
+        ano_max: Optional[int] = None,
+        combustivel: Optional[str] = None,
+        preco_min: Optional[float] = None,
+        preco_max: Optional[float] = None,
+        transmissao: Optional[str] = None,
+        limit: int = 10,
+        sort: Optional[str] = None
+    ) -> List[int]:
+        """Retorna os ids que passam nos filtros (já validados pelo controller).
+
+        As condições seguem exatamente as do VehicleController: filtros com
+        valor "falsy" (None, 0, "") são ignorados. Com `sort`, a ordem e os
+        desempates por id são os mesmos do SQL.
+        """
+        cols = self._ensure_fresh(db)
+        conditions = []
+
+        def text_condition(column: str, term: str):
+            matches = like_matcher(term)
+            hit = np.array([bool(matches(v)) for v in cols.dictionaries[column]], dtype=bool)
+            codes = getattr(cols, column)
+            conditions.append(lambda block: hit[codes[block]])
+
+        def enum_condition(column: str, value: str):
+            hit = np.array([v == value for v in cols.dictionaries[column]], dtype=bool)
+            codes = getattr(cols, column)
+            conditions.append(lambda block: hit[codes[block]])
+
+        if marca:
+            text_condition("marca", marca)
+        if modelo:
+            text_condition("modelo", modelo)
+        if ano_min:
+            conditions.append(lambda block: cols.ano[block] >= ano_min)
+        if ano_max:
+            conditions.append(lambda block: cols.ano[block] <= ano_max)
+        if combustivel:
+            enum_condition("combustivel", enum_db_value(FuelType, combustivel))
+        if preco_min:
+            conditions.append(lambda block: cols.preco[block] >= preco_min)
+        if preco_max:
+            conditions.append(lambda block: cols.preco[block] <= preco_max)
+        if transmissao:
+            enum_condition("transmissao", enum_db_value(TransmissionType, transmissao))
+
+        if sort is not None:
+            return self._top_k(cols, conditions, sort, limit)
+
+        if not conditions:
+            return cols.ids[:limit].tolist()
+
+        # Avalia em blocos para poder parar assim que `limit` for atingido,
+        # como o LIMIT do SQLite faz, sem perder a vetorização dentro do bloco.
+        found: List[int] = []
+        for start in range(0, len(cols.ids), _BLOCK_SIZE):
+            block = slice(start, start + _BLOCK_SIZE)
+            mask = conditions[0](block)
+            for condition in conditions[1:]:
+                mask &= condition(block)
+            positions = np.flatnonzero(mask)[:limit - len(found)]
+            found.extend(cols.ids[start + positions].tolist())
+            if len(found) >= limit:
+                break
+        return found
+
+    @staticmethod
+    def _top_k(cols: _Columns, conditions: list, sort: str, limit: int) -> List[int]:
+        """Seleciona os `limit` melhores sem ordenar todos os resultados.
+
+        `np.partition` acha o k-ésimo valor da chave; só os candidatos até
+        esse valor (inclusive empates) são ordenados por (chave, id).
+        """
+        everything = slice(0, len(cols.ids))
+        mask = np.ones(len(cols.ids), dtype=bool)
+        for condition in conditions:
+            mask &= condition(everything)
+        positions = np.flatnonzero(mask)
+
+        ids = cols.ids[positions]
+        if sort == RELEVANCE:
+            keys = -relevance_score(cols.ano[positions], cols.preco[positions], cols.quilometragem[positions])
+        else:
+            column, descending = SORT_COLUMNS[sort]
+            keys = getattr(cols, column)[positions].astype(np.float64)
+            if descending:
+                keys, ids = -keys, -ids
+
+        if len(keys) > limit:
+            kth = np.partition(keys, limit - 1)[limit - 1]
+            keep = keys <= kth
+            keys, ids = keys[keep], ids[keep]
+        chosen = ids[np.lexsort((ids, keys))[:limit]]
+        if sort != RELEVANCE and SORT_COLUMNS[sort][1]:
+            chosen = -chosen
+        return chosen.tolist()
+
+    def search(self, db: Session, limit: int = 10, columns: Optional[Sequence] = None,
+               **filters) -> List[Vehicle]:
+        """Mesma assinatura do controller; materializa só os `limit` veículos."""
+        ids = self.search_ids(db, limit=limit, **filters)
+        if not ids:
+            return []
+        by_id = {v.id: v for v in db.query(*(columns or (Vehicle,))).filter(Vehicle.id.in_(ids)).all()}
+        return [by_id[i] for i in ids if i in by_id]
+
+
+_indexes: Dict[object, ColumnarIndex] = {}
+_registry_lock = threading.Lock()
+
+
+def get_columnar_index(db: Session, max_age: float = 0) -> ColumnarIndex:
+    """Retorna o índice associado ao engine da sessão (um por banco)."""
+    bind = db.get_bind()
+    with _registry_lock:
+        index = _indexes.get(bind)
+        if index is None:
+            index = _indexes[bind] = ColumnarIndex(max_age=max_age)
+    return index
@@ -0,0 +1,222 @@
+"""Contagens por faceta (marca, combustível, câmbio, faixa de ano e de preço).
+
+Contar com `GROUP BY` na tabela vehicles lê todas as linhas que passam nos
+filtros. O índice de facetas guarda um cubo de contagens (`vehicle_facets`)
+por marca, combustível, câmbio, ano e faixa de preço de `PRICE_BUCKET`
+reais, mantido por triggers em `vehicles`: cada escrita ajusta só a
+célula afetada. O número de células depende só do catálogo (dezenas de
+milhares), não do tamanho do estoque.
+
+As facetas somam as células do cubo que passam nos filtros. Marca, enums
+e ano são dimensões do cubo, então o filtro é exato. Para preço, as
+faixas inteiramente dentro do intervalo vêm do cubo e só as faixas das
+bordas (cortadas por `preco_min`/`preco_max`) são contadas na tabela
+vehicles, pelo índice de preço. O resultado é idêntico ao da contagem
+direta. Modelo não entra no cubo (multiplicaria as células); com filtro
+de modelo, que já é seletivo, a contagem é feita na tabela.
+"""
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.controllers.vehicle_controller import VehicleController
+from app.filters import ENUM_FILTERS, enum_db_value
+from app.index import set_table_present, table_present
+
+logger = logging.getLogger(__name__)
+
+FACETS_TABLE = "vehicle_facets"
+PRICE_BUCKET = 10_000
+YEAR_BUCKET = 5
+
+_CELL = "marca, combustivel, transmissao, ano, faixa_preco"
+_BUCKET = "CAST({row}.preco / " + str(PRICE_BUCKET) + " AS INTEGER)"
+_NEW_CELL = f"new.marca, new.combustivel, new.transmissao, new.ano, {_BUCKET.format(row='new')}"
+_OLD_MATCH = (
+    "marca = old.marca AND combustivel = old.combustivel "
+    f"AND transmissao = old.transmissao AND ano = old.ano AND faixa_preco = {_BUCKET.format(row='old')}"
+)
+_INCREMENT = f"""INSERT INTO {FACETS_TABLE} VALUES ({_NEW_CELL}, 1)
+        ON CONFLICT ({_CELL}) DO UPDATE SET total = total + 1;"""
+_DECREMENT = f"UPDATE {FACETS_TABLE} SET total = total - 1 WHERE {_OLD_MATCH};"
+
+_DDL = [
+    f"CREATE TABLE IF NOT EXISTS {FACETS_TABLE} ("
+    "marca TEXT NOT NULL, combustivel TEXT NOT NULL, "
+    "transmissao TEXT NOT NULL, ano INTEGER NOT NULL, faixa_preco INTEGER NOT NULL, "
+    f"total INTEGER NOT NULL, PRIMARY KEY ({_CELL})) WITHOUT ROWID",
+    f"CREATE TRIGGER IF NOT EXISTS {FACETS_TABLE}_ai AFTER INSERT ON vehicles BEGIN {_INCREMENT} END",
+    f"CREATE TRIGGER IF NOT EXISTS {FACETS_TABLE}_ad AFTER DELETE ON vehicles BEGIN {_DECREMENT} END",
+    f"""CREATE TRIGGER IF NOT EXISTS {FACETS_TABLE}_au
+        AFTER UPDATE OF marca, combustivel, transmissao, ano, preco ON vehicles BEGIN
+        {_DECREMENT}
+        {_INCREMENT}
+    END""",
+]
+_REBUILD = [
+    f"DELETE FROM {FACETS_TABLE}",
+    f"INSERT INTO {FACETS_TABLE} SELECT marca, combustivel, transmissao, ano, "
+    f"{_BUCKET.format(row='vehicles')}, COUNT(*) FROM vehicles GROUP BY 1, 2, 3, 4, 5",
+]
+
+
+def create_facet_index(engine: Engine) -> None:
+    """Cria o cubo de contagens e os triggers, e popula o cubo."""
+    with engine.begin() as conn:
+        for statement in _DDL + _REBUILD:
+            conn.exec_driver_sql(statement)
+    set_table_present(engine, FACETS_TABLE, True)
+    logger.info("Índice de facetas pronto")
+
+
+def rebuild_facet_index(engine: Engine) -> None:
+    """Recalcula o cubo a partir da tabela vehicles (remove células zeradas)."""
+    with engine.begin() as conn:
+        for statement in _REBUILD:
+            conn.exec_driver_sql(statement)
+
+
+def has_facet_index(db: Session) -> bool:
+    """Indica se o banco da sessão tem o cubo (ver `app.index.table_present`)."""
+    return table_present(db, FACETS_TABLE)
+
+
+def _conditions(filters: Dict[str, Any], params: Dict[str, Any]) -> List[str]:
+    """Condições comuns ao cubo e à tabela vehicles (tudo menos preço)."""
+    conditions = []
+    for name in ("marca", "modelo"):  # modelo só aparece na contagem pela tabela
+        if filters.get(name):
+            # Mesma semântica do `ilike` do controller
+            conditions.append(f"lower({name}) LIKE lower(:{name})")
+            params[name] = f"%{filters[name]}%"
+    for name, enum_cls in ENUM_FILTERS.items():
+        if filters.get(name):
+            conditions.append(f"{name} = :{name}")
+            params[name] = enum_db_value(enum_cls, filters[name])
+    if filters.get("ano_min"):
+        conditions.append("ano >= :ano_min")
+        params["ano_min"] = filters["ano_min"]
+    if filters.get("ano_max"):
+        conditions.append("ano <= :ano_max")
+        params["ano_max"] = filters["ano_max"]
+    return conditions
+
+
+def _price_split(low: Optional[float], high: Optional[float]) -> Tuple[List[str], List[Tuple[float, float]]]:
+    """Divide o filtro de preço em faixas inteiras (cubo) e bordas (tabela).
+
+    Returns:
+        (condições sobre `faixa_preco` no cubo, intervalos [início, fim) das
+        faixas de borda a contar na tabela)
+    """
+    cube, edges = [], []
+    if low:
+        first = int(low // PRICE_BUCKET)
+        if low == first * PRICE_BUCKET:
+            cube.append(f"faixa_preco >= {first}")
+        else:
+            cube.append(f"faixa_preco > {first}")
+            edges.append((first * PRICE_BUCKET, (first + 1) * PRICE_BUCKET))
+    if high:
+        last = int(high // PRICE_BUCKET)
+        cube.append(f"faixa_preco < {last}")
+        edge = (last * PRICE_BUCKET, (last + 1) * PRICE_BUCKET)
+        if edge not in edges:
+            edges.append(edge)
+    return cube, edges
+
+
+def _matched_cells(filters: Dict[str, Any], use_index: bool) -> Tuple[str, Dict[str, Any]]:
+    """SELECT das células (dimensões + total) que passam nos filtros."""
+    params: Dict[str, Any] = {}
+    common = _conditions(filters, params)
+    low, high = filters.get("preco_min"), filters.get("preco_max")
+    price = []
+    if low:
+        price.append("preco >= :preco_min")
+        params["preco_min"] = low
+    if high:
+        price.append("preco <= :preco_max")
+        params["preco_max"] = high
+
+    def from_vehicles(extra: List[str]) -> str:
+        where = " AND ".join(common + price + extra) or "1"
+        return (
+            f"SELECT marca, combustivel, transmissao, ano, {_BUCKET.format(row='vehicles')} AS faixa_preco, "
+            f"COUNT(*) AS total FROM vehicles WHERE {where} GROUP BY 1, 2, 3, 4, 5"
+        )
+
+    if not use_index:
+        return from_vehicles([]), params
+
+    cube, edges = _price_split(low, high)
+    where = " AND ".join(common + cube) or "1"
+    parts = [
+        f"SELECT marca, combustivel, transmissao, ano, faixa_preco, total "
+        f"FROM {FACETS_TABLE} WHERE {where}"
+    ]
+    if edges:
+        ranges = " OR ".join(f"(preco >= {start} AND preco < {end})" for start, end in edges)
+        parts.append(from_vehicles([f"({ranges})"]))
+    return " UNION ALL ".join(parts), params
+
+
+def _label(name: str, value: str) -> str:
+    """Nome do enum gravado no banco -> valor exibido ("FLEX" -> "Flex")."""
+    enum_cls = ENUM_FILTERS[name]
+    return enum_cls[value].value if value in enum_cls.__members__ else value
+
+
+def facet_counts(db: Session, **filters) -> Dict[str, Any]:
+    """Contagens por faceta dos veículos que passam nos filtros.
+
+    Aceita os filtros de `VehicleController.search_vehicles` (limit e sort
+    são ignorados). Sem o índice de facetas, ou com filtro de modelo,
+    conta direto na tabela.
+
+    Returns:
+        {"total", "marca", "combustivel", "transmissao": {valor: contagem},
+        "ano", "preco": [{"min", "max", "count"}]} (max exclusivo no preço)
+    """
+    filters = {k: v for k, v in filters.items() if k not in ("limit", "sort")}
+    (filters["ano_min"], filters["ano_max"],
+     filters["preco_min"], filters["preco_max"]) = VehicleController.validate_ranges(
+        filters.get("ano_min"), filters.get("ano_max"),
+        filters.get("preco_min"), filters.get("preco_max")
+    )
+    use_index = has_facet_index(db) and not filters.get("modelo")
+    if not use_index:
+        logger.debug("Facetas contadas direto na tabela vehicles")
+    matched, params = _matched_cells(filters, use_index)
+    groups = {
+        "marca": "marca",
+        "combustivel": "combustivel",
+        "transmissao": "transmissao",
+        "ano": f"ano / {YEAR_BUCKET}",
+        "preco": "faixa_preco",
+    }
+    sql = f"WITH matched AS MATERIALIZED ({matched}) " + " UNION ALL ".join(
+        f"SELECT '{name}', {expr}, SUM(total) FROM matched GROUP BY 2 HAVING SUM(total) > 0"
+        for name, expr in groups.items()
+    )
+    rows = db.execute(text(sql), params).fetchall()
+
+    result: Dict[str, Any] = {"total": 0, "marca": {}, "combustivel": {}, "transmissao": {}, "ano": [], "preco": []}
+    for facet, value, count in rows:
+        if facet == "marca":
+            result["marca"][value] = count
+            result["total"] += count
+        elif facet in ENUM_FILTERS:
+            result[facet][_label(facet, value)] = count
+        elif facet == "ano":
+            result["ano"].append({"min": value * YEAR_BUCKET, "max": value * YEAR_BUCKET + YEAR_BUCKET - 1,
+                                  "count": count})
+        else:
+            result["preco"].append({"min": value * PRICE_BUCKET, "max": (value + 1) * PRICE_BUCKET,
+                                    "count": count})
+    result["ano"].sort(key=lambda b: b["min"])
+    result["preco"].sort(key=lambda b: b["min"])
+    return result
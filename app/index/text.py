@@ -0,0 +1,95 @@
+"""Índice de texto para busca parcial em marca e modelo.
+
+`ilike('%x%')` com curinga no início não usa índice B-tree, então toda
+busca textual varria a tabela inteira. Marca e modelo têm poucos valores
+distintos, então o índice guarda esse dicionário numa tabela pequena
+(`vehicle_terms`), mantida por triggers em `vehicles`:
+
+1. o termo é comparado com o dicionário (poucas linhas) usando o mesmo ILIKE;
+2. a busca vira `marca IN (valores)`, que usa `ix_vehicles_marca_ano_preco` /
+   `ix_vehicles_modelo` e para cedo com o LIMIT.
+
+O `ilike` original continua aplicado, então o resultado é idêntico.
+"""
+import logging
+from typing import Optional
+
+from sqlalchemy import select, table, column, func
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.index import set_table_present, table_present
+from app.models.vehicle import Vehicle
+
+logger = logging.getLogger(__name__)
+
+TERMS_TABLE = "vehicle_terms"
+TEXT_COLUMNS = ("marca", "modelo")
+
+_DDL = [
+    f"CREATE TABLE IF NOT EXISTS {TERMS_TABLE} ("
+    "coluna TEXT NOT NULL, valor TEXT NOT NULL, PRIMARY KEY (coluna, valor)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS ix_vehicles_modelo ON vehicles (modelo)",
+    # Recriados sempre: versões antigas usavam INSERT OR IGNORE, que um upsert
+    # em vehicles (scripts/import_inventory.py) sobrepõe com a política dele
+    f"DROP TRIGGER IF EXISTS {TERMS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {TERMS_TABLE}_au",
+    f"""CREATE TRIGGER {TERMS_TABLE}_ai AFTER INSERT ON vehicles BEGIN
+        INSERT INTO {TERMS_TABLE} VALUES ('marca', new.marca), ('modelo', new.modelo)
+            ON CONFLICT DO NOTHING;
+    END""",
+    f"""CREATE TRIGGER {TERMS_TABLE}_au AFTER UPDATE OF marca, modelo ON vehicles BEGIN
+        INSERT INTO {TERMS_TABLE} VALUES ('marca', new.marca), ('modelo', new.modelo)
+            ON CONFLICT DO NOTHING;
+    END""",
+]
+# Valores que deixaram de existir (DELETE/UPDATE) ficam no dicionário: um
+# `IN` com valor sem linhas não muda o resultado. O rebuild os remove.
+_REBUILD = [
+    f"DELETE FROM {TERMS_TABLE}",
+    f"INSERT INTO {TERMS_TABLE} SELECT DISTINCT 'marca', marca FROM vehicles",
+    f"INSERT INTO {TERMS_TABLE} SELECT DISTINCT 'modelo', modelo FROM vehicles",
+]
+
+_terms = table(TERMS_TABLE, column("coluna"), column("valor"))
+
+
+def create_text_index(engine: Engine) -> None:
+    """Cria dicionário, índice de modelo e triggers, e popula o dicionário."""
+    with engine.begin() as conn:
+        for statement in _DDL + _REBUILD:
+            conn.exec_driver_sql(statement)
+    set_table_present(engine, TERMS_TABLE, True)
+    logger.info("Índice de texto de marca/modelo pronto")
+
+
+def rebuild_text_index(engine: Engine) -> None:
+    """Recalcula o dicionário a partir da tabela vehicles."""
+    with engine.begin() as conn:
+        for statement in _REBUILD:
+            conn.exec_driver_sql(statement)
+
+
+def has_text_index(db: Session) -> bool:
+    """Indica se o banco da sessão tem o índice (ver `app.index.table_present`)."""
+    return table_present(db, TERMS_TABLE)
+
+
+def text_conditions(db: Session, marca: Optional[str] = None, modelo: Optional[str] = None) -> list:
+    """Condições `coluna IN (valores do dicionário que casam com o termo)`.
+
+    Lista vazia quando o banco não tem o índice; o chamador aplica o
+    `ilike` de qualquer forma.
+    """
+    terms = {name: term for name, term in (("marca", marca), ("modelo", modelo)) if term}
+    if not terms or not has_text_index(db):
+        return []
+
+    conditions = []
+    for name, term in terms.items():
+        values = select(_terms.c.valor).where(
+            _terms.c.coluna == name,
+            func.lower(_terms.c.valor).like(func.lower(f"%{term}%"))
+        )
+        conditions.append(getattr(Vehicle, name).in_(values))
+    return conditions
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Enum
+from sqlalchemy import Column, Integer, String, Float, Enum, Index
 from app.database import Base
 import enum
 
@@ -21,15 +21,26 @@ class TransmissionType(str, enum.Enum):
 
 class Vehicle(Base):
     __tablename__ = "vehicles"
+    # Índices compostos a partir das combinações de filtro mais comuns: a
+    # coluna de igualdade primeiro, depois as faixas. As colunas seguintes são
+    # lidas do próprio índice, sem ir à tabela para descartar linhas, e
+    # (ano, preco, quilometragem) cobre o score de relevância.
+    # Substituem os índices simples de marca, ano e combustível (prefixos).
+    __table_args__ = (
+        Index("ix_vehicles_marca_ano_preco", "marca", "ano", "preco"),
+        Index("ix_vehicles_ano_preco_quilometragem", "ano", "preco", "quilometragem"),
+        Index("ix_vehicles_combustivel_preco", "combustivel", "preco"),
+        Index("ix_vehicles_transmissao_preco", "transmissao", "preco"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    marca = Column(String(50), nullable=False, index=True)
+    marca = Column(String(50), nullable=False)
     modelo = Column(String(100), nullable=False)
-    ano = Column(Integer, nullable=False, index=True)
+    ano = Column(Integer, nullable=False)
     motorizacao = Column(String(20), nullable=False)
-    combustivel = Column(Enum(FuelType), nullable=False, index=True)
+    combustivel = Column(Enum(FuelType), nullable=False)
     cor = Column(String(30), nullable=False)
-    quilometragem = Column(Integer, nullable=False)
+    quilometragem = Column(Integer, nullable=False, index=True)
     portas = Column(Integer, nullable=False)
     transmissao = Column(Enum(TransmissionType), nullable=False)
     preco = Column(Float, nullable=False, index=True)
@@ -0,0 +1,58 @@
+"""Opções de ordenação dos resultados de busca.
+
+Ordenações por coluna viram `ORDER BY coluna, id LIMIT n` (usam o índice
+da coluna). A relevância é um score composto, calculado por linha e
+selecionado com um heap de tamanho `limit` (top-k), sem ordenar o conjunto
+inteiro de resultados.
+"""
+from typing import Any, Callable, Dict, Tuple
+
+# sort -> (coluna, descendente). O id desempata no mesmo sentido da coluna,
+# para que a ordem seja estável e o índice possa ser percorrido sem sort.
+SORT_COLUMNS: Dict[str, Tuple[str, bool]] = {
+    "preco_asc": ("preco", False),
+    "preco_desc": ("preco", True),
+    "ano_desc": ("ano", True),
+    "quilometragem_asc": ("quilometragem", False),
+}
+RELEVANCE = "relevancia"
+SORT_OPTIONS = tuple(SORT_COLUMNS) + (RELEVANCE,)
+
+SORT_LABELS = {
+    "preco_asc": "menor preço",
+    "preco_desc": "maior preço",
+    "ano_desc": "mais novos",
+    "quilometragem_asc": "menor quilometragem",
+    RELEVANCE: "relevância (ano, preço e quilometragem)",
+}
+
+# Pesos do score de relevância: carro mais novo, mais barato e menos rodado
+RELEVANCE_WEIGHTS = {"ano": 1.0, "preco": 1.0, "quilometragem": 0.5}
+
+
+def relevance_score(ano, preco, quilometragem):
+    """Score de relevância (maior = melhor).
+
+    Cada década de ano vale 1 ponto, cada R$ 100 mil custa 1 ponto e cada
+    100 mil km custa 0,5 ponto. Funciona com escalares ou arrays NumPy.
+    """
+    return (
+        RELEVANCE_WEIGHTS["ano"] * (ano - 2000) / 10
+        - RELEVANCE_WEIGHTS["preco"] * preco / 100_000
+        - RELEVANCE_WEIGHTS["quilometragem"] * quilometragem / 100_000
+    )
+
+
+def validate_sort(sort: str) -> None:
+    if sort not in SORT_OPTIONS:
+        raise ValueError(f"sort inválido: {sort}. Opções: {', '.join(SORT_OPTIONS)}")
+
+
+def sort_key(sort: str) -> Callable[[Dict[str, Any]], Tuple]:
+    """Chave de `sorted()` para veículos serializados, na mesma ordem do SQL."""
+    if sort == RELEVANCE:
+        return lambda v: (-relevance_score(v["ano"], v["preco"], v["quilometragem"]), v["id"])
+    column, descending = SORT_COLUMNS[sort]
+    if descending:
+        return lambda v: (-v[column], -v["id"])
+    return lambda v: (v[column], v["id"])
@@ -1,14 +1,18 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
+from app.ranking import SORT_LABELS
 
 
 class VehicleView:
 
     @staticmethod
-    def format_results(vehicles: List[Dict]) -> str:
+    def format_results(vehicles: List[Dict], sort: Optional[str] = None) -> str:
         if not vehicles:
             return "Nenhum veículo encontrado com esses critérios."
 
-        result = f"\nEncontrei {len(vehicles)} veículo(s):\n\n"
+        result = f"\nEncontrei {len(vehicles)} veículo(s):\n"
+        if sort in SORT_LABELS:
+            result += f"Ordenados por: {SORT_LABELS[sort]}\n"
+        result += "\n"
 
         for i, v in enumerate(vehicles, 1):
             result += f"{i}. {v['marca']} {v['modelo']} ({v['ano']})\n"
@@ -19,3 +23,31 @@ class VehicleView:
             result += f"Transmissão: {v['transmissao']}\n\n"
 
         return result
+
+    @staticmethod
+    def format_relaxation(relaxed: List[Dict]) -> str:
+        """Aviso das restrições relaxadas pelo servidor (ver /search/relaxed)."""
+        changes = []
+        for item in relaxed:
+            constraint, original, new = item["constraint"], item["original"], item["relaxed"]
+            if all(v is None for v in new.values()):
+                label = {"ano": "qualquer ano", "preco": "qualquer preço",
+                         "combustivel": "qualquer combustível", "transmissao": "qualquer câmbio"}[constraint]
+                if constraint in ("combustivel", "transmissao"):
+                    label += f" (em vez de {original[constraint]})"
+                changes.append(label)
+            elif constraint == "ano":
+                changes.append("ano " + VehicleView._range(new.get("ano_min"), new.get("ano_max"), "{}"))
+            else:
+                changes.append("preço " + VehicleView._range(
+                    new.get("preco_min"), new.get("preco_max"), "R$ {:,.2f}"
+                ))
+        return "Nenhum veículo encontrado com todos os filtros. Busca ampliada: " + "; ".join(changes) + "\n"
+
+    @staticmethod
+    def _range(low, high, fmt: str) -> str:
+        if low is not None and high is not None:
+            return f"entre {fmt.format(low)} e {fmt.format(high)}"
+        if low is not None:
+            return f"a partir de {fmt.format(low)}"
+        return f"até {fmt.format(high)}"
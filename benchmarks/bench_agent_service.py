@@ -0,0 +1,120 @@
+"""Teste de carga do serviço de conversa: N sessões simuladas contra um LLM fake.
+
+Sobe o servidor MCP (banco sintético) e o agent_server com um LLM fake que
+gera tokens com latência configurável; cada sessão simulada envia uma
+conversa roteirizada via SSE. Mede tempo até o primeiro token, latência
+do turno e throughput, e o pico de turnos concorrentes no LLM.
+
+Uso:
+    python -m benchmarks.bench_agent_service --sessions 10 100 300 --turns 5 --max-llm 32
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from typing import List, Tuple
+
+import httpx
+from sqlalchemy.orm import sessionmaker
+
+from agent.agent import VehicleAgent
+from agent_server.server import AgentService, create_app
+from app.database import get_read_db
+from benchmarks.dataset import create_dataset
+from benchmarks.fake_llm import fake_llm, scripted_session
+from benchmarks.server import server_url, start_server
+from mcp_client.client import MCPClient
+from mcp_server.server import app as mcp_app
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+async def _session(http: httpx.AsyncClient, turns: int) -> List[Tuple[float, float]]:
+    """Executa a conversa de uma sessão; retorna (primeiro token, turno) em ms por turno."""
+    samples = []
+    session_id = (await http.post("/sessions")).json()["session_id"]
+    for message in scripted_session(turns):
+        started = time.perf_counter()
+        first_token = None
+        async with http.stream("POST", f"/sessions/{session_id}/messages", json={"message": message}) as response:
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                event = json.loads(line[len("data: "):])
+                if event["type"] == "token" and first_token is None:
+                    first_token = time.perf_counter()
+                elif event["type"] == "error":
+                    raise RuntimeError(event["detail"])
+        finished = time.perf_counter()
+        samples.append((((first_token or finished) - started) * 1000, (finished - started) * 1000))
+    return samples
+
+
+async def _drive(url: str, sessions: int, turns: int) -> Tuple[List[Tuple[float, float]], float]:
+    limits = httpx.Limits(max_connections=sessions, max_keepalive_connections=sessions)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=300.0) as http:
+        started = time.perf_counter()
+        results = await asyncio.gather(*(_session(http, turns) for _ in range(sessions)))
+        elapsed = time.perf_counter() - started
+    return [sample for samples in results for sample in samples], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[10, 100, 300])
+    parser.add_argument("--turns", type=int, default=5, help="turnos por sessão")
+    parser.add_argument("--max-llm", type=int, default=32, help="turnos concorrentes no LLM")
+    parser.add_argument("--token-ms", type=float, default=20.0, help="latência por token do LLM fake")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--data-dir", default="bench_data")
+    args = parser.parse_args()
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    engine = create_dataset(os.path.join(args.data_dir, f"vehicles_{args.rows}.db"), args.rows)
+    Session = sessionmaker(bind=engine)
+
+    def bench_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    mcp_app.dependency_overrides[get_read_db] = bench_db
+    mcp_server = start_server(mcp_app)
+
+    print(f"{'sessões':>8}{'turnos/s':>10}{'1º token p50':>14}{'p95':>8}"
+          f"{'turno p50':>11}{'p95':>8}{'p99':>8}{'pico LLM':>10}")
+    try:
+        for sessions in args.sessions:
+            llm = fake_llm(sleep=args.token_ms / 1000)
+            service = AgentService(
+                agent_factory=lambda: VehicleAgent(api_key="fake", llm=llm),
+                mcp_client=MCPClient(server_url=server_url(mcp_server), max_connections=args.max_llm),
+                max_sessions=sessions,
+                max_concurrent_llm=args.max_llm
+            )
+            agent_server = start_server(create_app(service))
+            try:
+                samples, elapsed = asyncio.run(_drive(server_url(agent_server), sessions, args.turns))
+            finally:
+                agent_server.should_exit = True
+
+            first = [s[0] for s in samples]
+            turn = [s[1] for s in samples]
+            print(f"{sessions:>8}{len(samples) / elapsed:>10.1f}"
+                  f"{statistics.median(first):>14.1f}{_percentile(first, 0.95):>8.1f}"
+                  f"{statistics.median(turn):>11.1f}{_percentile(turn, 0.95):>8.1f}{_percentile(turn, 0.99):>8.1f}"
+                  f"{service.peak_llm_turns:>10}")
+    finally:
+        mcp_server.should_exit = True
+        mcp_app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    main()
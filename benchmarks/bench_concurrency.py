@@ -0,0 +1,102 @@
+"""Benchmark de concorrência do /search: query inline (bloqueia o loop) vs pool de threads.
+
+Sobe o servidor MCP apontando para um banco sintético e mede o throughput
+com N clientes concorrentes. O cache de resultados é desligado para que
+toda requisição vá ao banco.
+
+Uso:
+    python -m benchmarks.bench_concurrency --rows 200000 --clients 1 2 4 8 16 32
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import statistics
+import time
+from typing import List, Tuple
+
+import httpx
+from sqlalchemy.orm import sessionmaker
+
+from app.database import configure_db_executor, get_read_db
+from benchmarks.bench_search_engine import QUERIES
+from benchmarks.dataset import create_dataset
+from benchmarks.server import server_url, start_server
+from mcp_server.server import app, search_cache
+
+
+async def _drive(url: str, clients: int, requests_per_client: int) -> Tuple[float, float]:
+    """Retorna (requisições/segundo, latência p50 do /health em ms) sob carga.
+
+    O /health não toca no banco: se ele fica lento, é porque o event loop
+    do servidor está bloqueado por queries síncronas.
+    """
+    queries = itertools.cycle(QUERIES.values())
+    limits = httpx.Limits(max_connections=clients + 1, max_keepalive_connections=clients + 1)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60.0) as http:
+        async def client():
+            for _ in range(requests_per_client):
+                response = await http.post("/search", json=next(queries))
+                response.raise_for_status()
+
+        async def probe(done: asyncio.Event, samples: List[float]):
+            while not done.is_set():
+                started = time.perf_counter()
+                await http.get("/health")
+                samples.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(0.01)
+
+        await client()  # aquecimento
+        done, samples = asyncio.Event(), []
+        prober = asyncio.create_task(probe(done, samples))
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await prober
+    return clients * requests_per_client / elapsed, statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--requests", type=int, default=20, help="requisições por cliente")
+    parser.add_argument("--pool-size", type=int, default=8)
+    parser.add_argument("--data-dir", default="bench_data")
+    args = parser.parse_args()
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    engine = create_dataset(os.path.join(args.data_dir, f"vehicles_{args.rows}.db"), args.rows)
+    Session = sessionmaker(bind=engine)
+
+    def bench_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_read_db] = bench_db
+    search_cache.max_entries = 0
+    server = start_server(app)
+    url = server_url(server)
+
+    try:
+        print(f"{'':>9}{'inline':>26}{f'pool de {args.pool_size} threads':>28}")
+        print(f"{'clientes':>9}" + f"{'req/s':>12}{'health p50 ms':>14}" * 2)
+        for clients in args.clients:
+            line = f"{clients:>9}"
+            for size in (0, args.pool_size):
+                configure_db_executor(size)
+                throughput, health_ms = asyncio.run(_drive(url, clients, args.requests))
+                line += f"{throughput:>12.1f}{health_ms:>14.2f}"
+            print(line)
+    finally:
+        server.should_exit = True
+        app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    main()
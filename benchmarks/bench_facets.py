@@ -0,0 +1,113 @@
+"""Benchmark: contagens por faceta (/facets) com cubo de contagens vs GROUP BY na tabela.
+
+Uso:
+    python -m benchmarks.bench_facets --rows 2000000
+
+Mede a criação do índice de facetas, a latência de `facet_counts` com e
+sem o cubo para filtros típicos e o custo extra dos triggers nas escritas.
+O banco sintético fica em `--data-dir` e é reaproveitado entre execuções.
+"""
+import argparse
+import os
+import statistics
+import time
+
+from sqlalchemy.orm import sessionmaker
+
+from app.index import set_table_present
+from app.index.facets import FACETS_TABLE, create_facet_index, facet_counts
+from benchmarks.dataset import create_dataset
+from scripts.seed_database import generate_rows
+
+QUERIES = {
+    "tudo": dict(),
+    "marca": dict(marca="Toyota"),
+    "marca_parcial": dict(marca="toy"),
+    "familia": dict(preco_max=60000, ano_min=2018),
+    "preco_cortado": dict(preco_min=35500, preco_max=87250.5),
+    "enums": dict(combustivel="Flex", transmissao="Automática"),
+    "todos_filtros": dict(
+        marca="Toyota", modelo="Corolla", ano_min=2015, ano_max=2020,
+        preco_min=40000, preco_max=90000, combustivel="Flex", transmissao="Automática"
+    ),
+}
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def _drop_facet_index(engine) -> None:
+    with engine.begin() as conn:
+        for suffix in ("ai", "ad", "au"):
+            conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {FACETS_TABLE}_{suffix}")
+        conn.exec_driver_sql(f"DROP TABLE IF EXISTS {FACETS_TABLE}")
+    set_table_present(engine, FACETS_TABLE, None)
+
+
+def _insert_ms(engine, rows) -> float:
+    """Tempo para inserir `rows` numa transação desfeita ao final."""
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        started = time.perf_counter()
+        cursor.executemany(
+            "INSERT INTO vehicles (id, marca, modelo, ano, motorizacao, combustivel, cor, "
+            "quilometragem, portas, transmissao, preco, proprietarios, placa) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        elapsed = (time.perf_counter() - started) * 1000
+        raw.rollback()
+    finally:
+        raw.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--inserts", type=int, default=20_000, help="linhas inseridas no teste de escrita")
+    parser.add_argument("--data-dir", default="bench_data")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    engine = create_dataset(os.path.join(args.data_dir, f"vehicles_{args.rows}.db"), args.rows)
+    _drop_facet_index(engine)
+    new_rows = [(None, *row[1:-1], f"BENCH{i}") for i, row in enumerate(generate_rows(args.rows, args.inserts, seed=7))]
+    insert_plain = _insert_ms(engine, new_rows)
+
+    started = time.perf_counter()
+    create_facet_index(engine)
+    build_ms = (time.perf_counter() - started) * 1000
+    with engine.connect() as conn:
+        cells = conn.exec_driver_sql(f"SELECT COUNT(*) FROM {FACETS_TABLE}").scalar()
+    insert_triggers = _insert_ms(engine, new_rows)
+
+    db = sessionmaker(bind=engine)()
+    print(f"\n== {args.rows:,} linhas: cubo com {cells:,} células criado em {build_ms:.0f} ms ==")
+    print(f"{'consulta':<16}{'tabela (ms)':>13}{'cubo (ms)':>11}{'speedup':>10}  paridade")
+    for name, filters in QUERIES.items():
+        set_table_present(engine, FACETS_TABLE, False)
+        expected = facet_counts(db, **filters)
+        scan_ms = _time(lambda: facet_counts(db, **filters), args.repeat)
+        set_table_present(engine, FACETS_TABLE, True)
+        got = facet_counts(db, **filters)
+        cube_ms = _time(lambda: facet_counts(db, **filters), args.repeat)
+        parity = "ok" if got == expected else "DIFERENTE"
+        print(f"{name:<16}{scan_ms:>13.1f}{cube_ms:>11.1f}{scan_ms / cube_ms:>9.1f}x  {parity}")
+    db.close()
+
+    print(f"\nInserção de {args.inserts:,} linhas: {insert_plain:.0f} ms sem triggers, "
+          f"{insert_triggers:.0f} ms com triggers (+{(insert_triggers / insert_plain - 1) * 100:.0f}%)")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
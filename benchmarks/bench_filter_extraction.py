@@ -0,0 +1,75 @@
+"""Extração de filtros: extrator por regras vs LLM (concordância e latência).
+
+Roda o corpus de `tests/data/filter_corpus.json` pelo extrator por regras.
+Com `--llm`, roda também cada mensagem pela extração com LLM (exige
+OPENAI_API_KEY) e compara com ela; sem `--llm`, compara com os rótulos do
+corpus.
+
+Uso:
+    python -m benchmarks.bench_filter_extraction --llm
+"""
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+from langchain.schema import HumanMessage
+
+from agent.filter_parser import FilterParser
+
+CORPUS_PATH = Path(__file__).resolve().parent.parent / "tests" / "data" / "filter_corpus.json"
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--llm", action="store_true", help="compara com a extração via LLM")
+    args = parser.parse_args()
+
+    corpus = json.loads(CORPUS_PATH.read_text(encoding="utf-8"))
+    rules = FilterParser()
+
+    agent = None
+    if args.llm:
+        from agent.agent import VehicleAgent
+        from app.config import OPENAI_API_KEY
+        agent = VehicleAgent(api_key=OPENAI_API_KEY, fast_extraction=False)
+
+    confident = agreed = 0
+    rule_ms, llm_ms = [], []
+    for case in corpus:
+        result, elapsed = _timed(rules.parse, case["message"])
+        rule_ms.append(elapsed)
+
+        expected = case["filters"]
+        if agent is not None:
+            agent.conversation_history[1:] = [HumanMessage(content=case["message"])]
+            expected, elapsed = _timed(agent.extract_filters)
+            llm_ms.append(elapsed)
+
+        if result.confidence >= rules.min_confidence:
+            confident += 1
+            if result.filters == expected:
+                agreed += 1
+            else:
+                print(f"divergência: {case['message']!r}: regras={result.filters} esperado={expected}")
+
+    reference = "LLM" if agent else "rótulos"
+    print(f"mensagens: {len(corpus)}")
+    print(f"resolvidas por regras: {confident} ({confident / len(corpus):.0%})")
+    print(f"concordância com {reference}: {agreed}/{confident}")
+    print(f"regras: média {statistics.fmean(rule_ms):.3f} ms")
+    if llm_ms:
+        mean_llm = statistics.fmean(llm_ms)
+        print(f"LLM: média {mean_llm:.1f} ms")
+        print(f"economia média por extração: {mean_llm * confident / len(corpus):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Tokens de prompt por turno: histórico sem limite vs orçamento com resumo.
+
+Roda uma sessão roteirizada contra um LLM fake (sem API) e mede os tokens
+estimados enviados na chamada de chat de cada turno (a que carrega o
+histórico) e o total do turno (incluindo a extração de filtros).
+
+Uso:
+    python -m benchmarks.bench_history --turns 50 --max-tokens 1000 --keep-turns 4
+"""
+import argparse
+import sys
+
+from agent.agent import VehicleAgent
+from agent.history import HistoryManager
+from benchmarks.fake_llm import fake_llm, scripted_session
+
+
+def run_session(history: HistoryManager, turns: int):
+    """Retorna (tokens do chat por turno, tokens totais por turno, tamanho final do histórico)."""
+    llm = fake_llm()
+    agent = VehicleAgent(api_key="fake", llm=llm, fast_extraction=False, history=history)
+    chat, total = [], []
+    for message in scripted_session(turns):
+        before = len(llm.calls)
+        agent.chat_turn(message)
+        tokens = llm.prompt_tokens()[before:]
+        chat.append(tokens[0])
+        total.append(sum(tokens))
+    return chat, total, len(agent.conversation_history)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--max-tokens", type=int, default=1000)
+    parser.add_argument("--keep-turns", type=int, default=4)
+    args = parser.parse_args()
+
+    sessions = {
+        "sem limite": run_session(HistoryManager(max_tokens=sys.maxsize), args.turns),
+        "orçamento": run_session(HistoryManager(args.max_tokens, args.keep_turns), args.turns),
+    }
+
+    print(f"{'':>6}" + "".join(f"{name:>24}" for name in sessions))
+    print(f"{'turno':>6}" + f"{'chat':>12}{'turno':>12}" * len(sessions))
+    for turn in sorted(set(range(0, args.turns, 5)) | {args.turns - 1}):
+        print(f"{turn + 1:>6}" + "".join(f"{chat[turn]:>12}{total[turn]:>12}" for chat, total, _ in sessions.values()))
+    print(f"{'soma':>6}" + "".join(f"{sum(chat):>12}{sum(total):>12}" for chat, total, _ in sessions.values()))
+    print("mensagens no histórico ao final: " + ", ".join(
+        f"{name} {size}" for name, (_, _, size) in sessions.items()
+    ))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""Teste de carga do /search: throughput e latência p50/p95/p99 por tamanho de base e concorrência.
+
+Uso:
+    python -m benchmarks.bench_load --sizes 10000 200000 1000000 --concurrency 1 8 32 --duration 20
+    python -m benchmarks.bench_load --output atual.json --compare base.json --tolerance 0.2
+
+Para cada tamanho, gera (ou reaproveita) o banco sintético com o esquema
+do `scripts/init_db.py` e aponta para ele o pool de leitura do app. Em
+seguida, N clientes em laço fechado mandam buscas ao `mcp_server.server.app`
+durante `--duration` segundos. As buscas são sorteadas de um mix ponderado
+de cenários, modelado nos testes de tests/test_mcp.py, com parâmetros
+variados. Por padrão vai por HTTP (uvicorn numa thread); `--transport asgi`
+chama o app direto. O cache de buscas fica desligado (`--cache` liga).
+Não há chamadas a LLM.
+
+Cliente e servidor dividem o processo: compare resultados da mesma máquina.
+O JSON de `--output` traz o ambiente e as métricas de cada execução;
+`--compare` aponta regressões de throughput ou p95 acima da tolerância
+contra um JSON anterior e sai com código 1 (para CI).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, NamedTuple
+
+import httpx
+
+from app import config
+from app.catalog import MARCAS, MODELOS
+from app.models.vehicle import FuelType, TransmissionType, Vehicle
+
+
+class Scenario(NamedTuple):
+    name: str
+    weight: int
+    payload: Callable[[random.Random], Dict[str, Any]]
+
+
+def _brand(rng: random.Random) -> str:
+    return rng.choice(MARCAS)
+
+
+def _year(rng: random.Random, low: int = 2010, high: int = 2024) -> int:
+    return rng.randint(low, high)
+
+
+def _price_range(rng: random.Random) -> Dict[str, Any]:
+    low = rng.randrange(20_000, 120_000, 5_000)
+    return {"preco_min": low, "preco_max": low + 20_000}
+
+
+def _year_range(rng: random.Random) -> Dict[str, Any]:
+    low = _year(rng, 2010, 2020)
+    return {"ano_min": low, "ano_max": low + rng.randint(0, 5)}
+
+
+def _all_filters(rng: random.Random) -> Dict[str, Any]:
+    marca = _brand(rng)
+    ano_min = _year(rng, 2012, 2020)
+    preco_min = rng.randrange(20_000, 80_000, 5_000)
+    return {
+        "marca": marca, "modelo": rng.choice(MODELOS[marca]), "ano_min": ano_min, "ano_max": ano_min + 5,
+        "preco_min": preco_min, "preco_max": preco_min + 50_000,
+        "combustivel": rng.choice(list(FuelType)).value, "transmissao": rng.choice(list(TransmissionType)).value,
+    }
+
+
+# Cenários de tests/test_mcp.py; pesos aproximam o que o agente mais pede
+# (marca e faixa de preço/ano), com as ordenações do cliente
+MIX = [
+    Scenario("marca", 15, lambda rng: {"marca": _brand(rng)}),
+    Scenario("marca_parcial", 5, lambda rng: {"marca": _brand(rng)[:3].lower()}),
+    Scenario("faixa_preco", 10, _price_range),
+    Scenario("faixa_ano", 8, _year_range),
+    Scenario("marca_ano_preco", 15, lambda rng: {
+        "marca": _brand(rng), "ano_min": _year(rng, 2015, 2021), "preco_max": rng.randrange(50_000, 150_000, 10_000)}),
+    Scenario("familia", 10, lambda rng: {
+        "preco_max": rng.choice([50_000, 60_000, 80_000]), "ano_min": _year(rng, 2015, 2020), "sort": "preco_asc"}),
+    Scenario("luxo", 5, lambda rng: {
+        "marca": rng.choice(["BMW", "Mercedes-Benz"]), "preco_min": 100_000, "sort": "preco_desc"}),
+    Scenario("seminovo", 8, lambda rng: {"ano_min": _year(rng, 2020, 2024), "sort": "quilometragem_asc"}),
+    Scenario("combustivel", 6, lambda rng: {"combustivel": rng.choice(list(FuelType)).value, "sort": "ano_desc"}),
+    Scenario("transmissao", 6, lambda rng: {"transmissao": rng.choice(list(TransmissionType)).value}),
+    Scenario("todos_filtros", 5, _all_filters),
+    Scenario("relevancia", 5, lambda rng: {"marca": _brand(rng), "ano_min": _year(rng, 2016, 2022), "sort": "relevancia"}),
+    Scenario("sem_filtros", 2, lambda rng: {}),
+]
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    """Percentil por posição mais próxima (lista já ordenada)."""
+    if not ordered:
+        return float("nan")
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+
+def _summary(latencies: List[float]) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "p50_ms": _percentile(ordered, 50),
+        "p95_ms": _percentile(ordered, 95),
+        "p99_ms": _percentile(ordered, 99),
+        "max_ms": ordered[-1] if ordered else float("nan"),
+    }
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    concurrency: int,
+    duration: float,
+    seed: int = 0,
+    mix: List[Scenario] = MIX
+) -> Dict[str, Any]:
+    """N clientes em laço fechado por `duration` segundos; retorna as métricas."""
+    weights = [scenario.weight for scenario in mix]
+    samples: Dict[str, List[float]] = {scenario.name: [] for scenario in mix}
+    errors = [0]
+    deadline = time.perf_counter() + duration
+
+    async def worker(rng: random.Random) -> None:
+        while time.perf_counter() < deadline:
+            scenario = rng.choices(mix, weights)[0]
+            payload = {**scenario.payload(rng), "limit": rng.choice([10, 10, 20, 50])}
+            started = time.perf_counter()
+            try:
+                response = await client.post("/search", json=payload)
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                samples[scenario.name].append((time.perf_counter() - started) * 1000)
+            else:
+                errors[0] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(random.Random(seed * 1000 + i)) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    everything = [latency for per_scenario in samples.values() for latency in per_scenario]
+    return {
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "errors": errors[0],
+        "throughput_rps": len(everything) / elapsed,
+        **_summary(everything),
+        "scenarios": {name: _summary(latencies) for name, latencies in samples.items() if latencies},
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressões de `current` contra `baseline` nas mesmas (linhas, concorrência)."""
+    before = {(r["rows"], r["concurrency"]): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        key = (result["rows"], result["concurrency"])
+        if key not in before:
+            continue
+        old = before[key]
+        label = f"{result['rows']:,} linhas x {result['concurrency']} clientes"
+        if result["throughput_rps"] < old["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{label}: throughput {old['throughput_rps']:.1f} -> {result['throughput_rps']:.1f} req/s")
+        if result["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{label}: p95 {old['p95_ms']:.1f} -> {result['p95_ms']:.1f} ms")
+        if result["errors"] > old["errors"]:
+            regressions.append(f"{label}: erros {old['errors']} -> {result['errors']}")
+    return regressions
+
+
+def _environment(args: argparse.Namespace) -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "transport": args.transport,
+        "duration": args.duration,
+        "cache": args.cache,
+        "seed": args.seed,
+        "search_engine": config.SEARCH_ENGINE,
+        "storage_profile": config.DB_STORAGE_PROFILE,
+        "fast_serialization": config.SEARCH_FAST_SERIALIZATION,
+        "mix": {scenario.name: scenario.weight for scenario in MIX},
+    }
+
+
+def _prepare(path: str, rows: int) -> None:
+    """Banco sintético com os índices do modelo e o índice de texto, como o init_db."""
+    from app.index.text import create_text_index
+    from benchmarks.dataset import create_dataset
+
+    engine = create_dataset(path, rows)
+    for index in Vehicle.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+    create_text_index(engine)
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 200_000, 1_000_000])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=20, help="segundos por nível de concorrência")
+    parser.add_argument("--warmup", type=float, default=2, help="segundos de aquecimento por base")
+    parser.add_argument("--transport", choices=("http", "asgi"), default="http")
+    parser.add_argument("--cache", action="store_true", help="mantém o cache de buscas ligado")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default="bench_data")
+    parser.add_argument("--output", default=None, help="JSON com ambiente e resultados")
+    parser.add_argument("--compare", default=None, help="JSON de uma execução anterior")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="piora relativa aceita no --compare")
+    args = parser.parse_args()
+
+    from app.database import create_db_engine, get_read_db
+    from benchmarks.server import server_url, start_server
+    from mcp_server.server import app, search_cache
+    from sqlalchemy.orm import sessionmaker
+
+    if not args.cache:
+        search_cache.max_entries = 0
+    os.makedirs(args.data_dir, exist_ok=True)
+    report = {"environment": _environment(args), "results": []}
+
+    async def drive(concurrency: int, duration: float) -> Dict[str, Any]:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        if server is not None:
+            client = httpx.AsyncClient(base_url=server_url(server), limits=limits, timeout=60.0)
+        else:
+            transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+            client = httpx.AsyncClient(base_url="http://mcp", transport=transport, timeout=60.0)
+        async with client:
+            return await run_load(client, concurrency, duration, seed=args.seed)
+
+    paths = {rows: os.path.join(args.data_dir, f"vehicles_{rows}.db") for rows in args.sizes}
+    for rows, path in paths.items():
+        _prepare(path, rows)
+    server = start_server(app) if args.transport == "http" else None
+
+    print(f"{'linhas':>10}{'clientes':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'erros':>7}")
+    try:
+        for rows, path in paths.items():
+            engine = create_db_engine(f"sqlite:///{path}", read_only=True, pool_size=max(args.concurrency))
+            Session = sessionmaker(bind=engine)
+
+            def bench_db():
+                db = Session()
+                try:
+                    yield db
+                finally:
+                    db.close()
+
+            app.dependency_overrides[get_read_db] = bench_db
+            search_cache.clear()
+            asyncio.run(drive(max(args.concurrency), args.warmup))
+            for concurrency in args.concurrency:
+                result = {"rows": rows, **asyncio.run(drive(concurrency, args.duration))}
+                report["results"].append(result)
+                print(f"{rows:>10,}{concurrency:>9}{result['throughput_rps']:>9.1f}{result['p50_ms']:>9.1f}"
+                      f"{result['p95_ms']:>9.1f}{result['p99_ms']:>9.1f}{result['errors']:>7}")
+            app.dependency_overrides.clear()
+            engine.dispose()
+    finally:
+        app.dependency_overrides.clear()
+        if server is not None:
+            server.should_exit = True
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Resultados em {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(json.load(f), report, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSÃO {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"Sem regressões acima de {args.tolerance:.0%} em relação a {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Micro-benchmark: latência por chamada do MCPClient (por chamada, pool, no processo).
+
+Sobe o servidor MCP com uvicorn numa porta local e mede chamadas
+sequenciais de /health e /search: um cliente por chamada, o pool
+keep-alive e o cliente no processo (`MCPClient.in_process`, sem sockets).
+Também mede o tempo até o servidor responder em cada modo.
+
+Uso:
+    python -m benchmarks.bench_mcp_client --calls 500
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from benchmarks.server import free_port, server_url, start_server
+from mcp_client.client import MCPClient
+
+SEARCH_FILTERS = {"marca": "Toyota", "preco_max": 100000}
+
+
+async def _per_call(url: str, path: str, payload) -> None:
+    """Comportamento antigo: um AsyncClient (e uma conexão TCP) por chamada."""
+    async with httpx.AsyncClient() as client:
+        if payload is None:
+            response = await client.get(f"{url}{path}", timeout=10.0)
+        else:
+            response = await client.post(f"{url}{path}", json=payload, timeout=30.0)
+        response.raise_for_status()
+
+
+async def _measure(call, calls: int) -> dict:
+    await call()  # aquecimento
+    samples = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        await call()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "p50": statistics.median(samples),
+        "p95": samples[int(len(samples) * 0.95) - 1],
+        "mean": statistics.fmean(samples),
+    }
+
+
+async def startup() -> None:
+    """Tempo até o primeiro /health responder: uvicorn + sondagem vs no processo."""
+    import mcp_server.server  # noqa: F401 - importação do app fica fora da medida nos dois modos
+
+    started = time.perf_counter()
+    async with MCPClient.in_process() as client:
+        await client.health_check()
+    asgi_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    port = free_port()
+    server = start_server(port=port, wait=False)
+    async with MCPClient(server_url=f"http://127.0.0.1:{port}") as client:
+        await client.wait_until_ready()
+    http_ms = (time.perf_counter() - started) * 1000
+    server.should_exit = True
+    print(f"Inicialização: asgi {asgi_ms:.0f} ms, http {http_ms:.0f} ms (antes: sleep fixo de 3000 ms)\n")
+
+
+async def run(url: str, calls: int) -> None:
+    async with MCPClient(server_url=url) as pooled, MCPClient.in_process() as local:
+        cases = {
+            "health/por-chamada": lambda: _per_call(url, "/health", None),
+            "health/pool": pooled.health_check,
+            "health/asgi": local.health_check,
+            "search/por-chamada": lambda: _per_call(url, "/search", SEARCH_FILTERS),
+            "search/pool": lambda: pooled.search_vehicles(SEARCH_FILTERS),
+            "search/asgi": lambda: local.search_vehicles(SEARCH_FILTERS),
+        }
+        print(f"{'caso':<22}{'p50 (ms)':>10}{'p95 (ms)':>10}{'média (ms)':>12}")
+        for name, call in cases.items():
+            stats = await _measure(call, calls)
+            print(f"{name:<22}{stats['p50']:>10.3f}{stats['p95']:>10.3f}{stats['mean']:>12.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=500)
+    args = parser.parse_args()
+
+    asyncio.run(startup())
+    server = start_server()
+    try:
+        asyncio.run(run(server_url(server), args.calls))
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Benchmark: busca SQL (VehicleController) vs índice colunar em memória.
+
+Uso:
+    python -m benchmarks.bench_search_engine --sizes 10000 1000000 10000000
+
+Os bancos sintéticos ficam em `--data-dir` e são reaproveitados entre
+execuções com o mesmo número de linhas.
+"""
+import argparse
+import os
+import statistics
+import time
+
+from sqlalchemy.orm import sessionmaker
+
+from app.controllers.vehicle_controller import VehicleController
+from app.index.columnar import ColumnarIndex
+from benchmarks.dataset import create_dataset
+
+# Combinações de filtros inspiradas nos cenários de tests/test_mcp.py
+QUERIES = {
+    "marca": dict(marca="Toyota"),
+    "marca_parcial": dict(marca="toy"),
+    "familia": dict(preco_max=60000, ano_min=2018, limit=20),
+    "luxo": dict(marca="BMW", preco_min=100000),
+    "seminovo": dict(ano_min=2021),
+    "combustivel": dict(combustivel="Flex"),
+    "todos_filtros": dict(
+        marca="Toyota", modelo="Corolla", ano_min=2015, ano_max=2020,
+        preco_min=40000, preco_max=90000, combustivel="Flex", transmissao="Automática"
+    ),
+    "raro": dict(marca="Jeep", combustivel="Elétrico", transmissao="CVT", ano_min=2024, limit=100),
+}
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def run(size: int, data_dir: str, repeat: int) -> None:
+    engine = create_dataset(os.path.join(data_dir, f"vehicles_{size}.db"), size)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    index = ColumnarIndex()
+
+    started = time.perf_counter()
+    index.refresh(db)
+    load_ms = (time.perf_counter() - started) * 1000
+
+    print(f"\n== {size:,} linhas (carga do índice: {load_ms:.0f} ms) ==")
+    print(f"{'consulta':<16}{'sql (ms)':>12}{'colunar (ms)':>14}{'speedup':>10}  paridade")
+    for name, filters in QUERIES.items():
+        expected = {v.id for v in VehicleController.search_vehicles(db, **filters)}
+        got = {v.id for v in index.search(db, **filters)}
+        # Sem ORDER BY o SQLite pode escolher outras linhas quando há mais
+        # resultados que `limit`; a paridade exata vale quando não há corte.
+        limit = filters.get("limit", 10)
+        parity = "ok" if expected == got else ("corte" if len(expected) == limit else "DIFERENTE")
+
+        sql_ms = _time(lambda: VehicleController.search_vehicles(db, **filters), repeat)
+        col_ms = _time(lambda: index.search(db, **filters), repeat)
+        print(f"{name:<16}{sql_ms:>12.2f}{col_ms:>14.2f}{sql_ms / col_ms:>9.1f}x  {parity}")
+
+    db.close()
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument("--data-dir", default="bench_data")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    for size in args.sizes:
+        run(size, args.data_dir, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
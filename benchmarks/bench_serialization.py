@@ -0,0 +1,110 @@
+"""Benchmark: serialização do /search (Pydantic por linha vs tuplas + orjson).
+
+Uso:
+    python -m benchmarks.bench_serialization --requests 500 --limit 100
+
+Mede o /search de ponta a ponta no processo (ASGI, sem rede e com o cache
+de buscas desligado) nos dois modos de SEARCH_FAST_SERIALIZATION, e só a
+etapa de serialização (linhas já lidas -> bytes JSON) para isolar o custo
+de CPU. As respostas dos dois modos são comparadas byte a byte.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy.orm import sessionmaker
+
+from app.controllers.vehicle_controller import VehicleController
+from app.database import engine
+from mcp_client.client import MCPClient
+from mcp_server import server
+from mcp_server.cache import SearchCache
+from mcp_server.schemas import VehicleResponse
+from mcp_server.serialization import VEHICLE_COLUMNS, dumps, vehicle_dicts
+
+RESPONSE_MODEL = TypeAdapter(list[VehicleResponse])
+
+QUERIES = [
+    {"preco_max": 150000},
+    {"marca": "Toyota"},
+    {"ano_min": 2018, "sort": "preco_asc"},
+    {"combustivel": "Flex", "sort": "ano_desc"},
+]
+
+
+def _set_mode(fast: bool) -> None:
+    server.SEARCH_FAST_SERIALIZATION = fast
+    server._COLUMNS = VEHICLE_COLUMNS if fast else None
+
+
+async def _requests(count: int, limit: int) -> tuple:
+    bodies = []
+    async with MCPClient.in_process() as client:
+        started = time.perf_counter()
+        for i in range(count):
+            response = await client.client.post("/search", json={**QUERIES[i % len(QUERIES)], "limit": limit})
+            response.raise_for_status()
+            if i < len(QUERIES):
+                bodies.append(response.content)
+        elapsed = time.perf_counter() - started
+    return elapsed, bodies
+
+
+def _encode_only(limit: int, repeat: int) -> dict:
+    """ms para transformar `limit` linhas já lidas em bytes JSON."""
+    db = sessionmaker(bind=engine)()
+    vehicles = VehicleController.search_vehicles(db, preco_max=150000, limit=limit)
+    rows = VehicleController.search_vehicles(db, preco_max=150000, limit=limit, columns=VEHICLE_COLUMNS)
+
+    def pydantic():
+        # Caminho padrão: model_validate por linha, revalidação pelo response_model e JSONResponse
+        dicts = [VehicleResponse.model_validate(v).model_dump() for v in vehicles]
+        return JSONResponse(RESPONSE_MODEL.dump_python(RESPONSE_MODEL.validate_python(dicts), mode="json")).body
+
+    def fast():
+        return dumps(vehicle_dicts(rows))
+
+    assert pydantic() == fast()
+    times = {}
+    for name, fn in (("pydantic", pydantic), ("tuplas+orjson", fast)):
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - started) * 1000)
+        times[name] = statistics.median(samples)
+    db.close()
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    server.search_cache = SearchCache(max_entries=0)
+    results = {}
+    for fast in (False, True):
+        _set_mode(fast)
+        asyncio.run(_requests(20, args.limit))  # aquecimento
+        results[fast] = asyncio.run(_requests(args.requests, args.limit))
+
+    (slow_s, slow_bodies), (fast_s, fast_bodies) = results[False], results[True]
+    print(f"/search com limit={args.limit}, {args.requests} requisições no processo (sem cache)")
+    print(f"{'modo':<16}{'req/s':>10}{'ms/req':>10}")
+    print(f"{'pydantic':<16}{args.requests / slow_s:>10.0f}{slow_s * 1000 / args.requests:>10.2f}")
+    print(f"{'tuplas+orjson':<16}{args.requests / fast_s:>10.0f}{fast_s * 1000 / args.requests:>10.2f}")
+    print(f"speedup: {slow_s / fast_s:.1f}x  |  JSON idêntico: {'sim' if slow_bodies == fast_bodies else 'NÃO'}")
+
+    times = _encode_only(args.limit, repeat=200)
+    print(f"\nSó serialização de {args.limit} linhas: pydantic {times['pydantic']:.3f} ms, "
+          f"tuplas+orjson {times['tuplas+orjson']:.3f} ms "
+          f"({times['pydantic'] / times['tuplas+orjson']:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
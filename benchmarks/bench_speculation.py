@@ -0,0 +1,110 @@
+"""Benchmark da busca especulativa: latência do turno com e sem prefetch.
+
+Sobe o servidor MCP (banco sintético, cache de resultados desligado) e
+envia as mensagens de `tests/data/filter_corpus.json` a um agente em modo
+tool calling. O LLM fake gera a resposta com latência configurável por
+token e devolve os filtros rotulados do corpus na tool call, ao fim do
+stream. Mede o tempo do envio da mensagem até os resultados da busca, a
+taxa de acerto da especulação (previsão do extrator por regras vs
+filtros do LLM) e o tempo economizado.
+
+Uso:
+    python -m benchmarks.bench_speculation --token-ms 20 --rows 200000
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from typing import List, Optional
+
+from langchain.schema import AIMessage
+from sqlalchemy.orm import sessionmaker
+
+from agent.agent import SEARCH_TOOL_NAME, VehicleAgent
+from agent.search import SpeculativeSearch, run_search
+from app.database import get_read_db
+from benchmarks.bench_filter_extraction import CORPUS_PATH
+from benchmarks.dataset import create_dataset
+from benchmarks.fake_llm import fake_llm
+from benchmarks.server import server_url, start_server
+from mcp_client.client import MCPClient
+from mcp_server.server import app, search_cache
+
+
+REPLY = "Certo! Vou buscar as opções que combinam com o seu pedido no estoque. Um momento..."
+
+
+def _tool_reply(filters) -> AIMessage:
+    return AIMessage(content=REPLY, tool_calls=[{"name": SEARCH_TOOL_NAME, "id": "1", "args": filters}])
+
+
+async def _conversation(url: str, corpus, token_ms: float, speculate: bool):
+    """Retorna (latências dos turnos com busca em ms, speculator ou None)."""
+    llm = fake_llm(*(_tool_reply(item["filters"]) for item in corpus), sleep=token_ms / 1000)
+    agent = VehicleAgent(api_key="fake", tool_calling=True, llm=llm)
+    samples: List[float] = []
+    async with MCPClient(server_url=url) as mcp_client:
+        speculator: Optional[SpeculativeSearch] = SpeculativeSearch(mcp_client) if speculate else None
+        for message in (item["message"] for item in corpus):
+            started = time.perf_counter()
+            speculation = speculator.start(message, agent.filter_parser) if speculator else None
+            search_task = None
+            async for _ in agent.chat_stream(message):
+                if search_task is None and agent.pending_filters is not None:
+                    search_task = asyncio.create_task(run_search(mcp_client, agent.pending_filters, speculation))
+            if search_task is None and agent.pending_filters is not None:
+                search_task = asyncio.create_task(run_search(mcp_client, agent.pending_filters, speculation))
+            if search_task is None:
+                if speculation is not None:
+                    speculation.discard()
+                continue
+            await search_task
+            samples.append((time.perf_counter() - started) * 1000)
+    return samples, speculator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--token-ms", type=float, default=20.0, help="latência por token do LLM fake")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--data-dir", default="bench_data")
+    args = parser.parse_args()
+
+    corpus = json.loads(CORPUS_PATH.read_text(encoding="utf-8"))
+    os.makedirs(args.data_dir, exist_ok=True)
+    engine = create_dataset(os.path.join(args.data_dir, f"vehicles_{args.rows}.db"), args.rows)
+    Session = sessionmaker(bind=engine)
+
+    def bench_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_read_db] = bench_db
+    search_cache.max_entries = 0
+    server = start_server(app)
+
+    try:
+        print(f"{'modo':<14}{'turnos c/ busca':>16}{'p50 ms':>9}{'média ms':>10}")
+        for speculate in (False, True):
+            samples, speculator = asyncio.run(
+                _conversation(server_url(server), corpus, args.token_ms, speculate)
+            )
+            label = "especulativo" if speculate else "sequencial"
+            print(f"{label:<14}{len(samples):>16}{statistics.median(samples):>9.1f}"
+                  f"{statistics.mean(samples):>10.1f}")
+        stats = speculator.stats()
+        print(f"\nespeculações: {stats['speculative_searches']}  acertos: {stats['hits']}  "
+              f"erros: {stats['misses']}  descartadas: {stats['discarded']}  "
+              f"taxa de acerto: {stats['hit_rate']}  economia por acerto: {stats['saved_ms_per_hit']} ms")
+    finally:
+        server.should_exit = True
+        app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    main()
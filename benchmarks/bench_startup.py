@@ -0,0 +1,78 @@
+"""Benchmark: tempo de import de cada ponto de entrada e dependências pesadas carregadas.
+
+Cada módulo é importado num processo novo com `python -X importtime`, sem
+OPENAI_API_KEY. O relatório mostra o tempo do import e quais dependências
+pesadas vieram junto; tests/test_startup.py usa `profile_import` para
+barrar regressões (ex.: o servidor MCP voltar a carregar o LangChain).
+
+Uso:
+    python -m benchmarks.bench_startup --repeat 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import FrozenSet, List, NamedTuple, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Servidores e CLI, mais todo script em scripts/ (novos entram sozinhos)
+ENTRY_POINTS = ("main", "mcp_server.server", "agent_server.server") + tuple(
+    f"scripts.{name[:-3]}" for name in sorted(os.listdir(os.path.join(ROOT, "scripts")))
+    if name.endswith(".py") and name != "__init__.py"
+)
+HEAVY = frozenset({
+    "langchain", "langchain_core", "langchain_openai", "openai", "tiktoken",
+    "sqlalchemy", "fastapi", "uvicorn", "numpy", "faker", "httpx",
+})
+
+
+class ImportProfile(NamedTuple):
+    module: str
+    total_ms: float
+    packages: FrozenSet[str]  # pacotes de topo carregados pelo import
+
+    @property
+    def heavy(self) -> List[str]:
+        return sorted(self.packages & HEAVY)
+
+
+def profile_import(module: str) -> ImportProfile:
+    """Importa `module` num processo novo (sem OPENAI_API_KEY) e mede."""
+    env = dict(os.environ)
+    env.pop("OPENAI_API_KEY", None)
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, cwd=ROOT
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {module}:\n{process.stderr[-2000:]}")
+
+    total_us, packages = 0, set()
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        packages.add(name.split(".")[0])
+        if name == module:
+            total_us = int(cumulative)
+    return ImportProfile(module, total_us / 1000, frozenset(packages))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--modules", nargs="+", default=list(ENTRY_POINTS))
+    args = parser.parse_args(argv)
+
+    print(f"{'módulo':<24}{'import (ms)':>12}  dependências pesadas")
+    for module in args.modules:
+        profiles = [profile_import(module) for _ in range(args.repeat)]
+        total = statistics.median(p.total_ms for p in profiles)
+        print(f"{module:<24}{total:>12.0f}  {', '.join(profiles[0].heavy) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Benchmark: perfis de armazenamento do SQLite (DB_STORAGE_PROFILE) sob leitura e escrita mistas.
+
+Uso:
+    python -m benchmarks.bench_storage --rows 200000 --readers 4 --seconds 10
+
+Para cada perfil de `app.database.STORAGE_PROFILES`, numa cópia do banco
+sintético: N threads fazem buscas pelo pool só de leitura enquanto uma
+thread grava atualizações de preço, uma por transação, pela conexão de
+escrita. Mede buscas/s, latência p95, escritas/s e o tempo que o escritor
+passa esperando lock. Depois mede a carga em massa (`--load` linhas em
+transações de 10 mil) no mesmo perfil.
+"""
+import argparse
+import os
+import random
+import shutil
+import threading
+import time
+from typing import Dict, List
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.controllers.vehicle_controller import VehicleController
+from app.database import STORAGE_PROFILES, create_db_engine
+from benchmarks.bench_search_engine import QUERIES
+from benchmarks.dataset import create_dataset
+from scripts.seed_database import _INSERT_SQL, generate_rows
+
+
+def _mixed(url: str, profile: str, readers: int, seconds: float, rows: int) -> Dict[str, float]:
+    read_engine = create_db_engine(url, profile=profile, read_only=True, pool_size=readers)
+    write_engine = create_db_engine(url, profile=profile, pool_size=1, max_overflow=0)
+    queries = list(QUERIES.values())
+    latencies: List[List[float]] = [[] for _ in range(readers)]
+    writes = [0, 0]  # commits, erros de lock
+    write_wait = [0.0]
+    stop = threading.Event()
+
+    def reader(samples: List[float]) -> None:
+        rng = random.Random(len(samples))
+        while not stop.is_set():
+            started = time.perf_counter()
+            with Session(bind=read_engine) as db:
+                VehicleController.search_vehicles(db, **rng.choice(queries))
+            samples.append((time.perf_counter() - started) * 1000)
+
+    def writer() -> None:
+        rng = random.Random(0)
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                with write_engine.begin() as conn:
+                    conn.exec_driver_sql(
+                        "UPDATE vehicles SET preco = preco + 1 WHERE id = ?", (rng.randint(1, rows),)
+                    )
+                writes[0] += 1
+            except OperationalError:
+                writes[1] += 1
+            write_wait[0] += time.perf_counter() - started
+
+    threads = [threading.Thread(target=reader, args=(samples,)) for samples in latencies]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    samples = sorted(s for per_thread in latencies for s in per_thread)
+    read_engine.dispose()
+    write_engine.dispose()
+    return {
+        "reads": len(samples) / seconds,
+        "p95": samples[int(len(samples) * 0.95)] if samples else float("nan"),
+        "writes": writes[0] / seconds,
+        "errors": writes[1],
+        "write_ms": write_wait[0] * 1000 / max(writes[0] + writes[1], 1),
+    }
+
+
+def _bulk_load(url: str, profile: str, rows: int, count: int) -> float:
+    """Linhas/s inserindo `count` veículos em transações de 10 mil."""
+    engine = create_db_engine(url, profile=profile, pool_size=1, max_overflow=0)
+    data = generate_rows(rows * 2, count, seed=11)
+    started = time.perf_counter()
+    for offset in range(0, count, 10_000):
+        with engine.begin() as conn:
+            conn.exec_driver_sql(_INSERT_SQL, data[offset:offset + 10_000])
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+    return count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--load", type=int, default=100_000, help="linhas da carga em massa")
+    parser.add_argument("--profiles", nargs="+", default=list(STORAGE_PROFILES))
+    parser.add_argument("--data-dir", default="bench_data")
+    args = parser.parse_args()
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    source = os.path.join(args.data_dir, f"vehicles_{args.rows}.db")
+    create_dataset(source, args.rows).dispose()
+
+    print(f"\n== {args.rows:,} linhas, {args.readers} leitores + 1 escritor por {args.seconds:.0f}s ==")
+    print(f"{'perfil':<12}{'buscas/s':>10}{'p95 (ms)':>10}{'escritas/s':>12}{'ms/escrita':>12}"
+          f"{'locks':>7}{'carga (linhas/s)':>18}")
+    for profile in args.profiles:
+        path = os.path.join(args.data_dir, f"storage_{profile}.db")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        shutil.copyfile(source, path)
+        url = f"sqlite:///{path}"
+
+        mixed = _mixed(url, profile, args.readers, args.seconds, args.rows)
+        load = _bulk_load(url, profile, args.rows, args.load)
+        print(f"{profile:<12}{mixed['reads']:>10.0f}{mixed['p95']:>10.1f}{mixed['writes']:>12.0f}"
+              f"{mixed['write_ms']:>12.2f}{mixed['errors']:>7}{load:>18,.0f}")
+        os.remove(path)
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+if __name__ == "__main__":
+    main()
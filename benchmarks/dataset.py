@@ -0,0 +1,33 @@
+"""Geração de bancos SQLite sintéticos para benchmarks.
+
+Usa o modo em massa do `scripts/seed_database.py` (`seed_database_bulk`):
+linhas geradas em lote com NumPy, em processos, para chegar a milhões.
+"""
+import os
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+from app.database import Base
+from app.models.vehicle import Vehicle
+from scripts.seed_database import seed_database_bulk
+
+
+def create_dataset(path: str, rows: int, seed: int = 42, chunk_size: int = 50_000) -> Engine:
+    """Cria (ou reaproveita) um banco com `rows` veículos e retorna o engine."""
+    url = f"sqlite:///{path}"
+    if os.path.exists(path):
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        with engine.connect() as conn:
+            existing = conn.exec_driver_sql("SELECT COUNT(*) FROM vehicles").scalar()
+        if existing == rows:
+            return engine
+        engine.dispose()
+        os.remove(path)
+
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine, tables=[Vehicle.__table__])
+
+    print(f"Dataset {path}:")
+    seed_database_bulk(rows, chunk_size=chunk_size, seed=seed, engine=engine)
+    return engine
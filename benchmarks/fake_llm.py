@@ -0,0 +1,103 @@
+"""Chat model fake para benchmarks e testes do agente (sem chamadas à API)."""
+import asyncio
+import itertools
+import json
+import re
+import time
+from typing import List
+
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain.schema.messages import AIMessage, AIMessageChunk
+
+from agent.history import approx_tokens
+
+# Sessão roteirizada: pedidos, refinamentos e conversa solta
+SCRIPTED_MESSAGES = [
+    "Olá, estou procurando um carro para a família",
+    "Gostaria de algo espaçoso, talvez um SUV",
+    "Quero um Compass até 150 mil",
+    "Tem algum mais novo, 2022?",
+    "E se for diesel?",
+    "Na verdade prefiro um Corolla 2020 até 100 mil",
+    "Pode ser automático",
+    "Quais as cores disponíveis?",
+    "Mostra o mais barato",
+    "E um HB20 flex até 70 mil?",
+]
+
+SCRIPTED_REPLIES = [
+    AIMessage(content="Claro! Para te ajudar melhor, qual faixa de preço você tem em mente "
+                      "e prefere algum tipo de câmbio ou combustível específico?"),
+    AIMessage(content="Vou buscar opções que combinam com o que você pediu, considerando "
+                      "marca, modelo, ano e faixa de preço. Um momento..."),
+]
+
+
+class RecordingChatModel(FakeMessagesListChatModel):
+    """Devolve respostas prontas em ciclo e registra as mensagens de cada chamada.
+
+    `sleep` simula a latência de geração: segundos por token no stream (e
+    por token da resposta inteira no invoke).
+    """
+    calls: list = []
+
+    def _respond(self, messages, stop=None, **kwargs) -> AIMessage:
+        self.calls.append(list(messages))
+        return super()._generate(messages, stop=stop, **kwargs).generations[0].message
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        message = self._respond(messages, stop, **kwargs)
+        if self.sleep:
+            time.sleep(self.sleep * len(_tokens(message)))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        message = self._respond(messages, stop, **kwargs)
+        if self.sleep:
+            await asyncio.sleep(self.sleep * len(_tokens(message)))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        """Stream palavra a palavra; tool calls chegam no último chunk."""
+        for chunk in self._chunks(messages, stop, **kwargs):
+            if self.sleep:
+                time.sleep(self.sleep)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        for chunk in self._chunks(messages, stop, **kwargs):
+            if self.sleep:
+                await asyncio.sleep(self.sleep)
+            yield chunk
+
+    def _chunks(self, messages, stop, **kwargs):
+        message = self._respond(messages, stop, **kwargs)
+        for token in _tokens(message):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+        tool_calls = [
+            {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": i}
+            for i, call in enumerate(getattr(message, "tool_calls", []))
+        ]
+        if tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=tool_calls))
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=tools, **kwargs)
+
+    def prompt_tokens(self) -> List[int]:
+        """Tokens estimados enviados em cada chamada."""
+        return [approx_tokens(messages) for messages in self.calls]
+
+
+def _tokens(message) -> List[str]:
+    return re.findall(r"\s*\S+", message.content)
+
+
+def fake_llm(*responses, sleep: float = None) -> RecordingChatModel:
+    return RecordingChatModel(responses=list(responses or SCRIPTED_REPLIES), calls=[], sleep=sleep)
+
+
+def scripted_session(turns: int):
+    """Mensagens do usuário para uma sessão de `turns` turnos."""
+    return itertools.islice(itertools.cycle(SCRIPTED_MESSAGES), turns)
@@ -0,0 +1,27 @@
+"""Utilitários para subir o servidor MCP localmente durante benchmarks."""
+import socket
+import threading
+import time
+
+import uvicorn
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(app="mcp_server.server:app", port: int = None, wait: bool = True) -> uvicorn.Server:
+    """Sobe o uvicorn numa thread daemon; com `wait`, retorna quando estiver aceitando conexões."""
+    server = uvicorn.Server(uvicorn.Config(
+        app, host="127.0.0.1", port=port or free_port(), log_level="error"
+    ))
+    threading.Thread(target=server.run, daemon=True).start()
+    while wait and not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def server_url(server: uvicorn.Server) -> str:
+    return f"http://127.0.0.1:{server.config.port}"
@@ -1,12 +1,18 @@
 import asyncio
 import logging
+import sys
 import threading
-import time
-import uvicorn
+from typing import Dict, List, Optional
 from agent.agent import VehicleAgent
+from agent.history import HistoryManager
+from agent.search import SpeculativeSearch, run_search
 from mcp_client.client import MCPClient
 from app.views.vehicle_view import VehicleView
-from app.config import MCP_SERVER_HOST, MCP_SERVER_PORT, OPENAI_API_KEY
+from app.config import (
+    MCP_SERVER_HOST, MCP_SERVER_PORT, MCP_TRANSPORT, MCP_STARTUP_TIMEOUT, OPENAI_API_KEY,
+    AGENT_TOOL_CALLING, AGENT_FAST_EXTRACTION,
+    AGENT_HISTORY_MAX_TOKENS, AGENT_HISTORY_KEEP_TURNS, AGENT_SPECULATIVE_SEARCH
+)
 
 # Configurar logging básico
 logging.basicConfig(
@@ -21,10 +27,28 @@ logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
 
-def start_mcp_server():
-    """Inicia o servidor FastAPI em background usando threading."""
+def create_mcp_client() -> MCPClient:
+    """Cliente MCP conforme `MCP_TRANSPORT` (no processo ou via HTTP)."""
+    if MCP_TRANSPORT == "asgi":
+        return MCPClient.in_process()
+    return MCPClient(server_url=f"http://localhost:{MCP_SERVER_PORT}")
+
+
+async def start_mcp_server(mcp_client: MCPClient):
+    """Deixa o servidor MCP pronto para o cliente.
+
+    No modo "asgi" o app roda no próprio processo: não há servidor para
+    subir, só o health check (que já carrega o app). No modo "http" o
+    uvicorn sobe numa thread e o /health é sondado até responder.
+    """
+    if MCP_TRANSPORT == "asgi":
+        await mcp_client.health_check()
+        logger.info("Servidor MCP no próprio processo (ASGI)")
+        return
+
     print("Iniciando servidor MCP")
     logger.info("Iniciando servidor FastAPI")
+    import uvicorn
 
     def run_server():
         """Função que roda o uvicorn em thread separada."""
@@ -39,36 +63,119 @@ def start_mcp_server():
     server_thread.start()
 
     print("Aguardando servidor inicializar...")
-    time.sleep(3)
+    await mcp_client.wait_until_ready(MCP_STARTUP_TIMEOUT, alive=server_thread.is_alive)
 
     print(f"Servidor MCP rodando em http://{MCP_SERVER_HOST}:{MCP_SERVER_PORT}")
     logger.info("Servidor MCP iniciado com sucesso")
 
 
+def load_catalog() -> Dict[str, List[str]]:
+    """Mapa marca → modelos do estoque atual (para o extrator por regras)."""
+    # SQLAlchemy carregado aqui, numa thread, em paralelo com o servidor MCP
+    from app.catalog import load_model_brands
+    from app.database import ReadSessionLocal
+
+    db = ReadSessionLocal()
+    try:
+        return load_model_brands(db)
+    finally:
+        db.close()
+
+
+class StdinReader:
+    """Lê linhas do stdin sem bloquear o event loop.
+
+    Uma thread daemon faz a leitura bloqueante e entrega cada linha ao
+    loop. Diferente de `asyncio.to_thread(input)`, a thread não segura o
+    encerramento do processo quando o usuário sai com Ctrl+C.
+    """
+
+    def __init__(self):
+        self._loop = asyncio.get_running_loop()
+        self._lines: asyncio.Queue = asyncio.Queue()
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        try:
+            for line in sys.stdin:
+                self._loop.call_soon_threadsafe(self._lines.put_nowait, line)
+            self._loop.call_soon_threadsafe(self._lines.put_nowait, None)
+        except RuntimeError:
+            pass  # loop já encerrado
+
+    async def readline(self, prompt: str = "") -> Optional[str]:
+        """Próxima linha (sem a quebra de linha); None no fim da entrada (Ctrl+D)."""
+        print(prompt, end="", flush=True)
+        line = await self._lines.get()
+        return None if line is None else line.rstrip("\n")
+
+
+async def stream_reply(agent: VehicleAgent, mcp_client: MCPClient, message: str,
+                       speculator: Optional[SpeculativeSearch] = None) -> Optional[asyncio.Task]:
+    """Imprime a resposta do agente conforme chega; retorna a task de busca, se houver.
+
+    A busca começa assim que o agente sinaliza a intenção no stream, então
+    ela roda em paralelo com o resto da resposta. Com `speculator`, uma
+    busca com os filtros previstos da mensagem começa antes mesmo do stream.
+    """
+    speculation = speculator.start(message, agent.filter_parser) if speculator else None
+    search_task = None
+    print("Agente: ", end="", flush=True)
+    try:
+        async for token in agent.chat_stream(message):
+            print(token, end="", flush=True)
+            if search_task is None and agent.pending_filters is not None:
+                search_task = asyncio.create_task(run_search(mcp_client, agent.pending_filters, speculation))
+    except BaseException:
+        if search_task is not None:
+            search_task.cancel()
+        elif speculation is not None:
+            speculation.discard()
+        raise
+    print("\n")
+
+    if search_task is None and agent.pending_filters is not None:
+        search_task = asyncio.create_task(run_search(mcp_client, agent.pending_filters, speculation))
+    if search_task is None and speculation is not None:
+        speculation.discard()
+    return search_task
+
+
 async def main():
     """Ponto de entrada principal da aplicação terminal."""
     logger.info("Iniciando sistema de busca de veículos")
 
-    # Iniciar servidor MCP em background
-    start_mcp_server()
-
-    print()
-    print("=" * 60)
-    print("BEM-VINDO AO SISTEMA DE BUSCA DE VEÍCULOS")
-    print("=" * 60)
-    print()
+    mcp_client = create_mcp_client()
 
     try:
+        # Servidor MCP e catálogo do extrator são independentes: sobem juntos
+        _, catalog = await asyncio.gather(start_mcp_server(mcp_client), asyncio.to_thread(load_catalog))
+
+        print()
+        print("=" * 60)
+        print("BEM-VINDO AO SISTEMA DE BUSCA DE VEÍCULOS")
+        print("=" * 60)
+        print()
+
         logger.info("Inicializando agente e cliente MCP")
-        agent = VehicleAgent(api_key=OPENAI_API_KEY)
-        mcp_client = MCPClient()
+        agent = VehicleAgent(
+            api_key=OPENAI_API_KEY,
+            tool_calling=AGENT_TOOL_CALLING,
+            fast_extraction=AGENT_FAST_EXTRACTION,
+            catalog=catalog or None,
+            history=HistoryManager(AGENT_HISTORY_MAX_TOKENS, AGENT_HISTORY_KEEP_TURNS)
+        )
+        speculator = SpeculativeSearch(mcp_client) if AGENT_SPECULATIVE_SEARCH else None
 
-        initial_response = agent.chat("Olá")
-        print(f"Agente: {initial_response}\n")
+        await stream_reply(agent, mcp_client, "Olá")
+        stdin = StdinReader()
 
         while True:
             try:
-                user_input = input("Você: ").strip()
+                user_input = await stdin.readline("Você: ")
+                if user_input is None:
+                    user_input = "sair"
+                user_input = user_input.strip()
 
                 if user_input.lower() in ["sair", "exit", "quit"]:
                     logger.info("Usuário encerrou a sessão")
@@ -79,35 +186,21 @@ async def main():
                     logger.debug("Entrada vazia, ignorando")
                     continue
 
-                # Obter resposta do agente
+                # Obter resposta do agente (impressa conforme chega)
                 logger.debug(f"Usuário: {user_input[:50]}...")
-                agent_response = agent.chat(user_input)
-                print(f"\nAgente: {agent_response}\n")
+                print()
+                search_task = await stream_reply(agent, mcp_client, user_input, speculator)
 
-                # Verificar se deve executar busca
-                if agent.should_search(agent_response):
+                # Busca já iniciada durante o stream, se o agente decidiu buscar
+                if search_task is not None:
                     logger.info("Executando busca de veículos")
                     print("Buscando veículos...\n")
 
-                    filters = agent.extract_filters()
-
-                    vehicles = await mcp_client.search_vehicles(filters)
-                    logger.info(f"Encontrados {len(vehicles)} veículos")
+                    vehicles, filters, notices = await search_task
+                    for notice in notices:
+                        print(notice)
 
-                    # Se não encontrou e tem ano específico, expande ±3 anos
-                    if len(vehicles) == 0 and 'ano_min' in filters and 'ano_max' in filters:
-                        if filters['ano_min'] == filters['ano_max']:  # Ano específico
-                            ano_original = filters['ano_min']
-                            filters['ano_min'] = ano_original - 3
-                            filters['ano_max'] = ano_original + 3
-
-                            print(f"Nenhum veículo encontrado em {ano_original}.")
-                            print(f"Buscando entre {filters['ano_min']} e {filters['ano_max']}...\n")
-
-                            vehicles = await mcp_client.search_vehicles(filters)
-                            logger.info(f"Busca expandida: encontrados {len(vehicles)} veículos")
-
-                    formatted_results = VehicleView.format_results(vehicles)
+                    formatted_results = VehicleView.format_results(vehicles, sort=filters.get("sort"))
                     print(formatted_results)
 
                     followup = "Mostrei os resultados acima. Deseja refinar a busca?"
@@ -117,7 +210,8 @@ async def main():
                 logger.warning(f"Erro de validação: {e}")
                 print(f"\nErro: {e}\n")
 
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, asyncio.CancelledError):
+                # Com o loop rodando, o asyncio entrega o Ctrl+C como cancelamento
                 logger.info("Interrupção por teclado (Ctrl+C)")
                 print("\n\nAté logo!")
                 break
@@ -127,12 +221,18 @@ async def main():
                 print(f"\nErro inesperado: {e}")
                 print("Por favor, tente novamente.\n")
 
+        if speculator is not None:
+            logger.info(f"Busca especulativa: {speculator.stats()}")
+
     except Exception as e:
         logger.critical(f"Erro fatal ao inicializar aplicação: {e}", exc_info=True)
         print(f"\nErro fatal: {e}")
         print("Não foi possível iniciar o sistema. Verifique os logs.\n")
         return 1
 
+    finally:
+        await mcp_client.aclose()
+
     logger.info("Sistema encerrado normalmente")
     return 0
 
@@ -1,21 +1,106 @@
+import asyncio
 import httpx
+import json
 import logging
-from typing import Dict, Any, List
+import time
+from typing import Dict, Any, AsyncIterator, Callable, List, Optional
+
+from mcp_client.transport import StreamingASGITransport
 
 logger = logging.getLogger(__name__)
 
 
 class MCPClient:
-    """Cliente para comunicação com o servidor MCP."""
-    def __init__(self, server_url: str = "http://localhost:8000"):
+    """Cliente para comunicação com o servidor MCP.
+
+    Mantém um único `httpx.AsyncClient` com pool de conexões keep-alive,
+    reaproveitado entre chamadas. Use como async context manager ou chame
+    `aclose()` ao final para liberar as conexões.
+    """
+    def __init__(
+        self,
+        server_url: str = "http://localhost:8000",
+        max_connections: int = 10,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        connect_timeout: float = 5.0,
+        search_timeout: float = 30.0,
+        health_timeout: float = 10.0,
+        http2: bool = False,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
         """Inicializa o cliente MCP.
 
         Args:
             server_url: URL do servidor MCP (padrão: http://localhost:8000)
+            max_connections: Máximo de conexões simultâneas no pool
+            max_keepalive_connections: Máximo de conexões ociosas mantidas abertas
+            keepalive_expiry: Segundos até fechar uma conexão ociosa
+            connect_timeout: Timeout para abrir conexão (segundos)
+            search_timeout: Timeout total de uma busca (segundos)
+            health_timeout: Timeout total do health check (segundos)
+            http2: Usa HTTP/2 (requer `pip install httpx[http2]`)
+            transport: Transport httpx alternativo (ex: httpx.MockTransport em testes)
         """
         self.server_url = server_url
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.connect_timeout = connect_timeout
+        self.search_timeout = search_timeout
+        self.health_timeout = health_timeout
+        self.http2 = http2
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
         logger.info(f"MCPClient inicializado: {server_url}")
 
+    @classmethod
+    def in_process(cls, app=None, **kwargs) -> "MCPClient":
+        """Cliente que chama o app do servidor MCP no próprio processo, sem sockets.
+
+        As requisições vão pelo `StreamingASGITransport` direto para o app
+        FastAPI: sem uvicorn, TCP nem parsing HTTP. Erros do app viram
+        respostas 500, como no modo HTTP, e `stream_vehicles` recebe as
+        linhas conforme o app as gera.
+
+        Args:
+            app: App ASGI (padrão: mcp_server.server.app)
+            **kwargs: Demais argumentos do construtor
+        """
+        if app is None:
+            from mcp_server.server import app
+        return cls(server_url="http://mcp", transport=StreamingASGITransport(app), **kwargs)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Cliente HTTP compartilhado (criado no primeiro uso)."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.server_url,
+                limits=self.limits,
+                timeout=httpx.Timeout(self.search_timeout, connect=self.connect_timeout),
+                http2=self.http2,
+                transport=self.transport
+            )
+        return self._client
+
+    def _timeout(self, total: float) -> httpx.Timeout:
+        return httpx.Timeout(total, connect=min(self.connect_timeout, total))
+
+    async def aclose(self) -> None:
+        """Fecha o pool de conexões."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "MCPClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
     async def search_vehicles(self, filters: Dict[str, Any]) -> List[Dict]:
         """Busca veículos via servidor MCP.
 
@@ -33,16 +118,61 @@ class MCPClient:
         logger.info(f"Buscando veículos com filtros: {filters}")
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.server_url}/search",
-                    json=filters,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                results = response.json()
-                logger.info(f"Servidor retornou {len(results)} veículos")
-                return results
+            response = await self.client.post(
+                "/search",
+                json=filters,
+                timeout=self._timeout(self.search_timeout)
+            )
+            response.raise_for_status()
+            results = response.json()
+            logger.info(f"Servidor retornou {len(results)} veículos")
+            return results
+
+        except httpx.TimeoutException as e:
+            logger.error(f"Timeout ao buscar veículos: {e}")
+            raise
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Erro HTTP ao buscar veículos: {e.response.status_code}")
+            raise
+
+        except httpx.RequestError as e:
+            logger.error(f"Erro de conexão ao buscar veículos: {e}")
+            raise
+
+    async def search_vehicles_relaxed(self, filters: Dict[str, Any]) -> Dict:
+        """Busca com relaxamento progressivo no servidor (/search/relaxed).
+
+        Se nada casar com os filtros exatos, o servidor amplia ano/preço e
+        remove combustível/câmbio o mínimo necessário, na mesma requisição.
+
+        Args:
+            filters: Dicionário com filtros de busca
+
+        Returns:
+            Dicionário com `results`, `filters` (filtros usados) e `relaxed`
+            (restrições relaxadas; vazio se os filtros exatos encontraram algo)
+
+        Raises:
+            httpx.HTTPStatusError: Se o servidor retornar erro HTTP
+            httpx.TimeoutException: Se a requisição exceder timeout
+            httpx.RequestError: Se houver erro de conexão
+        """
+        logger.info(f"Buscando veículos (com relaxamento) com filtros: {filters}")
+
+        try:
+            response = await self.client.post(
+                "/search/relaxed",
+                json=filters,
+                timeout=self._timeout(self.search_timeout)
+            )
+            response.raise_for_status()
+            result = response.json()
+            logger.info(
+                f"Servidor retornou {len(result['results'])} veículos, "
+                f"{len(result['relaxed'])} restrição(ões) relaxada(s)"
+            )
+            return result
 
         except httpx.TimeoutException as e:
             logger.error(f"Timeout ao buscar veículos: {e}")
@@ -56,6 +186,201 @@ class MCPClient:
             logger.error(f"Erro de conexão ao buscar veículos: {e}")
             raise
 
+    async def facets(self, filters: Dict[str, Any]) -> Dict:
+        """Contagens por faceta para os filtros (/facets).
+
+        Args:
+            filters: Dicionário com filtros de busca (parciais)
+
+        Returns:
+            Dicionário com `total` e contagens por `marca`, `combustivel`,
+            `transmissao` e faixas de `ano` e `preco`
+
+        Raises:
+            httpx.HTTPStatusError: Se o servidor retornar erro HTTP
+            httpx.TimeoutException: Se a requisição exceder timeout
+            httpx.RequestError: Se houver erro de conexão
+        """
+        try:
+            response = await self.client.post(
+                "/facets",
+                json=filters,
+                timeout=self._timeout(self.search_timeout)
+            )
+            response.raise_for_status()
+            return response.json()
+
+        except httpx.TimeoutException as e:
+            logger.error(f"Timeout ao buscar facetas: {e}")
+            raise
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Erro HTTP ao buscar facetas: {e.response.status_code}")
+            raise
+
+        except httpx.RequestError as e:
+            logger.error(f"Erro de conexão ao buscar facetas: {e}")
+            raise
+
+    async def search_vehicles_page(self, filters: Dict[str, Any], cursor: Optional[str] = None) -> Dict:
+        """Busca uma página de resultados (/search/page).
+
+        Args:
+            filters: Dicionário com filtros de busca (`limit` = tamanho da página)
+            cursor: `next_cursor` da página anterior (None = primeira página)
+
+        Returns:
+            Dicionário com `results` e `next_cursor` (None na última página)
+
+        Raises:
+            httpx.HTTPStatusError: Se o servidor retornar erro HTTP (400 = cursor inválido)
+            httpx.TimeoutException: Se a requisição exceder timeout
+            httpx.RequestError: Se houver erro de conexão
+        """
+        payload = dict(filters, cursor=cursor) if cursor else filters
+        try:
+            response = await self.client.post(
+                "/search/page",
+                json=payload,
+                timeout=self._timeout(self.search_timeout)
+            )
+            response.raise_for_status()
+            return response.json()
+
+        except httpx.TimeoutException as e:
+            logger.error(f"Timeout ao buscar página: {e}")
+            raise
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Erro HTTP ao buscar página: {e.response.status_code}")
+            raise
+
+        except httpx.RequestError as e:
+            logger.error(f"Erro de conexão ao buscar página: {e}")
+            raise
+
+    async def stream_vehicles(
+        self,
+        filters: Dict[str, Any],
+        max_results: Optional[int] = None,
+        batch_size: int = 500
+    ) -> AsyncIterator[Dict]:
+        """Itera sobre todos os veículos da busca via /search/stream (NDJSON).
+
+        Os veículos são entregues conforme chegam do servidor, sem montar a
+        lista completa em memória.
+
+        Raises:
+            httpx.HTTPStatusError: Se o servidor retornar erro HTTP
+            httpx.TimeoutException: Se a leitura exceder timeout
+            httpx.RequestError: Se houver erro de conexão
+        """
+        payload = dict(filters, batch_size=batch_size)
+        if max_results is not None:
+            payload["max_results"] = max_results
+
+        try:
+            async with self.client.stream(
+                "POST",
+                "/search/stream",
+                json=payload,
+                timeout=self._timeout(self.search_timeout)
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if line:
+                        yield json.loads(line)
+
+        except httpx.TimeoutException as e:
+            logger.error(f"Timeout no streaming de veículos: {e}")
+            raise
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Erro HTTP no streaming de veículos: {e.response.status_code}")
+            raise
+
+        except httpx.RequestError as e:
+            logger.error(f"Erro de conexão no streaming de veículos: {e}")
+            raise
+
+    async def search_vehicles_batch(self, filters_list: List[Dict[str, Any]]) -> List[List[Dict]]:
+        """Executa várias buscas em uma única requisição (/search/batch).
+
+        Args:
+            filters_list: Lista de dicionários de filtros (máx. 50)
+
+        Returns:
+            Lista de resultados, na mesma ordem de `filters_list`
+
+        Raises:
+            httpx.HTTPStatusError: Se o servidor retornar erro HTTP
+            httpx.TimeoutException: Se a requisição exceder timeout
+            httpx.RequestError: Se houver erro de conexão
+        """
+        logger.info(f"Buscando veículos em lote: {len(filters_list)} buscas")
+
+        try:
+            response = await self.client.post(
+                "/search/batch",
+                json={"searches": filters_list},
+                timeout=self._timeout(self.search_timeout)
+            )
+            response.raise_for_status()
+            results = response.json()
+            logger.info(f"Servidor retornou {sum(len(r) for r in results)} veículos em lote")
+            return results
+
+        except httpx.TimeoutException as e:
+            logger.error(f"Timeout ao buscar veículos em lote: {e}")
+            raise
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Erro HTTP ao buscar veículos em lote: {e.response.status_code}")
+            raise
+
+        except httpx.RequestError as e:
+            logger.error(f"Erro de conexão ao buscar veículos em lote: {e}")
+            raise
+
+    async def wait_until_ready(
+        self,
+        timeout: float = 30.0,
+        alive: Optional[Callable[[], bool]] = None
+    ) -> float:
+        """Sonda o /health até o servidor responder.
+
+        O intervalo entre sondas começa em 10 ms e dobra até 200 ms.
+
+        Args:
+            timeout: Segundos máximos de espera
+            alive: Indica se o processo/thread do servidor segue de pé; se
+                retornar False, a espera é abortada
+
+        Returns:
+            Segundos até o servidor ficar pronto
+
+        Raises:
+            TimeoutError: Se o servidor não responder a tempo ou morrer antes
+        """
+        started = time.perf_counter()
+        deadline = started + timeout
+        interval = 0.01
+        while True:
+            try:
+                response = await self.client.get("/health", timeout=self._timeout(self.health_timeout))
+                if response.status_code == 200:
+                    waited = time.perf_counter() - started
+                    logger.info(f"Servidor MCP pronto em {waited * 1000:.0f} ms")
+                    return waited
+            except httpx.RequestError:
+                pass  # ainda não aceita conexões
+            if alive is not None and not alive():
+                raise TimeoutError("Servidor MCP encerrou antes de ficar pronto")
+            if time.perf_counter() + interval > deadline:
+                raise TimeoutError(f"Servidor MCP não respondeu em {timeout:.0f}s")
+            await asyncio.sleep(interval)
+            interval = min(interval * 2, 0.2)
+
     async def health_check(self) -> Dict:
         """Verifica saúde do servidor MCP.
 
@@ -70,15 +395,14 @@ class MCPClient:
         logger.debug("Verificando saúde do servidor MCP")
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.server_url}/health",
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                health_data = response.json()
-                logger.info(f"Health check: {health_data}")
-                return health_data
+            response = await self.client.get(
+                "/health",
+                timeout=self._timeout(self.health_timeout)
+            )
+            response.raise_for_status()
+            health_data = response.json()
+            logger.info(f"Health check: {health_data}")
+            return health_data
 
         except httpx.TimeoutException as e:
             logger.error(f"Timeout no health check: {e}")
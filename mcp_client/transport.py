@@ -0,0 +1,121 @@
+"""Transport ASGI que entrega o corpo da resposta em partes.
+
+O `httpx.ASGITransport` só devolve a resposta depois que o app termina,
+com o corpo inteiro em memória: `/search/stream` chegaria como uma lista
+completa. Aqui o app roda numa task e cada `http.response.body` passa por
+uma fila limitada até o cliente; se o cliente para de ler, o app espera
+(backpressure), e se fecha a resposta antes do fim, o app é cancelado.
+"""
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, MutableMapping, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Partes do corpo em trânsito entre o app e o cliente
+QUEUE_SIZE = 16
+
+
+class _QueueStream(httpx.AsyncByteStream):
+    """Corpo da resposta lido da fila alimentada pelo app."""
+
+    def __init__(self, queue: asyncio.Queue, task: asyncio.Task, disconnected: asyncio.Event):
+        self._queue = queue
+        self._task = task
+        self._disconnected = disconnected
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        while True:
+            chunk = await self._queue.get()
+            if chunk is None:
+                return
+            yield chunk
+
+    async def aclose(self) -> None:
+        self._disconnected.set()
+        if not self._task.done():
+            # Cliente saiu antes do fim da resposta
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+class StreamingASGITransport(httpx.AsyncBaseTransport):
+    """Chama um app ASGI no próprio processo, com a resposta em streaming.
+
+    Erros do app antes do início da resposta viram 500, como no
+    `httpx.ASGITransport(raise_app_exceptions=False)`; depois do início, a
+    resposta termina no ponto em que estava.
+    """
+
+    def __init__(self, app, root_path: str = "", client: Tuple[str, int] = ("127.0.0.1", 123)):
+        self.app = app
+        self.root_path = root_path
+        self.client = client
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": request.method,
+            "headers": [(k.lower(), v) for (k, v) in request.headers.raw],
+            "scheme": request.url.scheme,
+            "path": request.url.path,
+            "raw_path": request.url.raw_path.split(b"?")[0],
+            "query_string": request.url.query,
+            "server": (request.url.host, request.url.port),
+            "client": self.client,
+            "root_path": self.root_path,
+        }
+        # Corpo da requisição (filtros JSON) é pequeno: vai numa mensagem só
+        body = await request.aread()
+        request_sent = False
+        disconnected = asyncio.Event()
+        started: asyncio.Future = asyncio.get_running_loop().create_future()
+        queue: asyncio.Queue = asyncio.Queue(QUEUE_SIZE)
+
+        async def receive() -> Dict[str, Any]:
+            nonlocal request_sent
+            if request_sent:
+                await disconnected.wait()
+                return {"type": "http.disconnect"}
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message: MutableMapping[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                started.set_result((message["status"], message.get("headers", [])))
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                if chunk and request.method != "HEAD":
+                    await queue.put(chunk)
+                if not message.get("more_body", False):
+                    await queue.put(None)
+
+        async def run() -> None:
+            try:
+                await self.app(scope, receive, send)
+            except Exception:
+                logger.exception(f"Erro no app ASGI em {request.method} {request.url.path}")
+                if not started.done():
+                    started.set_result((500, []))
+                await queue.put(None)
+            else:
+                if not started.done():
+                    started.set_result((500, []))
+                    await queue.put(None)
+
+        task = asyncio.create_task(run())
+        try:
+            status_code, headers = await started
+        except BaseException:
+            task.cancel()
+            raise
+        stream = _QueueStream(queue, task, disconnected)
+        return httpx.Response(status_code, headers=headers, stream=stream, request=request)
+
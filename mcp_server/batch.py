@@ -0,0 +1,86 @@
+import logging
+from typing import Any, Callable, Dict, List, Tuple
+
+from app.filters import ENUM_FILTERS, TEXT_FILTERS, enum_db_value, matches_filters
+from app.ranking import sort_key
+from mcp_server.cache import canonical_key
+from mcp_server.schemas import VehicleSearchRequest
+
+logger = logging.getLogger(__name__)
+
+SearchFn = Callable[[VehicleSearchRequest], List[Dict[str, Any]]]
+
+
+def subsumes(broad: Dict[str, Any], narrow: Dict[str, Any]) -> bool:
+    """Indica se todo veículo que passa em `narrow` também passa em `broad`.
+
+    Recebe filtros canônicos (ver `canonical_key`). Só reconhece os casos
+    seguros: mesmos enums, ranges contidos e termos de texto em que o termo
+    amplo é substring do estreito (sem curingas `%`/`_`).
+    """
+    for name, value in broad.items():
+        if name in ("limit", "sort"):
+            continue
+        other = narrow.get(name)
+        if other is None:
+            return False
+        if name in TEXT_FILTERS:
+            if any(ch in value + other for ch in "%_") or value not in other:
+                return False
+        elif name in ENUM_FILTERS:
+            enum_cls = ENUM_FILTERS[name]
+            if enum_db_value(enum_cls, value) != enum_db_value(enum_cls, other):
+                return False
+        elif name.endswith("_min"):
+            if other < value:
+                return False
+        elif name.endswith("_max"):
+            if other > value:
+                return False
+    return True
+
+
+def run_batch(requests: List[VehicleSearchRequest], search: SearchFn) -> List[List[Dict[str, Any]]]:
+    """Executa várias buscas compartilhando trabalho entre elas.
+
+    - Buscas equivalentes (mesma chave canônica) rodam uma vez só.
+    - Buscas mais amplas rodam primeiro; se o resultado de uma busca ampla
+      veio completo (menos linhas que o limit), as buscas contidas nela são
+      respondidas filtrando esse resultado em memória, sem ir ao banco.
+
+    Os resultados voltam na mesma ordem das requisições.
+    """
+    keys = [canonical_key(r) for r in requests]
+    unique: Dict[Tuple, VehicleSearchRequest] = {}
+    for key, request in zip(keys, requests):
+        unique.setdefault(key, request)
+
+    # Menos filtros = busca mais ampla
+    ordered = sorted(unique, key=lambda k: len(k))
+    complete: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]] = []
+    results: Dict[Tuple, List[Dict[str, Any]]] = {}
+    derived = 0
+
+    for key in ordered:
+        filters = dict(key)
+        source = next((rows for broad, rows in complete if subsumes(broad, filters)), None)
+        if source is not None:
+            rows = [v for v in source if matches_filters(v, filters)]
+            # A busca ampla pode ter outra ordenação; sem sort, o SQL ordena por id
+            if "sort" in filters:
+                rows.sort(key=sort_key(filters["sort"]))
+            else:
+                rows.sort(key=lambda v: v["id"])
+            rows = rows[:filters["limit"]]
+            derived += 1
+        else:
+            rows = search(unique[key])
+            if len(rows) < filters["limit"]:
+                complete.append((filters, rows))
+        results[key] = rows
+
+    logger.info(
+        f"Lote com {len(requests)} buscas: {len(unique)} distintas, "
+        f"{derived} derivadas de buscas mais amplas"
+    )
+    return [results[key] for key in keys]
@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from app.controllers.vehicle_controller import VehicleController
+from app.database import inventory_version
+from mcp_server.schemas import VehicleSearchRequest
+
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+def _fold(value: Optional[str]) -> Optional[str]:
+    """Case-folding ASCII, o mesmo que `lower()` do SQLite faz no ILIKE."""
+    if value is None:
+        return None
+    return value.translate(_ASCII_LOWER)
+
+
+def canonical_key(request: VehicleSearchRequest) -> Tuple:
+    """Chave canônica da busca: requisições equivalentes geram a mesma chave.
+
+    Aplica as mesmas normalizações do VehicleController (limit limitado,
+    ranges invertidos corrigidos) e ignora campos não informados, então
+    `{"ano_min": 2020, "ano_max": 2015}` e `{"ano_max": 2020, "ano_min": 2015}`
+    caem na mesma entrada.
+    """
+    params: Dict[str, Any] = request.model_dump()
+    params["limit"] = VehicleController.clamp_limit(params["limit"])
+    params["ano_min"], params["ano_max"] = VehicleController.ordered_range(
+        "ano", params["ano_min"], params["ano_max"]
+    )
+    params["preco_min"], params["preco_max"] = VehicleController.ordered_range(
+        "preco", params["preco_min"], params["preco_max"]
+    )
+    # marca/modelo usam ILIKE: "toyota" e "Toyota" retornam as mesmas linhas
+    params["marca"] = _fold(params["marca"])
+    params["modelo"] = _fold(params["modelo"])
+    return tuple(sorted((k, v) for k, v in params.items() if v is not None))
+
+
+class SearchCache:
+    """Cache de resultados de /search com despejo LRU + TTL.
+
+    Memória limitada por `max_entries` (cada entrada guarda no máximo 100
+    veículos). Cada entrada guarda a versão do inventário com que foi
+    calculada: `get` com a versão atual descarta entradas antigas (inclusive
+    após escritas de outro processo, ver `sync_external_writes`), e o cache
+    inteiro é limpo quando a tabela vehicles muda neste processo.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Optional[int], Any]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: Hashable, version: Optional[int] = None) -> Optional[Any]:
+        """Retorna o valor em cache ou None (miss, expirado ou de outra versão)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, entry_version, value = entry
+                if expires_at > time.monotonic() and (version is None or entry_version in (None, version)):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any, version: Optional[int] = None) -> None:
+        """Armazena o valor; `version` é a versão do inventário usada no cálculo."""
+        if not self.enabled:
+            return
+        with self._lock:
+            # Resultado calculado antes de uma escrita não pode entrar no cache
+            if version is not None and version != inventory_version():
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self, *_) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
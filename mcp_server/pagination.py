@@ -0,0 +1,42 @@
+import base64
+import hashlib
+import json
+from typing import Any, Dict, Tuple
+
+
+class InvalidCursor(ValueError):
+    """Cursor malformado ou gerado para outros filtros."""
+
+
+def _fingerprint(filters: Dict[str, Any]) -> str:
+    active = sorted((k, v) for k, v in filters.items() if v is not None)
+    return hashlib.sha1(repr(active).encode()).hexdigest()[:12]
+
+
+def encode_cursor(key: Tuple, filters: Dict[str, Any]) -> str:
+    """Cursor opaco: chave keyset do último item + impressão digital dos filtros."""
+    payload = json.dumps({"k": list(key), "f": _fingerprint(filters)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, filters: Dict[str, Any]) -> Tuple:
+    """Retorna a chave keyset guardada no cursor.
+
+    A chave tem o formato de `VehicleController.page_key`: `(id,)` sem
+    ordenação ou `(valor da coluna, id)` com ordenação.
+
+    Raises:
+        InvalidCursor: Se o cursor for inválido ou de uma busca com outros filtros
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        key, fingerprint = tuple(payload["k"]), payload["f"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor("Cursor inválido") from e
+    if fingerprint != _fingerprint(filters):
+        raise InvalidCursor("Cursor não corresponde aos filtros da busca")
+    expected = 1 if filters.get("sort") is None else 2
+    if len(key) != expected or not all(isinstance(v, (int, float, str)) for v in key):
+        raise InvalidCursor("Cursor inválido")
+    return key
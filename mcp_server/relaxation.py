@@ -0,0 +1,146 @@
+"""Relaxamento progressivo de filtros para buscas sem resultado.
+
+Quando a busca exata não encontra nada, `relax` procura o menor
+relaxamento que devolve resultados, numa única requisição:
+
+- ano: faixa ampliada em 1, 2 ou 3 anos para cada lado, depois sem ano;
+- preço: limites afastados em 10%, 20% ou 30%, depois sem preço;
+- combustível e câmbio: removidos.
+
+Marca e modelo nunca são relaxados. O custo de uma combinação é a soma
+dos níveis de relaxamento; as combinações são testadas em ordem de custo
+(e, no empate, mexendo em menos restrições) com uma sonda de existência
+(`COUNT` com `LIMIT 1`). Relaxar mais nunca tira resultados, então uma
+combinação sem resultados descarta todas as que ela contém sem novas
+sondas.
+"""
+import itertools
+import logging
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from app.controllers.vehicle_controller import VehicleController
+
+logger = logging.getLogger(__name__)
+
+YEAR_STEPS = (1, 2, 3)
+PRICE_STEPS = (0.1, 0.2, 0.3)
+
+# restrição -> filtros que ela controla
+CONSTRAINTS = {
+    "ano": ("ano_min", "ano_max"),
+    "preco": ("preco_min", "preco_max"),
+    "combustivel": ("combustivel",),
+    "transmissao": ("transmissao",),
+}
+
+Probe = Callable[[Dict[str, Any]], bool]
+
+
+class Relaxation(NamedTuple):
+    """Restrição relaxada: valores originais e novos (None = removido)."""
+    constraint: str
+    original: Dict[str, Any]
+    relaxed: Dict[str, Any]
+
+
+def _year_levels(filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+    low, high = filters.get("ano_min"), filters.get("ano_max")
+    if not low and not high:
+        return []
+    levels = []
+    for step in YEAR_STEPS:
+        level = {}
+        if low:
+            level["ano_min"] = max(low - step, VehicleController.MIN_YEAR)
+        if high:
+            level["ano_max"] = min(high + step, VehicleController.CURRENT_YEAR + 1)
+        levels.append(level)
+    return levels + [{"ano_min": None, "ano_max": None}]
+
+
+def _price_levels(filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+    low, high = filters.get("preco_min"), filters.get("preco_max")
+    if not low and not high:
+        return []
+    levels = []
+    for step in PRICE_STEPS:
+        level = {}
+        if low:
+            level["preco_min"] = round(low * (1 - step), 2)
+        if high:
+            level["preco_max"] = round(high * (1 + step), 2)
+        levels.append(level)
+    return levels + [{"preco_min": None, "preco_max": None}]
+
+
+def _levels(filters: Dict[str, Any]) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """(restrição, níveis de relaxamento) das restrições presentes nos filtros."""
+    candidates = [
+        ("ano", _year_levels(filters)),
+        ("preco", _price_levels(filters)),
+        ("combustivel", [{"combustivel": None}] if filters.get("combustivel") else []),
+        ("transmissao", [{"transmissao": None}] if filters.get("transmissao") else []),
+    ]
+    return [(name, levels) for name, levels in candidates if levels]
+
+
+def _apply(filters: Dict[str, Any], constraints, combination) -> Dict[str, Any]:
+    relaxed = dict(filters)
+    for (_, levels), level in zip(constraints, combination):
+        if level:
+            relaxed.update(levels[level - 1])
+    return {k: v for k, v in relaxed.items() if v is not None}
+
+
+def relax(filters: Dict[str, Any], probe: Probe) -> Optional[Tuple[Dict[str, Any], List[Relaxation]]]:
+    """Menor relaxamento de `filters` para o qual `probe` encontra veículos.
+
+    Args:
+        filters: Filtros da busca sem resultado (sem limit/sort)
+        probe: Indica se há ao menos um veículo com os filtros dados
+
+    Returns:
+        (filtros relaxados, restrições relaxadas), ou None se nem o
+        relaxamento máximo encontra veículos
+    """
+    constraints = _levels(filters)
+    if not constraints:
+        return None
+
+    loosest = tuple(len(levels) for _, levels in constraints)
+    probes = 1
+    if not probe(_apply(filters, constraints, loosest)):
+        logger.info("Relaxamento: nenhum resultado nem sem ano, preço e enums")
+        return None
+
+    combinations = sorted(
+        (c for c in itertools.product(*(range(n + 1) for n in loosest)) if any(c)),
+        key=lambda c: (sum(c), sum(1 for level in c if level), tuple(-level for level in c))
+    )
+    failed: List[Tuple[int, ...]] = []
+    chosen = loosest
+    for combination in combinations:
+        if combination == loosest:
+            break
+        if any(all(c <= f for c, f in zip(combination, other)) for other in failed):
+            continue
+        probes += 1
+        if probe(_apply(filters, constraints, combination)):
+            chosen = combination
+            break
+        failed.append(combination)
+
+    relaxed_filters = _apply(filters, constraints, chosen)
+    relaxations = [
+        Relaxation(
+            constraint=name,
+            original={key: filters.get(key) for key in CONSTRAINTS[name] if filters.get(key)},
+            relaxed={key: relaxed_filters.get(key) for key in CONSTRAINTS[name] if filters.get(key)},
+        )
+        for (name, _), level in zip(constraints, chosen) if level
+    ]
+    logger.info(
+        f"Relaxamento com {probes} sondas: "
+        + ", ".join(f"{r.constraint} {r.original} -> {r.relaxed}" for r in relaxations)
+    )
+    return relaxed_filters, relaxations
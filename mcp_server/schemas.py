@@ -1,5 +1,9 @@
-from pydantic import BaseModel, field_validator
-from typing import Optional, List, Union
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, Dict, Literal, Optional, List, Union
+
+
+# Ver app.ranking: ordenações por coluna e score de relevância
+SortOption = Literal["preco_asc", "preco_desc", "ano_desc", "quilometragem_asc", "relevancia"]
 
 
 class VehicleSearchRequest(BaseModel):
@@ -12,6 +16,7 @@ class VehicleSearchRequest(BaseModel):
     preco_max: Optional[float] = None
     transmissao: Optional[Union[str, List[str]]] = None
     limit: int = 10
+    sort: Optional[SortOption] = None
 
     @field_validator('marca', 'modelo', 'combustivel', 'transmissao', mode='before')
     @classmethod
@@ -22,6 +27,21 @@ class VehicleSearchRequest(BaseModel):
         return v
 
 
+class VehicleSearchPageRequest(VehicleSearchRequest):
+    """Busca paginada; `sort` por relevância não é suportado (sem keyset)."""
+    cursor: Optional[str] = None
+
+
+class VehicleStreamRequest(VehicleSearchRequest):
+    """Busca em streaming: `limit` é ignorado, use `max_results`."""
+    max_results: Optional[int] = Field(None, ge=1)
+    batch_size: int = Field(500, ge=1, le=5000)
+
+
+class VehicleSearchBatchRequest(BaseModel):
+    searches: List[VehicleSearchRequest] = Field(min_length=1, max_length=50)
+
+
 class VehicleResponse(BaseModel):
     id: int
     marca: str
@@ -35,3 +55,38 @@ class VehicleResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class VehicleSearchPage(BaseModel):
+    results: List[VehicleResponse]
+    next_cursor: Optional[str] = None
+
+
+class RelaxedConstraint(BaseModel):
+    """Restrição relaxada: valores originais e usados (null = filtro removido)."""
+    constraint: Literal["ano", "preco", "combustivel", "transmissao"]
+    original: Dict[str, Any]
+    relaxed: Dict[str, Any]
+
+
+class VehicleSearchRelaxed(BaseModel):
+    """Resultado de /search/relaxed; `relaxed` vazio = filtros exatos."""
+    results: List[VehicleResponse]
+    filters: Dict[str, Any]
+    relaxed: List[RelaxedConstraint] = []
+
+
+class FacetBucket(BaseModel):
+    min: float
+    max: float
+    count: int
+
+
+class FacetCounts(BaseModel):
+    """Contagens por faceta; `preco.max` é exclusivo, `ano.max` inclusivo."""
+    total: int
+    marca: Dict[str, int]
+    combustivel: Dict[str, int]
+    transmissao: Dict[str, int]
+    ano: List[FacetBucket]
+    preco: List[FacetBucket]
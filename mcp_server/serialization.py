@@ -0,0 +1,53 @@
+"""Serialização rápida das respostas de busca (SEARCH_FAST_SERIALIZATION).
+
+No caminho padrão cada veículo vira objeto ORM, passa por
+`VehicleResponse.model_validate` e o FastAPI ainda valida a lista de novo
+contra o `response_model` antes de gerar o JSON. No caminho rápido a
+query seleciona só as colunas de `VehicleResponse` como tuplas, os dicts
+são montados direto e a resposta é codificada em bytes pelo orjson, sem
+validação por linha. O JSON é o mesmo, byte a byte: mesmos campos, na
+mesma ordem, com os enums pelo valor.
+"""
+from typing import Any, Dict, Iterable, List
+
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy import Enum
+
+from app.models.vehicle import Vehicle
+from mcp_server.schemas import VehicleResponse
+
+try:
+    import orjson
+except ImportError:  # sem orjson: mesmo caminho, com o json da stdlib
+    orjson = None
+
+# Colunas de `VehicleResponse`, na ordem do schema
+VEHICLE_FIELDS = tuple(VehicleResponse.model_fields)
+VEHICLE_COLUMNS = tuple(getattr(Vehicle, name) for name in VEHICLE_FIELDS)
+_ENUM_POSITIONS = tuple(
+    i for i, column in enumerate(VEHICLE_COLUMNS) if isinstance(column.type, Enum)
+)
+
+
+def vehicle_dict(row) -> Dict[str, Any]:
+    """Tupla com `VEHICLE_COLUMNS` -> dict igual ao `VehicleResponse.model_dump()`."""
+    values = list(row)
+    for i in _ENUM_POSITIONS:
+        values[i] = values[i].value
+    return dict(zip(VEHICLE_FIELDS, values))
+
+
+def vehicle_dicts(rows: Iterable) -> List[Dict[str, Any]]:
+    return [vehicle_dict(row) for row in rows]
+
+
+def dumps(content: Any) -> bytes:
+    """JSON compacto em UTF-8, como o `JSONResponse` do FastAPI."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return JSONResponse(content).body
+
+
+def json_response(content: Any) -> Response:
+    """Resposta já codificada: o FastAPI não revalida contra o `response_model`."""
+    return Response(content=dumps(content), media_type="application/json")
@@ -1,20 +1,103 @@
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.config import SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL, SEARCH_FAST_SERIALIZATION
+from app.database import get_read_db, inventory_version, on_inventory_change, run_db, sync_external_writes
 from app.controllers.vehicle_controller import VehicleController
-from mcp_server.schemas import VehicleSearchRequest, VehicleResponse
-from typing import List
+from app.index.facets import facet_counts
+from app.ranking import RELEVANCE
+from mcp_server.batch import run_batch
+from mcp_server.cache import SearchCache, canonical_key
+from mcp_server.pagination import InvalidCursor, decode_cursor, encode_cursor
+from mcp_server.relaxation import relax
+from mcp_server.serialization import VEHICLE_COLUMNS, dumps, json_response, vehicle_dict, vehicle_dicts
+from mcp_server.schemas import (
+    FacetCounts, VehicleSearchRequest, VehicleSearchBatchRequest, VehicleSearchPageRequest,
+    VehicleSearchPage, VehicleSearchRelaxed, VehicleStreamRequest, VehicleResponse
+)
+from typing import List, Optional, Tuple
 
 app = FastAPI(title="MCP Vehicle Server")
 
+search_cache = SearchCache(max_entries=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL)
+on_inventory_change(search_cache.clear)
+
+
+def _lookup(db: Session, request: VehicleSearchRequest) -> Tuple[Optional[Tuple], Optional[List[dict]]]:
+    """Consulta o cache; retorna (chave, resultado ou None)."""
+    if not search_cache.enabled:
+        return None, None
+    key = canonical_key(request)
+    # Versão atualizada com escritas de outros processos (seed, importação)
+    return key, search_cache.get(key, version=sync_external_writes(db.get_bind()))
+
+
+# Colunas pedidas ao controller: tuplas no modo rápido, objetos ORM no padrão
+_COLUMNS = VEHICLE_COLUMNS if SEARCH_FAST_SERIALIZATION else None
+
+
+def _serialize(vehicles) -> List[dict]:
+    if SEARCH_FAST_SERIALIZATION:
+        return vehicle_dicts(vehicles)
+    return [VehicleResponse.model_validate(v).model_dump() for v in vehicles]
+
+
+def _respond(content):
+    """No modo rápido devolve os bytes prontos, sem revalidar pelo `response_model`."""
+    return json_response(content) if SEARCH_FAST_SERIALIZATION else content
+
+
+def _search(db: Session, request: VehicleSearchRequest) -> List[dict]:
+    """Executa uma busca (síncrona) passando pelo cache de resultados."""
+    key, cached = _lookup(db, request)
+    if cached is not None:
+        return cached
+
+    version = inventory_version()
+    results = _serialize(VehicleController.search_vehicles(db=db, columns=_COLUMNS, **request.model_dump()))
+    if key is not None:
+        search_cache.put(key, results, version=version)
+    return results
+
+
+def _search_relaxed(db: Session, request: VehicleSearchRequest) -> dict:
+    """Busca exata; sem resultados, a busca com o menor relaxamento que encontra algo."""
+    # Ranges invertidos são corrigidos antes: relaxar 2020..2015 sem trocar
+    # daria 2019..2016, uma faixa mais estreita depois da correção
+    ano_min, ano_max, preco_min, preco_max = VehicleController.validate_ranges(
+        request.ano_min, request.ano_max, request.preco_min, request.preco_max
+    )
+    request = request.model_copy(update=dict(ano_min=ano_min, ano_max=ano_max, preco_min=preco_min, preco_max=preco_max))
+    results = _search(db, request)
+    filters = request.model_dump(exclude={"limit", "sort"}, exclude_none=True)
+    if results:
+        return {"results": results, "filters": filters, "relaxed": []}
+
+    plan = relax(filters, lambda f: VehicleController.count_vehicles(db, limit=1, **f) > 0)
+    if plan is None:
+        return {"results": [], "filters": filters, "relaxed": []}
+
+    relaxed_filters, relaxations = plan
+    relaxed_request = VehicleSearchRequest(**relaxed_filters, limit=request.limit, sort=request.sort)
+    return {
+        "results": _search(db, relaxed_request),
+        "filters": relaxed_filters,
+        "relaxed": [r._asdict() for r in relaxations],
+    }
+
 
 @app.post("/search", response_model=List[VehicleResponse])
 async def search_vehicles(
     request: VehicleSearchRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Busca de veículos com filtros estruturados."""
-    vehicles = VehicleController.search_vehicles(
+    key, cached = _lookup(db, request)
+    if cached is not None:
+        return _respond(cached)
+
+    version = inventory_version()
+    vehicles = await VehicleController.asearch_vehicles(
         db=db,
         marca=request.marca,
         modelo=request.modelo,
@@ -24,9 +107,126 @@ async def search_vehicles(
         preco_min=request.preco_min,
         preco_max=request.preco_max,
         transmissao=request.transmissao,
-        limit=request.limit
+        limit=request.limit,
+        sort=request.sort,
+        columns=_COLUMNS
     )
-    return vehicles
+    results = _serialize(vehicles)
+    if key is not None:
+        search_cache.put(key, results, version=version)
+    return _respond(results)
+
+
+@app.post("/search/batch", response_model=List[List[VehicleResponse]])
+async def search_vehicles_batch(
+    request: VehicleSearchBatchRequest,
+    db: Session = Depends(get_read_db)
+):
+    """Várias buscas em uma requisição e uma sessão de banco.
+
+    Retorna uma lista de resultados na mesma ordem de `searches`.
+    """
+    return _respond(await run_db(run_batch, request.searches, lambda search: _search(db, search)))
+
+
+@app.post("/search/relaxed", response_model=VehicleSearchRelaxed)
+async def search_vehicles_relaxed(
+    request: VehicleSearchRequest,
+    db: Session = Depends(get_read_db)
+):
+    """Busca com relaxamento progressivo dos filtros, numa só requisição.
+
+    Se a busca exata não encontra nada, o servidor amplia ano e preço e
+    remove combustível/câmbio o mínimo necessário (ver
+    `mcp_server.relaxation`) e informa em `relaxed` o que mudou.
+    """
+    return _respond(await run_db(_search_relaxed, db, request))
+
+
+@app.post("/search/page", response_model=VehicleSearchPage)
+async def search_vehicles_page(
+    request: VehicleSearchPageRequest,
+    db: Session = Depends(get_read_db)
+):
+    """Busca paginada em ordem de id (keyset).
+
+    Envie o `next_cursor` da resposta, com os mesmos filtros, para obter a
+    próxima página; `next_cursor` nulo indica a última página.
+    """
+    if request.sort == RELEVANCE:
+        raise HTTPException(status_code=400, detail="Ordenação por relevância não suporta paginação")
+    filters = request.model_dump(exclude={"cursor", "limit"})
+    try:
+        after = decode_cursor(request.cursor, filters) if request.cursor else None
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    vehicles, has_more = await run_db(
+        VehicleController.search_vehicles_page, db,
+        after=after, limit=request.limit, columns=_COLUMNS, **filters
+    )
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor(VehicleController.page_key(vehicles[-1], request.sort), filters)
+    return _respond({"results": _serialize(vehicles), "next_cursor": next_cursor})
+
+
+@app.post("/search/stream")
+async def stream_vehicles(
+    request: VehicleStreamRequest,
+    db: Session = Depends(get_read_db)
+):
+    """Todos os resultados como NDJSON (um veículo por linha), sem teto de 100.
+
+    As linhas são lidas do banco em lotes e enviadas conforme chegam; o
+    servidor nunca monta a lista completa em memória.
+    """
+    if request.sort == RELEVANCE:
+        raise HTTPException(status_code=400, detail="Ordenação por relevância não suporta streaming")
+    filters = request.model_dump(exclude={"limit", "max_results", "batch_size"})
+    # Valida antes de começar a resposta: depois do primeiro byte não há como
+    # devolver erro HTTP.
+    VehicleController.validate_ranges(
+        filters["ano_min"], filters["ano_max"], filters["preco_min"], filters["preco_max"]
+    )
+    # A sessão de `get_read_db` é fechada antes do streaming terminar; o gerador
+    # abre a sua no mesmo engine.
+    bind = db.get_bind()
+
+    def lines():
+        session = Session(bind=bind)
+        try:
+            for vehicle in VehicleController.iter_vehicles(
+                session, batch_size=request.batch_size, max_results=request.max_results,
+                columns=_COLUMNS, **filters
+            ):
+                if SEARCH_FAST_SERIALIZATION:
+                    yield dumps(vehicle_dict(vehicle)) + b"\n"
+                else:
+                    yield VehicleResponse.model_validate(vehicle).model_dump_json() + "\n"
+        finally:
+            session.close()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.post("/facets", response_model=FacetCounts)
+async def vehicle_facets(
+    request: VehicleSearchRequest,
+    db: Session = Depends(get_read_db)
+):
+    """Quantos veículos passam nos filtros, por marca, combustível, câmbio e faixas de ano e preço.
+
+    `limit` e `sort` são ignorados. Com o índice de facetas (scripts/init_db.py),
+    as contagens vêm do cubo mantido por triggers, sem varrer a tabela.
+    """
+    return await run_db(facet_counts, db, **request.model_dump(exclude={"limit", "sort"}))
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Contadores do cache de buscas (hits, misses, despejos)."""
+    return search_cache.stats()
 
 
 @app.get("/health")
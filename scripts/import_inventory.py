@@ -0,0 +1,328 @@
+"""Importação em massa de feeds de estoque (CSV ou Parquet) para `vehicles`.
+
+Uso:
+    python -m scripts.import_inventory feed.csv
+    python -m scripts.import_inventory feed.parquet --batch-size 200000 --rejects rejeitados.csv
+
+O arquivo é lido em lotes, sem carregá-lo inteiro: CSV por memory-map,
+Parquet por lotes do pyarrow (opcional, `pip install pyarrow`). Cada lote
+é validado coluna a coluna com NumPy (obrigatórios, tamanhos, enums de
+combustível/câmbio, faixas numéricas) e as linhas válidas entram com
+upsert por `placa` (`ON CONFLICT DO UPDATE`), uma transação por lote.
+Linhas inválidas vão para um CSV à parte, com a linha de origem e o
+motivo, sem interromper a carga.
+
+Durante a carga os índices B-tree de `vehicles` são removidos e recriados
+no final: criar um índice uma vez custa menos que mantê-lo a cada linha.
+A restrição UNIQUE de `placa` fica, pois o upsert depende dela, e os
+triggers também: com o servidor no ar, o dicionário de texto e o cubo de
+facetas precisam acompanhar cada lote, senão buscas por marcas novas do
+feed voltam vazias até o fim da carga.
+"""
+import argparse
+import csv
+import logging
+import mmap
+import os
+import time
+import unicodedata
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.engine import Connection, Engine
+
+from app.controllers.vehicle_controller import VehicleController
+from app.database import create_writer_engine
+from app.models.vehicle import FuelType, TransmissionType, Vehicle
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FEED_COLUMNS = (
+    "marca", "modelo", "ano", "motorizacao", "combustivel", "cor",
+    "quilometragem", "portas", "transmissao", "preco", "proprietarios", "placa",
+)
+# proprietarios pode faltar (padrão 1, como no modelo)
+REQUIRED_COLUMNS = tuple(c for c in FEED_COLUMNS if c != "proprietarios")
+TEXT_COLUMNS = ("marca", "modelo", "motorizacao", "cor", "placa")
+ENUM_COLUMNS = {"combustivel": FuelType, "transmissao": TransmissionType}
+# coluna -> (mínimo, máximo) inclusivos; None = sem limite
+INT_RANGES = {
+    "ano": (VehicleController.MIN_YEAR, VehicleController.CURRENT_YEAR + 1),
+    "quilometragem": (0, None),
+    "portas": (1, 6),
+    "proprietarios": (1, None),
+}
+
+_UPSERT_SQL = (
+    f"INSERT INTO vehicles ({', '.join(FEED_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in FEED_COLUMNS)}) "
+    "ON CONFLICT (placa) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in FEED_COLUMNS if c != "placa")
+)
+
+
+class Batch(NamedTuple):
+    first_line: int  # linha do arquivo do primeiro registro (cabeçalho = 1)
+    columns: Dict[str, np.ndarray]  # valores brutos (dtype object)
+    raw: List[List[Any]]  # registros originais, para o arquivo de rejeitados
+
+
+class ImportReport(NamedTuple):
+    read: int
+    imported: int
+    rejected: int
+    seconds: float
+    rejects_path: Optional[str]
+
+
+def _strip_accents(text: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+
+def _enum_lookup(enum_cls) -> Dict[str, str]:
+    """Valor ou nome, sem caixa nem acento -> nome gravado no banco."""
+    lookup = {}
+    for member in enum_cls:
+        for key in (member.value, member.name):
+            lookup[key.lower()] = lookup[_strip_accents(key.lower())] = member.name
+    return lookup
+
+
+_ENUM_LOOKUPS = {name: _enum_lookup(enum_cls) for name, enum_cls in ENUM_COLUMNS.items()}
+_MAX_LENGTHS = {name: Vehicle.__table__.c[name].type.length for name in TEXT_COLUMNS}
+
+
+def read_csv_batches(path: str, batch_size: int) -> Iterator[Batch]:
+    """Lotes de um CSV com cabeçalho, lido por memory-map."""
+    if os.path.getsize(path) == 0:
+        raise ValueError(f"Arquivo vazio: {path}")
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        reader = csv.reader(line.decode("utf-8-sig") for line in iter(mm.readline, b""))
+        header = [name.strip().lower() for name in next(reader)]
+        rows: List[List[str]] = []
+        first_line = 2
+        for row in reader:
+            rows.append(row)
+            if len(rows) == batch_size:
+                yield _batch(header, rows, first_line)
+                first_line = reader.line_num + 1
+                rows = []
+        if rows:
+            yield _batch(header, rows, first_line)
+
+
+def read_parquet_batches(path: str, batch_size: int) -> Iterator[Batch]:
+    """Lotes de um Parquet (memory-map do pyarrow)."""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Leitura de Parquet requer pyarrow: pip install pyarrow") from None
+
+    parquet = pq.ParquetFile(path, memory_map=True)
+    header = [name.lower() for name in parquet.schema_arrow.names]
+    first_line = 2
+    for record_batch in parquet.iter_batches(batch_size=batch_size):
+        rows = [list(row) for row in zip(*(column.to_pylist() for column in record_batch.columns))]
+        yield _batch(header, rows, first_line)
+        first_line += len(rows)
+
+
+def _batch(header: List[str], rows: List[List[Any]], first_line: int) -> Batch:
+    width = len(header)
+    # Registros com número errado de campos viram colunas vazias e são rejeitados na validação
+    padded = [row if len(row) == width else [None] * width for row in rows]
+    matrix = np.empty((len(rows), width), dtype=object)
+    matrix[:] = padded
+    columns = {name: matrix[:, i] for i, name in enumerate(header)}
+    columns["_campos"] = np.array([len(row) == width for row in rows], dtype=bool)
+    return Batch(first_line, columns, rows)
+
+
+def _text(values: np.ndarray) -> np.ndarray:
+    """Strings sem espaços nas pontas; None vira ''."""
+    values = np.where(values == None, "", values).astype(str)  # noqa: E711 - comparação elemento a elemento
+    return np.char.strip(values)
+
+
+def _numbers(values: np.ndarray) -> np.ndarray:
+    """float64; NaN onde o valor não é número."""
+    try:
+        return values.astype(float)
+    except (TypeError, ValueError):
+        def parse(value):
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return np.nan
+        return np.array([parse(v) for v in values], dtype=float)
+
+
+def validate_batch(columns: Dict[str, np.ndarray]) -> Tuple[np.ndarray, List[tuple]]:
+    """Valida um lote coluna a coluna.
+
+    Returns:
+        (motivo de rejeição por linha, None se válida; linhas válidas
+        prontas para o upsert, na ordem de FEED_COLUMNS)
+    """
+    size = len(columns["_campos"])
+    reason = np.full(size, None, dtype=object)
+
+    def reject(mask: np.ndarray, message: str) -> None:
+        reason[mask & (reason == None)] = message  # noqa: E711
+
+    reject(~columns["_campos"], "número de campos diferente do cabeçalho")
+
+    values: Dict[str, np.ndarray] = {}
+    for name in TEXT_COLUMNS:
+        text = _text(columns[name])
+        reject(text == "", f"{name} vazio")
+        reject(np.char.str_len(text) > _MAX_LENGTHS[name], f"{name} com mais de {_MAX_LENGTHS[name]} caracteres")
+        values[name] = text
+
+    for name, lookup in _ENUM_LOOKUPS.items():
+        text = np.char.lower(_text(columns[name]))
+        # Só os valores distintos passam pelo dicionário; o resto é indexação
+        unique, inverse = np.unique(text, return_inverse=True)
+        mapped = np.array([lookup.get(u) or lookup.get(_strip_accents(u)) for u in unique], dtype=object)[inverse]
+        reject(mapped == None, f"{name} inválido")  # noqa: E711
+        values[name] = mapped
+
+    for name, (low, high) in INT_RANGES.items():
+        if name == "proprietarios" and name not in columns:
+            values[name] = np.ones(size)
+            continue
+        raw = columns[name]
+        if name == "proprietarios":
+            raw = np.where(_text(raw) == "", 1, raw)
+        number = _numbers(raw)
+        invalid = np.isnan(number) | (np.mod(np.nan_to_num(number), 1) != 0)
+        reject(invalid, f"{name} não é inteiro")
+        out_of_range = ~invalid & (number < low)
+        if high is not None:
+            out_of_range |= ~invalid & (number > high)
+        reject(out_of_range, f"{name} fora de {low}..{high if high is not None else '∞'}")
+        values[name] = number
+
+    preco = _numbers(columns["preco"])
+    reject(np.isnan(preco), "preco não é número")
+    reject(~np.isnan(preco) & (preco <= 0), "preco deve ser positivo")
+    values["preco"] = np.round(preco, 2)
+
+    valid = reason == None  # noqa: E711
+    ordered = []
+    for name in FEED_COLUMNS:
+        column = values[name][valid]
+        ordered.append(column.astype(int).tolist() if name in INT_RANGES else column.tolist())
+    return reason, list(zip(*ordered))
+
+
+def _defer_indexes(conn: Connection) -> List[str]:
+    """Remove os índices de `vehicles` e retorna o DDL para recriá-los.
+
+    Os triggers ficam: mantêm `vehicle_terms`/`vehicle_facets` em dia
+    durante a carga, para os leitores do servidor.
+    """
+    indexes = conn.exec_driver_sql(
+        "SELECT name, sql FROM sqlite_master "
+        "WHERE tbl_name = 'vehicles' AND type = 'index' AND sql IS NOT NULL"
+    ).fetchall()
+    for name, _ in indexes:
+        conn.exec_driver_sql(f'DROP INDEX "{name}"')
+    return [sql for _, sql in indexes]
+
+
+def _restore_indexes(engine: Engine, statements: List[str]) -> None:
+    """Recria os índices removidos por `_defer_indexes`."""
+    with engine.begin() as conn:
+        for statement in statements:
+            conn.exec_driver_sql(statement)
+
+
+def import_inventory(
+    path: str,
+    engine: Optional[Engine] = None,
+    batch_size: int = 100_000,
+    rejects_path: Optional[str] = None,
+    file_format: Optional[str] = None
+) -> ImportReport:
+    """Importa um feed CSV/Parquet com upsert por placa.
+
+    Args:
+        path: Arquivo do feed (cabeçalho com FEED_COLUMNS; proprietarios opcional)
+        engine: Engine de destino (padrão: conexão de escrita do app, perfil bulk_load)
+        batch_size: Registros por lote (e por transação)
+        rejects_path: CSV das linhas rejeitadas (padrão: `<feed>.rejeitados.csv`)
+        file_format: "csv" ou "parquet" (padrão: pela extensão)
+
+    Returns:
+        Contagens, duração e o arquivo de rejeitados (None se não houve)
+
+    Raises:
+        ValueError: Arquivo vazio ou sem colunas obrigatórias
+    """
+    engine = engine or create_writer_engine()
+    file_format = file_format or ("parquet" if path.lower().endswith((".parquet", ".pq")) else "csv")
+    reader = read_parquet_batches if file_format == "parquet" else read_csv_batches
+    rejects_path = rejects_path or f"{os.path.splitext(path)[0]}.rejeitados.csv"
+
+    started = time.perf_counter()
+    read = imported = rejected = 0
+    rejects_file = rejects_writer = None
+    with engine.begin() as conn:
+        deferred = _defer_indexes(conn)
+    logger.info(f"{len(deferred)} índices adiados até o fim da carga")
+    try:
+        for batch in reader(path, batch_size):
+            missing = [c for c in REQUIRED_COLUMNS if c not in batch.columns]
+            if missing:
+                raise ValueError(f"Colunas obrigatórias ausentes no feed: {', '.join(missing)}")
+
+            reason, rows = validate_batch(batch.columns)
+            if rows:
+                with engine.begin() as conn:
+                    conn.exec_driver_sql(_UPSERT_SQL, rows)
+
+            bad = np.flatnonzero(reason != None)  # noqa: E711
+            if len(bad):
+                if rejects_writer is None:
+                    rejects_file = open(rejects_path, "w", newline="", encoding="utf-8")
+                    rejects_writer = csv.writer(rejects_file)
+                    header = [c for c in batch.columns if c != "_campos"]
+                    rejects_writer.writerow(["linha", "motivo", *header])
+                for i in bad:
+                    rejects_writer.writerow([batch.first_line + i, reason[i], *batch.raw[i]])
+
+            read += len(reason)
+            imported += len(rows)
+            rejected += len(bad)
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"{read:,} lidas, {imported:,} importadas, {rejected:,} rejeitadas "
+                f"({read / elapsed:,.0f} linhas/s)"
+            )
+    finally:
+        if rejects_file is not None:
+            rejects_file.close()
+        rebuild_started = time.perf_counter()
+        _restore_indexes(engine, deferred)
+        logger.info(f"Índices recriados em {time.perf_counter() - rebuild_started:.1f}s")
+
+    elapsed = time.perf_counter() - started
+    report = ImportReport(read, imported, rejected, elapsed, rejects_path if rejected else None)
+    print(
+        f"{imported:,} de {read:,} linhas importadas em {elapsed:.1f}s ({read / elapsed:,.0f} linhas/s); "
+        f"{rejected:,} rejeitadas" + (f" em {rejects_path}" if rejected else "")
+    )
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importa um feed de estoque (CSV ou Parquet)")
+    parser.add_argument("path")
+    parser.add_argument("--batch-size", type=int, default=100_000, help="registros por lote/transação")
+    parser.add_argument("--rejects", default=None, help="CSV das linhas rejeitadas")
+    parser.add_argument("--format", choices=("csv", "parquet"), default=None, help="padrão: pela extensão")
+    args = parser.parse_args()
+
+    import_inventory(args.path, batch_size=args.batch_size, rejects_path=args.rejects, file_format=args.format)
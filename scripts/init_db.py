@@ -1,11 +1,26 @@
 from app.database import engine, Base
 from app.models.vehicle import Vehicle
+from app.index.facets import create_facet_index
+from app.index.text import create_text_index
+
+# Índices simples substituídos pelos compostos de `Vehicle.__table_args__`
+OBSOLETE_INDEXES = ("ix_vehicles_marca", "ix_vehicles_ano", "ix_vehicles_combustivel")
 
 
 def init_database():
     print("Criando tabelas no banco de dados...")
     Base.metadata.create_all(bind=engine)
+    # create_all não adiciona índices novos em tabelas já existentes
+    for index in Vehicle.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+    with engine.begin() as conn:
+        for name in OBSOLETE_INDEXES:
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
     print("Tabelas criadas com sucesso!")
+    create_text_index(engine)
+    print("Índice de texto (marca/modelo) criado!")
+    create_facet_index(engine)
+    print("Índice de facetas criado!")
 
 
 if __name__ == "__main__":
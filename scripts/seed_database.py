@@ -1,35 +1,33 @@
 from faker import Faker
+import argparse
+import os
 import random
 import logging
+import string
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy.engine import Engine
 from sqlalchemy.exc import IntegrityError
-from app.database import SessionLocal
+from app.database import SessionLocal, engine as default_engine
 from app.models.vehicle import Vehicle, FuelType, TransmissionType
+from app.catalog import MARCAS, MODELOS, CORES, MOTORIZACOES
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 fake = Faker('pt_BR')
 
-MARCAS = ["Toyota", "Honda", "Ford", "Chevrolet", "Volkswagen", "Fiat",
-          "Hyundai", "Nissan", "Renault", "Jeep", "BMW", "Mercedes-Benz"]
-
-MODELOS = {
-    "Toyota": ["Corolla", "Hilux", "Etios", "Yaris", "Camry", "RAV4"],
-    "Honda": ["Civic", "HR-V", "City", "Fit", "Accord", "CR-V"],
-    "Ford": ["Ka", "Ranger", "EcoSport", "Fusion", "Focus", "Edge"],
-    "Chevrolet": ["Onix", "S10", "Tracker", "Cruze", "Spin", "Trailblazer"],
-    "Volkswagen": ["Gol", "Polo", "Virtus", "T-Cross", "Tiguan", "Jetta"],
-    "Fiat": ["Uno", "Argo", "Toro", "Mobi", "Pulse", "Strada"],
-    "Hyundai": ["HB20", "Creta", "Tucson", "i30", "Santa Fe", "Azera"],
-    "Nissan": ["Kicks", "Versa", "Frontier", "Sentra", "March", "Leaf"],
-    "Renault": ["Kwid", "Sandero", "Duster", "Captur", "Oroch", "Fluence"],
-    "Jeep": ["Renegade", "Compass", "Commander", "Wrangler", "Grand Cherokee"],
-    "BMW": ["320i", "X1", "X3", "X5", "M3", "530i"],
-    "Mercedes-Benz": ["C180", "GLA", "GLC", "A200", "E250", "S500"]
-}
-
-CORES = ["Branco", "Preto", "Prata", "Vermelho", "Azul", "Cinza", "Verde", "Dourado", "Marrom"]
-MOTORIZACOES = ["1.0", "1.4", "1.6", "1.8", "2.0", "2.4", "3.0", "3.5"]
+_INSERT_SQL = (
+    "INSERT INTO vehicles (id, marca, modelo, ano, motorizacao, combustivel, cor, "
+    "quilometragem, portas, transmissao, preco, proprietarios, placa) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_LETTERS = string.ascii_uppercase
+# Placas sintéticas começam assim; placas reais (AAA-0000, AAA0A00) e as do
+# Faker começam com três letras, então um feed importado nunca colide com elas
+SEED_PLATE_PREFIX = "S-"
 
 
 def generate_unique_plate(existing_plates: set) -> str:
@@ -87,7 +85,7 @@ def seed_database(count=150):
         raise ValueError("Count deve ser maior que 0")
 
     if count > 1000:
-        logger.warning(f"Count muito alto ({count}). Isso pode demorar.")
+        logger.warning(f"Count muito alto ({count}). Isso pode demorar; use --bulk para grandes volumes.")
 
     db = SessionLocal()
     existing_plates = set()
@@ -138,5 +136,142 @@ def seed_database(count=150):
         logger.info("Sessão do banco de dados fechada")
 
 
+def plate_for(n: int) -> str:
+    """Placa única derivada de um contador (formato S-AAA0000).
+
+    O prefixo `SEED_PLATE_PREFIX` não existe em placas reais nem do Faker.
+    """
+    digits = n % 10000
+    n //= 10000
+    letters = ""
+    for _ in range(3):
+        letters = _LETTERS[n % 26] + letters
+        n //= 26
+    suffix = _LETTERS[n % 26] if n else ""
+    return f"{SEED_PLATE_PREFIX}{letters}{suffix}{digits:04d}"
+
+
+def generate_rows(start: int, count: int, seed: int) -> List[Tuple]:
+    """Gera `count` linhas a partir do id `start + 1`, de forma determinística.
+
+    Mesma distribuição de `generate_vehicle`, vetorizada com NumPy (sem Faker);
+    enums já pelo nome gravado no banco, na ordem de `_INSERT_SQL`.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng([seed, start])
+    marca_idx = rng.integers(0, len(MARCAS), count)
+    modelo_pick = rng.integers(0, 6, count)
+    ano = rng.integers(2010, 2025, count)
+    base_price = rng.uniform(20000, 150000, count)
+    preco = np.round(np.maximum(base_price * (1 - (2024 - ano) * 0.05), 15000), 2)
+    fuels = [f.name for f in FuelType]
+    transmissions = [t.name for t in TransmissionType]
+    fuel_idx = rng.integers(0, len(fuels), count)
+    trans_idx = rng.integers(0, len(transmissions), count)
+    cor_idx = rng.integers(0, len(CORES), count)
+    motor_idx = rng.integers(0, len(MOTORIZACOES), count)
+    km = rng.integers(0, 200001, count)
+    portas = rng.choice([2, 4, 5], count)
+    donos = rng.integers(1, 4, count)
+
+    rows = []
+    for i in range(count):
+        marca = MARCAS[marca_idx[i]]
+        modelos = MODELOS[marca]
+        row_id = start + i + 1
+        rows.append((
+            row_id, marca, modelos[modelo_pick[i] % len(modelos)], int(ano[i]),
+            MOTORIZACOES[motor_idx[i]], fuels[fuel_idx[i]], CORES[cor_idx[i]],
+            int(km[i]), int(portas[i]), transmissions[trans_idx[i]], float(preco[i]),
+            int(donos[i]), plate_for(row_id)
+        ))
+    return rows
+
+
+def _generate_chunk(chunk: Tuple[int, int, int]) -> List[Tuple]:
+    start, count, seed = chunk
+    return generate_rows(start, count, seed)
+
+
+def _generated_chunks(chunks: List[Tuple[int, int, int]], workers: int) -> Iterator[List[Tuple]]:
+    """Blocos gerados em `workers` processos, na ordem, com no máximo 2 por processo em memória."""
+    if workers <= 1:
+        yield from map(_generate_chunk, chunks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_generate_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def seed_database_bulk(
+    count: int,
+    chunk_size: int = 50_000,
+    workers: Optional[int] = None,
+    seed: int = 42,
+    engine: Optional[Engine] = None
+) -> int:
+    """Popula o banco com milhões de veículos sintéticos, em blocos.
+
+    Cada bloco de `chunk_size` linhas é gerado num processo separado e
+    gravado com `executemany` numa transação própria. Os ids continuam a
+    partir do maior id do banco e a placa deriva do id (`plate_for`), então
+    não há conjunto de placas em memória nem nova tentativa. Com a mesma
+    `seed` e o mesmo banco de partida, o resultado independe de `workers`.
+
+    Args:
+        count: Número de veículos a inserir
+        chunk_size: Linhas por bloco (e por transação)
+        workers: Processos geradores (padrão: número de CPUs)
+        seed: Semente da geração
+        engine: Engine de destino (padrão: banco do app)
+
+    Returns:
+        Número de veículos inseridos
+    """
+    if count <= 0:
+        raise ValueError("Count deve ser maior que 0")
+    engine = engine or default_engine
+    workers = workers or os.cpu_count() or 1
+
+    with engine.connect() as conn:
+        first_id = conn.exec_driver_sql("SELECT COALESCE(MAX(id), 0) FROM vehicles").scalar()
+    chunks = [
+        (first_id + offset, min(chunk_size, count - offset), seed)
+        for offset in range(0, count, chunk_size)
+    ]
+    logger.info(f"Gerando {count:,} veículos em {len(chunks)} blocos com {workers} processos (seed={seed})")
+
+    started = time.perf_counter()
+    written = 0
+    for rows in _generated_chunks(chunks, workers):
+        with engine.begin() as conn:
+            conn.exec_driver_sql(_INSERT_SQL, rows)
+        written += len(rows)
+        elapsed = time.perf_counter() - started
+        logger.info(f"{written:,}/{count:,} veículos ({written / elapsed:,.0f} linhas/s)")
+
+    elapsed = time.perf_counter() - started
+    print(f"{written:,} veículos inseridos em {elapsed:.1f}s ({written / elapsed:,.0f} linhas/s)")
+    return written
+
+
 if __name__ == "__main__":
-    seed_database(150)
+    parser = argparse.ArgumentParser(description="Popula o banco com veículos fictícios")
+    parser.add_argument("count", type=int, nargs="?", default=150)
+    parser.add_argument("--bulk", action="store_true",
+                        help="modo em massa: blocos gerados em processos (milhões de linhas)")
+    parser.add_argument("--workers", type=int, default=None, help="processos geradores (--bulk)")
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="linhas por transação (--bulk)")
+    parser.add_argument("--seed", type=int, default=42, help="semente da geração (--bulk)")
+    args = parser.parse_args()
+
+    if args.bulk:
+        seed_database_bulk(args.count, chunk_size=args.chunk_size, workers=args.workers, seed=args.seed)
+    else:
+        seed_database(args.count)
@@ -1,5 +1,9 @@
+import time
+
 import pytest
-from agent.agent import VehicleAgent
+from langchain.schema import AIMessage, HumanMessage
+from agent.agent import SEARCH_TOOL_NAME, VehicleAgent
+from benchmarks.fake_llm import RecordingChatModel, fake_llm
 
 
 @pytest.fixture
@@ -14,3 +18,238 @@ def test_agent_initialization(agent):
 def test_should_search_detection(agent):
     assert agent.should_search("Vou buscar os veículos agora")
     assert not agent.should_search("Qual sua marca preferida?")
+
+
+def _prompt_chars(calls):
+    return sum(len(msg.content) for messages in calls for msg in messages)
+
+
+def test_tool_calling_turn_returns_reply_and_filters_in_one_call():
+    llm = fake_llm(AIMessage(
+        content="Vou buscar Toyota Corolla até R$ 100.000. Um momento...",
+        tool_calls=[{"name": SEARCH_TOOL_NAME, "id": "1",
+                     "args": {"marca": "Toyota", "modelo": "Corolla", "preco_max": 100000, "foo": 1}}],
+    ))
+    agent = VehicleAgent(api_key="fake", tool_calling=True, llm=llm)
+
+    turn = agent.chat_turn("quero um corolla até 100 mil")
+
+    assert turn.should_search
+    assert turn.filters == {"marca": "Toyota", "modelo": "Corolla", "preco_max": 100000}
+    assert turn.reply.startswith("Vou buscar")
+    assert len(llm.calls) == 1
+    assert isinstance(agent.conversation_history[-1], AIMessage)
+
+
+def test_tool_calling_turn_without_tool_call_does_not_search():
+    llm = fake_llm(AIMessage(content="Qual faixa de preço você procura?"))
+    agent = VehicleAgent(api_key="fake", tool_calling=True, llm=llm)
+
+    turn = agent.chat_turn("quero um carro")
+
+    assert not turn.should_search
+    assert turn.reply == "Qual faixa de preço você procura?"
+    assert len(llm.calls) == 1
+
+
+def test_tool_calling_turn_falls_back_to_extraction_on_invalid_args():
+    llm = fake_llm(
+        AIMessage(content="", invalid_tool_calls=[
+            {"name": SEARCH_TOOL_NAME, "args": "{marca:", "id": "1", "error": "json"}
+        ]),
+        AIMessage(content='{"marca": "Fiat"}'),
+    )
+    agent = VehicleAgent(api_key="fake", tool_calling=True, llm=llm, fast_extraction=False)
+
+    turn = agent.chat_turn("tem fiat?")
+
+    assert turn.filters == {"marca": "Fiat"}
+    assert turn.reply
+    assert len(llm.calls) == 2
+
+
+def test_tool_calling_halves_calls_and_prompt_size():
+    reply = "Vou buscar Fiat Mobi. Um momento..."
+    two_step = fake_llm(AIMessage(content=reply), AIMessage(content='{"marca": "Fiat", "modelo": "Mobi"}'))
+    single = fake_llm(AIMessage(content=reply, tool_calls=[
+        {"name": SEARCH_TOOL_NAME, "id": "1", "args": {"marca": "Fiat", "modelo": "Mobi"}}
+    ]))
+
+    legacy_turn = VehicleAgent(api_key="fake", llm=two_step, fast_extraction=False).chat_turn("tem mobi?")
+    tool_turn = VehicleAgent(api_key="fake", tool_calling=True, llm=single).chat_turn("tem mobi?")
+
+    assert legacy_turn == tool_turn
+    assert len(two_step.calls) == 2
+    assert len(single.calls) == 1
+    assert _prompt_chars(single.calls) < _prompt_chars(two_step.calls)
+
+
+def test_tool_calling_restores_history_on_error():
+    class FailingModel(RecordingChatModel):
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            raise RuntimeError("timeout")
+
+    agent = VehicleAgent(api_key="fake", tool_calling=True, llm=FailingModel(responses=[], calls=[]))
+
+    with pytest.raises(RuntimeError):
+        agent.chat_turn("oi")
+    assert len(agent.conversation_history) == 1
+
+
+async def _collect(agent, message, on_token=None):
+    tokens = []
+    async for token in agent.chat_stream(message):
+        tokens.append(token)
+        if on_token:
+            on_token(token)
+    return tokens
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_yields_tokens_and_appends_full_reply():
+    llm = fake_llm(AIMessage(content="Qual faixa de preço você procura?"))
+    agent = VehicleAgent(api_key="fake", llm=llm)
+
+    tokens = await _collect(agent, "quero um carro")
+
+    assert len(tokens) > 1
+    assert "".join(tokens) == "Qual faixa de preço você procura?"
+    assert agent.conversation_history[-1].content == "Qual faixa de preço você procura?"
+    assert agent.pending_filters is None
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_starts_search_before_reply_ends():
+    llm = fake_llm(AIMessage(content="Vou buscar um Toyota Corolla 2020 até R$ 80.000. Um momento..."))
+    agent = VehicleAgent(api_key="fake", llm=llm)
+    seen = []
+
+    tokens = await _collect(agent, "Corolla 2020 até 80k", lambda t: seen.append(agent.pending_filters))
+
+    first_with_search = next(i for i, task in enumerate(seen) if task is not None)
+    assert "".join(tokens[:first_with_search + 1]).endswith("Vou buscar")
+    assert await agent.pending_filters == {
+        "marca": "Toyota", "modelo": "Corolla", "ano_min": 2020, "ano_max": 2020, "preco_max": 80000
+    }
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_tool_calling_filters():
+    llm = fake_llm(AIMessage(content="", tool_calls=[
+        {"name": SEARCH_TOOL_NAME, "id": "1", "args": {"marca": "Fiat", "modelo": "Mobi"}}
+    ]))
+    agent = VehicleAgent(api_key="fake", tool_calling=True, llm=llm)
+
+    tokens = await _collect(agent, "tem mobi?")
+
+    assert "".join(tokens) == "Vou buscar veículos. Um momento..."
+    assert await agent.pending_filters == {"marca": "Fiat", "modelo": "Mobi"}
+    assert len(llm.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_restores_history_on_error():
+    class BrokenStream(RecordingChatModel):
+        def _chunks(self, messages, stop, **kwargs):
+            yield from list(super()._chunks(messages, stop, **kwargs))[:2]
+            raise RuntimeError("conexão caiu")
+
+    agent = VehicleAgent(api_key="fake", llm=BrokenStream(responses=[AIMessage(content="Vou buscar agora")], calls=[]))
+
+    with pytest.raises(RuntimeError):
+        await _collect(agent, "corolla")
+    assert len(agent.conversation_history) == 1
+    assert agent.pending_filters is None
+
+
+class AsyncOnly(RecordingChatModel):
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        raise AssertionError("chamada síncrona dentro do event loop")
+
+
+@pytest.mark.asyncio
+async def test_achat_uses_ainvoke_and_updates_history():
+    llm = AsyncOnly(responses=[AIMessage(content="Qual faixa de preço?")], calls=[])
+    agent = VehicleAgent(api_key="fake", llm=llm)
+
+    assert await agent.achat("quero um carro") == "Qual faixa de preço?"
+    assert [m.content for m in agent.conversation_history[1:]] == ["quero um carro", "Qual faixa de preço?"]
+
+
+@pytest.mark.asyncio
+async def test_aextract_filters_uses_ainvoke():
+    llm = AsyncOnly(responses=[AIMessage(content='```json\n{"marca": "Fiat", "foo": 1}\n```')], calls=[])
+    agent = VehicleAgent(api_key="fake", llm=llm, fast_extraction=False)
+    agent.conversation_history.append(HumanMessage(content="algo da fiat"))
+
+    assert await agent.aextract_filters() == {"marca": "Fiat"}
+    assert agent.history.search_state == {"marca": "Fiat"}
+
+
+@pytest.mark.asyncio
+async def test_achat_turn_runs_reply_and_extraction_concurrently():
+    reply = AIMessage(content="Vou buscar agora")
+    llm = fake_llm(reply, AIMessage(content='{"marca": "Fiat"}'), sleep=0.05)
+    # "algo da fiat": o extrator por regras vê a marca, mas com confiança baixa
+    agent = VehicleAgent(api_key="fake", llm=llm)
+
+    started = time.perf_counter()
+    turn = await agent.achat_turn("algo da fiat")
+    elapsed = time.perf_counter() - started
+
+    assert turn == ("Vou buscar agora", {"marca": "Fiat"})
+    assert len(llm.calls) == 2
+    # 3 tokens a 50 ms por chamada: em sequência seriam ~300 ms
+    assert elapsed < 0.25
+
+
+@pytest.mark.asyncio
+async def test_achat_turn_cancels_speculative_extraction_without_search():
+    extraction = AIMessage(content='{"marca": "Fiat", "modelo": "Uno", "ano_min": 2010, "cor": "Preto"}')
+    llm = fake_llm(AIMessage(content="Qual faixa de preço?"), extraction, sleep=0.05)
+    agent = VehicleAgent(api_key="fake", llm=llm)
+
+    started = time.perf_counter()
+    turn = await agent.achat_turn("algo da fiat")
+    elapsed = time.perf_counter() - started
+
+    assert not turn.should_search
+    assert agent.history.search_state is None
+    # Não espera a extração (bem mais longa que a resposta)
+    assert elapsed < 0.35
+
+
+@pytest.mark.asyncio
+async def test_achat_turn_does_not_extract_on_greeting():
+    llm = fake_llm(AIMessage(content="Olá! Que tipo de carro você procura?"), AIMessage(content="{}"))
+    agent = VehicleAgent(api_key="fake", llm=llm)
+
+    turn = await agent.achat_turn("oi, tudo bem?")
+
+    assert not turn.should_search
+    assert len(llm.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_achat_turn_extracts_after_reply_without_speculation():
+    """Sem filtros na mensagem, a extração vê a resposta do agente no histórico."""
+    llm = fake_llm(AIMessage(content="Vou buscar SUVs da Jeep"), AIMessage(content='{"marca": "Jeep"}'))
+    agent = VehicleAgent(api_key="fake", llm=llm, fast_extraction=False)
+
+    turn = await agent.achat_turn("pode ser o que você sugeriu")
+
+    assert turn == ("Vou buscar SUVs da Jeep", {"marca": "Jeep"})
+    assert "Agent: Vou buscar SUVs da Jeep" in llm.calls[1][0].content
+
+
+@pytest.mark.asyncio
+async def test_achat_turn_restores_history_on_error():
+    class Broken(RecordingChatModel):
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+            raise RuntimeError("timeout")
+
+    agent = VehicleAgent(api_key="fake", tool_calling=True, llm=Broken(responses=[AIMessage(content="")], calls=[]))
+
+    with pytest.raises(RuntimeError):
+        await agent.achat_turn("corolla")
+    assert len(agent.conversation_history) == 1
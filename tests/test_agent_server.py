@@ -0,0 +1,239 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi import WebSocketDisconnect
+from fastapi.testclient import TestClient
+from langchain.schema import AIMessage
+from agent.agent import VehicleAgent
+from agent_server.server import AgentService, create_app
+from agent_server.sessions import SessionRegistry
+from benchmarks.fake_llm import fake_llm
+from mcp_client.client import MCPClient
+
+SEARCH_REPLY = AIMessage(content="Vou buscar um Toyota Corolla. Um momento...")
+QUESTION_REPLY = AIMessage(content="Qual faixa de preço você procura?")
+VEHICLES = [{"id": 1, "marca": "Toyota", "modelo": "Corolla", "ano": 2020, "preco": 79000.0,
+             "quilometragem": 30000, "combustivel": "Flex", "cor": "Preto", "transmissao": "Automática"}]
+
+
+def _service(*replies, sleep=None, **kwargs):
+    searches = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        filters = json.loads(request.content)
+        searches.append(filters)
+        return httpx.Response(200, json={"results": VEHICLES, "filters": filters, "relaxed": []})
+
+    llm = fake_llm(*replies, sleep=sleep)
+    service = AgentService(
+        agent_factory=lambda: VehicleAgent(api_key="fake", llm=llm),
+        mcp_client=MCPClient(transport=httpx.MockTransport(handler)),
+        **kwargs
+    )
+    service.searches = searches
+    return service
+
+
+def _sse_events(response):
+    return [json.loads(line[len("data: "):]) for line in response.text.splitlines() if line.startswith("data: ")]
+
+
+def test_sse_turn_streams_tokens_without_search():
+    client = TestClient(create_app(_service(QUESTION_REPLY)))
+    session_id = client.post("/sessions").json()["session_id"]
+
+    events = _sse_events(client.post(f"/sessions/{session_id}/messages", json={"message": "quero um carro"}))
+
+    tokens = [e["content"] for e in events if e["type"] == "token"]
+    assert "".join(tokens) == QUESTION_REPLY.content
+    assert events[-1] == {"type": "done"}
+    assert not any(e["type"] == "results" for e in events)
+
+
+def test_sse_turn_with_search_returns_results():
+    service = _service(SEARCH_REPLY)
+    client = TestClient(create_app(service))
+
+    session_id = client.post("/sessions").json()["session_id"]
+
+    events = _sse_events(client.post(f"/sessions/{session_id}/messages", json={"message": "Corolla até 80 mil"}))
+
+    results = next(e for e in events if e["type"] == "results")
+    assert results["filters"] == {"marca": "Toyota", "modelo": "Corolla", "preco_max": 80000}
+    assert results["vehicles"] == VEHICLES
+    assert "Toyota Corolla" in results["text"]
+    assert service.searches == [results["filters"]]
+
+
+def test_websocket_keeps_history_per_session():
+    service = _service(QUESTION_REPLY)
+    client = TestClient(create_app(service))
+
+    s1, s2 = (client.post("/sessions").json()["session_id"] for _ in range(2))
+
+    with client.websocket_connect(f"/sessions/{s1}/ws") as ws:
+        for message in ("oi", "quero um carro"):
+            ws.send_json({"message": message})
+            while ws.receive_json()["type"] != "done":
+                pass
+    with client.websocket_connect(f"/sessions/{s2}/ws") as ws:
+        ws.send_json({"message": "oi"})
+        while ws.receive_json()["type"] != "done":
+            pass
+
+    assert len(service.registry.get(s1).agent.conversation_history) == 5
+    assert len(service.registry.get(s2).agent.conversation_history) == 3
+
+
+def test_websocket_empty_message_reports_error():
+    client = TestClient(create_app(_service(QUESTION_REPLY)))
+    session_id = client.post("/sessions").json()["session_id"]
+
+    with client.websocket_connect(f"/sessions/{session_id}/ws") as ws:
+        ws.send_json({"message": "  "})
+        assert ws.receive_json()["type"] == "error"
+        assert ws.receive_json() == {"type": "done"}
+
+
+def test_delete_session():
+    client = TestClient(create_app(_service(QUESTION_REPLY)))
+    session_id = client.post("/sessions").json()["session_id"]
+
+    assert client.delete(f"/sessions/{session_id}").status_code == 204
+    assert client.delete(f"/sessions/{session_id}").status_code == 404
+
+
+def test_unknown_session_is_not_created_implicitly():
+    service = _service(QUESTION_REPLY)
+    client = TestClient(create_app(service))
+
+    response = client.post("/sessions/desconhecida/messages", json={"message": "oi"})
+    assert response.status_code == 404
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect("/sessions/desconhecida/ws"):
+            pass
+    assert closed.value.code == 4404
+    assert "desconhecida" not in service.registry
+
+
+def test_websocket_reports_session_expired_mid_conversation():
+    service = _service(QUESTION_REPLY)
+    client = TestClient(create_app(service))
+    session_id = client.post("/sessions").json()["session_id"]
+
+    with client.websocket_connect(f"/sessions/{session_id}/ws") as ws:
+        service.registry.remove(session_id)
+        ws.send_json({"message": "oi"})
+        assert ws.receive_json() == {"type": "error", "detail": "Sessão não encontrada"}
+        with pytest.raises(WebSocketDisconnect):
+            ws.receive_json()
+    assert session_id not in service.registry
+
+
+def test_registry_evicts_least_recently_used():
+    registry = SessionRegistry(lambda: object(), max_sessions=2)
+    registry.get("a")
+    registry.get("b")
+    registry.get("a")
+    registry.get("c")
+
+    assert "b" not in registry
+    assert "a" in registry and "c" in registry
+    assert registry.evictions == 1
+
+
+def test_registry_expires_idle_sessions(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("agent_server.sessions.time.monotonic", lambda: now[0])
+    registry = SessionRegistry(lambda: object(), idle_timeout=60)
+    registry.get("a")
+    now[0] += 30
+    registry.get("b")
+    now[0] += 45
+
+    assert registry.expire_idle() == 1
+    assert "a" not in registry and "b" in registry
+
+
+@pytest.mark.asyncio
+async def test_idle_expiry_follows_the_end_of_each_turn(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("agent_server.sessions.time.monotonic", lambda: now[0])
+    service = _service(QUESTION_REPLY, idle_timeout=60)
+    service.registry.get("a")
+
+    # "b" é usada durante um turno longo de "a", que termina depois
+    async for event in service.turn("a", "oi"):
+        if "b" not in service.registry:
+            service.registry.get("b")
+        if event["type"] == "token":
+            now[0] += 10
+    now[0] += 55
+
+    assert service.registry.expire_idle() == 1
+    assert "b" not in service.registry and "a" in service.registry
+
+
+@pytest.mark.asyncio
+async def test_registry_keeps_sessions_with_turn_in_progress(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("agent_server.sessions.time.monotonic", lambda: now[0])
+    registry = SessionRegistry(lambda: object(), max_sessions=2, idle_timeout=60)
+    busy = registry.get("a")
+    registry.get("b")
+
+    async with busy.lock:
+        registry.get("c")
+        assert "a" in registry and "b" not in registry
+
+        now[0] += 120
+        assert registry.expire_idle() == 1
+        assert list(registry._sessions) == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_turn_reports_agent_factory_errors():
+    def broken():
+        raise ValueError("OPENAI_API_KEY não configurada!")
+
+    service = AgentService(agent_factory=broken, mcp_client=MCPClient(transport=httpx.MockTransport(None)))
+
+    events = [event async for event in service.turn("s1", "oi")]
+
+    assert events == [{"type": "error", "detail": "OPENAI_API_KEY não configurada!"}, {"type": "done"}]
+    assert "s1" not in service.registry
+
+
+def test_app_prepares_agent_factory_off_the_event_loop():
+    calls = []
+
+    class Factory:
+        def prepare(self):
+            with pytest.raises(RuntimeError):
+                asyncio.get_running_loop()
+            calls.append("prepare")
+
+        def __call__(self):
+            return VehicleAgent(api_key="fake", llm=fake_llm(QUESTION_REPLY))
+
+    service = AgentService(agent_factory=Factory(), mcp_client=MCPClient(transport=httpx.MockTransport(None)))
+    with TestClient(create_app(service)) as client:
+        assert client.get("/health").status_code == 200
+
+    assert calls == ["prepare"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_llm_turns_are_capped():
+    service = _service(QUESTION_REPLY, sleep=0.005, max_concurrent_llm=2)
+
+    async def run(session_id):
+        return [event async for event in service.turn(session_id, "oi")]
+
+    results = await asyncio.gather(*(run(f"s{i}") for i in range(6)))
+
+    assert all(events[-1] == {"type": "done"} for events in results)
+    assert service.peak_llm_turns == 2
+    assert service.active_llm_turns == 0
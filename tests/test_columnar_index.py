@@ -0,0 +1,108 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.controllers.vehicle_controller import VehicleController
+from app.database import Base, SessionLocal
+from app.index.columnar import ColumnarIndex
+from app.models.vehicle import Vehicle, FuelType, TransmissionType
+
+
+@pytest.fixture
+def db_session():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def empty_session(tmp_path):
+    """Banco SQLite vazio e isolado, para testes que escrevem."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'vehicles.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _vehicle(placa, **overrides):
+    data = dict(
+        marca="Toyota", modelo="Corolla", ano=2020, motorizacao="2.0",
+        combustivel=FuelType.FLEX, cor="Prata", quilometragem=30000, portas=4,
+        transmissao=TransmissionType.CVT, preco=95000.0, placa=placa
+    )
+    data.update(overrides)
+    return Vehicle(**data)
+
+
+@pytest.mark.parametrize("filters", [
+    dict(marca="Toyota"),
+    dict(marca="toy"),
+    dict(marca="TOYOTA"),
+    dict(modelo="cor"),
+    dict(preco_min=30000, preco_max=50000),
+    dict(ano_min=2015, ano_max=2020),
+    dict(marca="Toyota", ano_min=2018, preco_max=100000),
+    dict(combustivel="Flex"),
+    dict(combustivel="FLEX"),
+    dict(combustivel="flex"),
+    dict(transmissao="Automática"),
+    dict(marca="BMW", preco_min=100000),
+    dict(marca="xyz"),
+])
+def test_columnar_matches_sql(db_session, filters):
+    """Índice colunar retorna o mesmo conjunto que a query SQL."""
+    expected = VehicleController.search_vehicles(db_session, limit=100, **filters)
+    got = ColumnarIndex().search(db_session, limit=100, **filters)
+
+    assert len(expected) < 100, "filtro precisa caber no limit para comparar conjuntos"
+    assert {v.id for v in got} == {v.id for v in expected}
+
+
+def test_columnar_respects_limit(db_session):
+    results = ColumnarIndex().search(db_session, limit=5)
+    assert len(results) == 5
+
+
+def test_controller_uses_columnar_engine(db_session, monkeypatch):
+    from app.controllers import vehicle_controller
+
+    expected = VehicleController.search_vehicles(db_session, marca="Toyota", limit=100)
+    monkeypatch.setattr(vehicle_controller, "SEARCH_ENGINE", "columnar")
+    got = VehicleController.search_vehicles(db_session, marca="Toyota", limit=100)
+
+    assert {v.id for v in got} == {v.id for v in expected}
+
+
+def test_columnar_refreshes_after_write(empty_session):
+    index = ColumnarIndex()
+    assert index.search(empty_session, marca="Toyota") == []
+
+    empty_session.add(_vehicle("TST-0001"))
+    empty_session.commit()
+    assert index.is_stale()
+    assert [v.placa for v in index.search(empty_session, marca="Toyota")] == ["TST-0001"]
+
+    empty_session.query(Vehicle).delete()
+    empty_session.commit()
+    assert index.search(empty_session, marca="Toyota") == []
+
+
+def test_columnar_refreshes_after_write_from_another_process(empty_session):
+    """Escrita fora do SQLAlchemy deste processo (como os scripts de seed/importação)."""
+    index = ColumnarIndex()
+    assert index.search(empty_session, marca="Toyota") == []
+    empty_session.rollback()
+
+    external = sqlite3.connect(empty_session.get_bind().url.database)
+    external.execute(
+        "INSERT INTO vehicles (marca, modelo, ano, motorizacao, combustivel, cor, quilometragem, "
+        "portas, transmissao, preco, proprietarios, placa) "
+        "VALUES ('Toyota', 'Corolla', 2020, '2.0', 'FLEX', 'Prata', 30000, 4, 'CVT', 95000, 1, 'EXT-0001')"
+    )
+    external.commit()
+    external.close()
+
+    assert [v.placa for v in index.search(empty_session, marca="Toyota")] == ["EXT-0001"]
@@ -0,0 +1,127 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.filters import matches_filters
+from app.index import set_table_present
+from app.index.facets import FACETS_TABLE, create_facet_index, facet_counts, has_facet_index
+from app.models.vehicle import Vehicle
+from mcp_server.schemas import VehicleResponse
+from mcp_server.server import app
+from scripts.seed_database import generate_vehicle
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'vehicles.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    plates = set()
+    session.add_all(generate_vehicle(plates) for _ in range(300))
+    session.commit()
+    session.close()
+    yield engine
+    set_table_present(engine, FACETS_TABLE, None)
+    engine.dispose()
+
+
+def _facets(engine, **filters):
+    session = sessionmaker(bind=engine)()
+    try:
+        return facet_counts(session, **filters)
+    finally:
+        session.close()
+
+
+def _expected_total(engine, **filters):
+    session = sessionmaker(bind=engine)()
+    try:
+        return sum(matches_filters(VehicleResponse.model_validate(v).model_dump(), filters) for v in session.query(Vehicle))
+    finally:
+        session.close()
+
+
+@pytest.mark.parametrize("filters", [
+    dict(),
+    dict(marca="toy"),
+    dict(combustivel="Flex", transmissao="Manual"),
+    dict(ano_min=2015, ano_max=2020),
+    dict(preco_min=40000, preco_max=90000),
+    dict(preco_min=35500.5, preco_max=87250),
+    dict(preco_min=52000, preco_max=58000),
+    dict(marca="Ford", modelo="eco", preco_max=60000.99),
+    dict(marca="xyz"),
+])
+def test_facet_index_matches_table_scan(engine, filters):
+    """Com ou sem cubo (inclusive faixas de preço cortadas), as contagens são iguais."""
+    before = _facets(engine, **filters)
+    create_facet_index(engine)
+    after = _facets(engine, **filters)
+
+    assert after == before
+    assert after["total"] == _expected_total(engine, **filters)
+    assert sum(after["combustivel"].values()) == after["total"]
+    assert sum(b["count"] for b in after["preco"]) == after["total"]
+
+
+def test_triggers_follow_writes(engine):
+    create_facet_index(engine)
+    session = sessionmaker(bind=engine)()
+    vehicle = generate_vehicle(set())
+    vehicle.marca, vehicle.placa, vehicle.preco = "Marca Nova", "ZZZ-9999", 45000.0
+    session.add(vehicle)
+    session.commit()
+    assert _facets(engine, marca="Marca Nova")["preco"] == [{"min": 40000, "max": 50000, "count": 1}]
+
+    vehicle.preco = 61000.0
+    session.commit()
+    assert _facets(engine, marca="Marca Nova")["preco"] == [{"min": 60000, "max": 70000, "count": 1}]
+
+    session.delete(vehicle)
+    session.commit()
+    session.close()
+    assert _facets(engine, marca="Marca Nova")["total"] == 0
+    assert _facets(engine) == _facets_without_index(engine)
+
+
+def _facets_without_index(engine):
+    set_table_present(engine, FACETS_TABLE, False)
+    try:
+        return _facets(engine)
+    finally:
+        set_table_present(engine, FACETS_TABLE, True)
+
+
+def test_missing_facet_index_is_rechecked_after_external_build(engine):
+    """Cubo criado por outro processo (init_db) passa a ser usado sem reiniciar."""
+    session = sessionmaker(bind=engine)()
+    assert has_facet_index(session) is False
+
+    other = create_engine(engine.url)
+    create_facet_index(other)
+    set_table_present(other, FACETS_TABLE, None)
+    other.dispose()
+
+    assert has_facet_index(session) is True
+    session.close()
+
+
+def test_facets_endpoint():
+    client = TestClient(app)
+    response = client.post("/facets", json={"marca": "Toyota", "limit": 5})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] > 5
+    assert list(body["marca"]) == ["Toyota"]
+    assert set(body["combustivel"]) <= {"Gasolina", "Etanol", "Flex", "Diesel", "Elétrico", "Híbrido"}
+    assert sum(b["count"] for b in body["ano"]) == body["total"]
+
+
+def test_facets_endpoint_orders_inverted_range():
+    client = TestClient(app)
+    inverted = client.post("/facets", json={"preco_min": 90000, "preco_max": 10000}).json()
+    ordered = client.post("/facets", json={"preco_min": 10000, "preco_max": 90000}).json()
+
+    assert inverted == ordered
@@ -0,0 +1,101 @@
+import json
+import time
+from pathlib import Path
+
+import pytest
+from langchain.schema import AIMessage, HumanMessage
+from agent.agent import VehicleAgent
+from agent.filter_parser import FilterParser
+from app.catalog import load_model_brands
+from app.database import SessionLocal
+from benchmarks.fake_llm import fake_llm
+
+CORPUS = json.loads((Path(__file__).parent / "data" / "filter_corpus.json").read_text(encoding="utf-8"))
+
+
+@pytest.fixture
+def parser():
+    return FilterParser()
+
+
+def test_corpus_agreement_with_llm_labels(parser):
+    confident = [
+        (case, result) for case in CORPUS
+        for result in [parser.parse(case["message"])]
+        if result.confidence >= parser.min_confidence
+    ]
+
+    disagreements = [(c["message"], r.filters) for c, r in confident if r.filters != c["filters"]]
+    assert disagreements == []
+    assert len(confident) / len(CORPUS) >= 0.7
+
+
+def test_corpus_latency(parser):
+    started = time.perf_counter()
+    for case in CORPUS:
+        parser.parse(case["message"])
+    per_message_ms = (time.perf_counter() - started) * 1000 / len(CORPUS)
+    # Uma chamada ao LLM leva centenas de ms; o parser, bem menos de 1 ms
+    assert per_message_ms < 5
+
+
+@pytest.mark.parametrize("message", [
+    "civic ou corolla",          # duas intenções
+    "Honda Corolla",             # marca e modelo em conflito
+    "e até 60 mil?",             # refinamento sem veículo: depende do contexto
+    "mostra o mesmo só que 2019",
+    "quero um corolla 2.0",      # termo não reconhecido
+])
+def test_low_confidence_messages(parser, message):
+    assert parser.parse(message).confidence < parser.min_confidence
+
+
+@pytest.mark.parametrize("message, filters", [
+    # O "R$" é do preço; o 2022 continua sendo ano
+    ("Fiat Toro 2022 até R$ 150.000",
+     {"marca": "Fiat", "modelo": "Toro", "ano_min": 2022, "ano_max": 2022, "preco_max": 150000}),
+    # "mil km" é quilometragem, não teto de preço
+    ("Corolla com menos de 50 mil km", {"marca": "Toyota", "modelo": "Corolla", "quilometragem_max": 50000}),
+    ("Tem Civic? 2020 com 40 mil km",
+     {"marca": "Honda", "modelo": "Civic", "ano_min": 2020, "ano_max": 2020, "quilometragem_max": 40000}),
+])
+def test_years_and_mileage_are_not_read_as_prices(parser, message, filters):
+    assert parser.parse(message).filters == filters
+
+
+def test_minimum_mileage_goes_to_llm(parser):
+    result = parser.parse("Corolla com mais de 100 mil km")
+    assert "preco_min" not in result.filters
+    assert result.confidence < parser.min_confidence
+
+
+def test_parser_uses_catalog_from_database():
+    db = SessionLocal()
+    try:
+        catalog = load_model_brands(db)
+    finally:
+        db.close()
+    marca, modelos = next(iter(catalog.items()))
+
+    result = FilterParser(catalog).parse(modelos[0])
+    assert result.filters["marca"] == marca
+
+
+def test_extract_filters_skips_llm_for_simple_message():
+    llm = fake_llm(AIMessage(content='{"marca": "Toyota"}'))
+    agent = VehicleAgent(api_key="fake", llm=llm)
+    agent.conversation_history.append(HumanMessage(content="Corolla 2020 até 80k"))
+
+    assert agent.extract_filters() == {
+        "marca": "Toyota", "modelo": "Corolla", "ano_min": 2020, "ano_max": 2020, "preco_max": 80000
+    }
+    assert llm.calls == []
+
+
+def test_extract_filters_falls_back_to_llm_on_low_confidence():
+    llm = fake_llm(AIMessage(content='{"marca": "Honda", "modelo": "Civic"}'))
+    agent = VehicleAgent(api_key="fake", llm=llm)
+    agent.conversation_history.append(HumanMessage(content="civic ou corolla"))
+
+    assert agent.extract_filters() == {"marca": "Honda", "modelo": "Civic"}
+    assert len(llm.calls) == 1
@@ -0,0 +1,70 @@
+import sys
+
+import pytest
+from langchain.schema import AIMessage, HumanMessage, SystemMessage
+from agent.agent import VehicleAgent
+from agent.history import HistoryManager, SUMMARY_HEADER, approx_tokens
+from benchmarks.fake_llm import fake_llm, scripted_session
+
+
+def _history(turns):
+    messages = [SystemMessage(content="sistema")]
+    for i in range(turns):
+        messages += [HumanMessage(content=f"pedido {i} " + "x" * 200), AIMessage(content="resposta " + "y" * 200)]
+    return messages
+
+
+def test_history_under_budget_is_untouched():
+    history = _history(3)
+    original = list(history)
+    HistoryManager(max_tokens=10_000).compact(history)
+    assert history == original
+
+
+def test_compact_keeps_system_and_last_turns():
+    manager = HistoryManager(max_tokens=200, keep_turns=2)
+    history = _history(10)
+
+    manager.compact(history)
+
+    assert history[0].content == "sistema"
+    assert history[1].content.startswith(SUMMARY_HEADER)
+    assert "pedido 7" in history[1].content
+    assert [m.content.split()[1] for m in history[2::2]] == ["8", "9"]
+
+
+def test_summary_carries_search_state():
+    manager = HistoryManager(max_tokens=200, keep_turns=1)
+    manager.update_search_state({"marca": "Toyota", "preco_max": 80000})
+    history = _history(5)
+
+    manager.compact(history)
+
+    assert "marca=Toyota, preco_max=80000" in history[1].content
+
+
+def test_keep_turns_must_be_positive():
+    with pytest.raises(ValueError):
+        HistoryManager(keep_turns=0)
+
+
+def _session_prompt_tokens(history, turns=50):
+    llm = fake_llm()
+    agent = VehicleAgent(api_key="fake", llm=llm, fast_extraction=False, history=history)
+    chat_tokens = []
+    for message in scripted_session(turns):
+        before = len(llm.calls)
+        agent.chat_turn(message)
+        chat_tokens.append(llm.prompt_tokens()[before])
+    return chat_tokens, agent
+
+
+def test_prompt_tokens_plateau_over_50_turn_session():
+    unbounded, _ = _session_prompt_tokens(HistoryManager(max_tokens=sys.maxsize))
+    budgeted, agent = _session_prompt_tokens(HistoryManager(max_tokens=1000, keep_turns=4))
+
+    # Sem limite o prompt cresce a cada turno; com orçamento ele estabiliza
+    assert unbounded[-1] > 2 * budgeted[-1]
+    assert max(budgeted) <= 1000 + approx_tokens([HumanMessage(content=max(scripted_session(10), key=len))])
+    assert sum(budgeted) < sum(unbounded)
+    assert agent.history.search_state is not None
@@ -0,0 +1,172 @@
+import csv
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.controllers.vehicle_controller import VehicleController
+from app.database import Base
+from app.index import set_table_present
+from app.index.facets import FACETS_TABLE, create_facet_index, facet_counts
+from app.index.text import TERMS_TABLE, create_text_index
+from app.models.vehicle import FuelType, TransmissionType, Vehicle
+from scripts import import_inventory as importer
+from scripts.import_inventory import FEED_COLUMNS, import_inventory
+from scripts.seed_database import generate_vehicle
+
+GOOD = ["Toyota", "Corolla", "2020", "2.0", "Flex", "Prata", "35000", "4", "Automática", "98000.50", "1", "IMP-0001"]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'vehicles.db'}")
+    Base.metadata.create_all(bind=engine)
+    create_text_index(engine)
+    create_facet_index(engine)
+    session = sessionmaker(bind=engine)()
+    plates = set()
+    session.add_all(generate_vehicle(plates) for _ in range(100))
+    session.commit()
+    session.close()
+    yield engine
+    set_table_present(engine, FACETS_TABLE, None)
+    set_table_present(engine, TERMS_TABLE, None)
+    engine.dispose()
+
+
+def _write_feed(path, rows, header=FEED_COLUMNS):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return str(path)
+
+
+def _schema(engine):
+    with engine.connect() as conn:
+        return conn.exec_driver_sql(
+            "SELECT type, name, sql FROM sqlite_master WHERE tbl_name = 'vehicles' ORDER BY name"
+        ).fetchall()
+
+
+def test_imports_valid_rows_and_rejects_the_rest(engine, tmp_path):
+    rows = [
+        GOOD,
+        [*GOOD[:4], "gasolina", *GOOD[5:8], "MANUAL", *GOOD[9:11], "IMP-0002"],  # valor em caixa baixa e nome do enum
+        [*GOOD[:4], "Hidrogênio", *GOOD[5:11], "IMP-0003"],
+        [*GOOD[:2], "1850", *GOOD[3:11], "IMP-0004"],
+        [*GOOD[:9], "-10", *GOOD[10:11], "IMP-0005"],
+        ["", *GOOD[1:11], "IMP-0006"],
+        GOOD[:5],
+        [*GOOD[:10], "", "IMP-0007"],  # proprietarios vazio -> 1
+    ]
+    feed = _write_feed(tmp_path / "feed.csv", rows)
+
+    report = import_inventory(feed, engine=engine, batch_size=3)
+
+    assert (report.read, report.imported, report.rejected) == (8, 3, 5)
+    with open(report.rejects_path, encoding="utf-8") as f:
+        rejects = list(csv.DictReader(f))
+    assert [(r["linha"], r["motivo"]) for r in rejects] == [
+        ("4", "combustivel inválido"),
+        ("5", "ano fora de 1900..2027"),
+        ("6", "preco deve ser positivo"),
+        ("7", "marca vazio"),
+        ("8", "número de campos diferente do cabeçalho"),
+    ]
+    assert rejects[0]["placa"] == "IMP-0003"
+
+    session = sessionmaker(bind=engine)()
+    second = session.query(Vehicle).filter_by(placa="IMP-0002").one()
+    assert (second.combustivel, second.transmissao) == (FuelType.GASOLINA, TransmissionType.MANUAL)
+    assert session.query(Vehicle).filter_by(placa="IMP-0007").one().proprietarios == 1
+    assert session.query(Vehicle).count() == 103
+    session.close()
+
+
+def test_upsert_by_plate_updates_existing_vehicle(engine, tmp_path):
+    session = sessionmaker(bind=engine)()
+    existing = session.query(Vehicle).order_by(Vehicle.id).first()
+    vehicle_id, placa = existing.id, existing.placa
+    session.close()
+    updated = [*GOOD[:9], "12345.00", "3", placa]
+    feed = _write_feed(tmp_path / "feed.csv", [updated, [*GOOD[:11], "IMP-0009"]])
+
+    report = import_inventory(feed, engine=engine)
+
+    assert (report.imported, report.rejected, report.rejects_path) == (2, 0, None)
+    session = sessionmaker(bind=engine)()
+    vehicle = session.query(Vehicle).filter_by(placa=placa).one()
+    assert (vehicle.id, vehicle.marca, vehicle.preco, vehicle.proprietarios) == (vehicle_id, "Toyota", 12345.0, 3)
+    assert session.query(Vehicle).count() == 101
+    session.close()
+
+
+def test_indexes_and_derived_tables_are_restored(engine, tmp_path):
+    before = _schema(engine)
+    rows = [[*GOOD[:11], f"IMP-{i:04d}"] for i in range(50)]
+    rows[10][0] = "Lamborghini"
+    feed = _write_feed(tmp_path / "feed.csv", rows)
+
+    import_inventory(feed, engine=engine, batch_size=20)
+
+    assert _schema(engine) == before
+    session = sessionmaker(bind=engine)()
+    with_cube = facet_counts(session)
+    set_table_present(engine, FACETS_TABLE, False)
+    assert facet_counts(session) == with_cube
+    assert with_cube["total"] == 150
+    terms = session.connection().exec_driver_sql("SELECT valor FROM vehicle_terms WHERE coluna = 'marca' AND valor = 'Lamborghini'").fetchall()
+    assert terms
+    session.close()
+
+    # Triggers de volta: escritas normais continuam atualizando o cubo
+    session = sessionmaker(bind=engine)()
+    session.delete(session.query(Vehicle).filter_by(placa="IMP-0000").one())
+    session.commit()
+    set_table_present(engine, FACETS_TABLE, True)
+    assert facet_counts(session)["total"] == 149
+    session.close()
+
+
+def test_text_search_and_facets_follow_each_batch_during_the_load(engine, tmp_path, monkeypatch):
+    """Servidor no ar durante a importação: marcas novas do feed já aparecem."""
+    rows = [["Lamborghini", *GOOD[1:11], f"IMP-{i:04d}"] for i in range(40)]
+    feed = _write_feed(tmp_path / "feed.csv", rows)
+    seen = []
+    read_batches = importer.read_csv_batches
+
+    def batches(path, batch_size):
+        for batch in read_batches(path, batch_size):
+            yield batch
+            session = sessionmaker(bind=engine)()
+            found = VehicleController.search_vehicles(session, marca="lambo", limit=100)
+            seen.append((len(found), facet_counts(session, marca="Lamborghini")["total"]))
+            session.close()
+
+    monkeypatch.setattr(importer, "read_csv_batches", batches)
+    import_inventory(feed, engine=engine, batch_size=20)
+
+    assert seen == [(20, 20), (40, 40)]
+
+
+def test_missing_required_column_aborts_and_keeps_indexes(engine, tmp_path):
+    before = _schema(engine)
+    header = [c for c in FEED_COLUMNS if c != "preco"]
+    feed = _write_feed(tmp_path / "feed.csv", [GOOD[:9] + GOOD[10:]], header=header)
+
+    with pytest.raises(ValueError, match="preco"):
+        import_inventory(feed, engine=engine)
+
+    assert _schema(engine) == before
+
+
+def test_parquet_feed(engine, tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    values = [[*GOOD[:11], "IMP-0100"], [*GOOD[:4], "Nuclear", *GOOD[5:11], "IMP-0101"]]
+    table = pa.table({name: [row[i] for row in values] for i, name in enumerate(FEED_COLUMNS)})
+    pq.write_table(table, tmp_path / "feed.parquet")
+
+    report = import_inventory(str(tmp_path / "feed.parquet"), engine=engine)
+
+    assert (report.imported, report.rejected) == (1, 1)
@@ -0,0 +1,63 @@
+import asyncio
+import random
+
+import httpx
+from app.catalog import MARCAS
+from benchmarks.bench_load import MIX, compare, run_load
+from mcp_server.server import app, search_cache
+
+
+def _client():
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    return httpx.AsyncClient(base_url="http://mcp", transport=transport)
+
+
+def test_every_scenario_in_the_mix_is_a_valid_search():
+    async def post_all():
+        async with _client() as client:
+            statuses = {}
+            for seed in range(10):
+                rng = random.Random(seed)
+                for scenario in MIX:
+                    response = await client.post("/search", json=scenario.payload(rng))
+                    statuses.setdefault(scenario.name, set()).add(response.status_code)
+            return statuses
+
+    assert all(codes == {200} for codes in asyncio.run(post_all()).values())
+
+
+def test_scenarios_only_use_catalog_brands():
+    """Marca fora do catálogo mede uma busca vazia, não o cenário descrito."""
+    for seed in range(20):
+        rng = random.Random(seed)
+        for scenario in MIX:
+            marca = scenario.payload(rng).get("marca")
+            if marca is not None and scenario.name != "marca_parcial":
+                assert marca in MARCAS, f"{scenario.name}: {marca}"
+
+
+def test_run_load_reports_throughput_and_percentiles():
+    search_cache.clear()
+
+    async def drive():
+        async with _client() as client:
+            return await run_load(client, concurrency=3, duration=0.3)
+
+    result = asyncio.run(drive())
+
+    assert result["errors"] == 0 and result["requests"] > 0
+    assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"] <= result["max_ms"]
+    assert sum(s["requests"] for s in result["scenarios"].values()) == result["requests"]
+
+
+def test_compare_flags_throughput_and_latency_regressions():
+    def run(rps, p95, errors=0, rows=10_000):
+        return {"rows": rows, "concurrency": 8, "throughput_rps": rps, "p95_ms": p95, "errors": errors}
+
+    baseline = {"results": [run(200, 40), run(50, 100, rows=1_000_000)]}
+    current = {"results": [run(170, 47), run(30, 130, errors=2, rows=1_000_000), run(10, 10, rows=5)]}
+
+    regressions = compare(baseline, current, tolerance=0.2)
+
+    assert len(regressions) == 3
+    assert all(r.startswith("1,000,000 linhas x 8 clientes") for r in regressions)
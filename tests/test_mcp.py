@@ -238,3 +238,25 @@ def test_search_partial_modelo_match(db_session):
     results = VehicleController.search_vehicles(db_session, modelo="cor")
     if results:
         assert all("cor" in v.modelo.lower() for v in results)
+
+
+# TESTES DO CAMINHO ASYNC
+
+@pytest.mark.asyncio
+async def test_asearch_vehicles_matches_sync(db_session):
+    """Versão async retorna o mesmo que a síncrona."""
+    expected = VehicleController.search_vehicles(db_session, marca="Toyota", limit=100)
+    results = await VehicleController.asearch_vehicles(db_session, marca="Toyota", limit=100)
+    assert [v.id for v in results] == [v.id for v in expected]
+
+
+@pytest.mark.asyncio
+async def test_run_db_executes_off_event_loop_thread():
+    """Queries rodam no pool de threads do banco, não na thread do loop."""
+    import threading
+    from app.database import run_db
+
+    loop_thread = threading.current_thread().name
+    worker_thread = await run_db(lambda: threading.current_thread().name)
+    assert worker_thread != loop_thread
+    assert worker_thread.startswith("db")
@@ -0,0 +1,205 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from mcp_client.client import MCPClient
+
+
+def _transport(calls):
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if request.url.path == "/health":
+            return httpx.Response(200, json={"status": "healthy"})
+        return httpx.Response(200, json=[{"id": 1, "marca": "Toyota"}])
+    return httpx.MockTransport(handler)
+
+
+@pytest.mark.asyncio
+async def test_client_reuses_single_http_client():
+    calls = []
+    client = MCPClient(transport=_transport(calls))
+
+    await client.health_check()
+    http_client = client.client
+    results = await client.search_vehicles({"marca": "Toyota"})
+
+    assert client.client is http_client
+    assert results == [{"id": 1, "marca": "Toyota"}]
+    assert [r.url.path for r in calls] == ["/health", "/search"]
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_client_context_manager_closes_pool():
+    async with MCPClient(transport=_transport([])) as client:
+        await client.health_check()
+        http_client = client.client
+
+    assert http_client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_client_applies_per_operation_timeouts():
+    calls = []
+    async with MCPClient(transport=_transport(calls), search_timeout=12, health_timeout=3) as client:
+        await client.health_check()
+        await client.search_vehicles({})
+
+    assert calls[0].extensions["timeout"]["read"] == 3
+    assert calls[1].extensions["timeout"]["read"] == 12
+
+
+@pytest.mark.asyncio
+async def test_client_search_batch_posts_all_searches():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json=[[{"id": 1}], []])
+
+    async with MCPClient(transport=httpx.MockTransport(handler)) as client:
+        results = await client.search_vehicles_batch([{"marca": "Toyota"}, {"marca": "Jeep"}])
+
+    assert results == [[{"id": 1}], []]
+    assert requests[0].url.path == "/search/batch"
+    assert b'"searches"' in requests[0].content
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [httpx.ReadTimeout("lento"), httpx.ConnectError("recusada")])
+async def test_client_logs_and_reraises_errors_on_every_search(caplog, error):
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise error
+
+    async with MCPClient(transport=httpx.MockTransport(handler)) as client:
+        calls = [
+            client.facets({}),
+            client.search_vehicles_page({}),
+            anext(client.stream_vehicles({})),
+        ]
+        for call in calls:
+            with pytest.raises(type(error)):
+                await call
+
+    prefix = "Timeout" if isinstance(error, httpx.TimeoutException) else "Erro de conexão"
+    messages = [r.getMessage() for r in caplog.records if r.levelname == "ERROR"]
+    assert len(messages) == 3
+    assert all(m.startswith(prefix) for m in messages)
+
+
+@pytest.mark.asyncio
+async def test_client_stream_yields_rows_incrementally():
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = b'{"id": 1}\n{"id": 2}\n{"id": 3}\n'
+        return httpx.Response(200, content=body, headers={"content-type": "application/x-ndjson"})
+
+    async with MCPClient(transport=httpx.MockTransport(handler)) as client:
+        rows = [row async for row in client.stream_vehicles({"marca": "Toyota"})]
+
+    assert [r["id"] for r in rows] == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_in_process_client_calls_app_without_sockets(monkeypatch):
+    def no_sockets(*args, **kwargs):
+        raise AssertionError("cliente no processo abriu socket")
+
+    monkeypatch.setattr("socket.create_connection", no_sockets)
+    async with MCPClient.in_process() as client:
+        assert await client.health_check() == {"status": "healthy"}
+        results = await client.search_vehicles({"marca": "Toyota", "limit": 3})
+        relaxed = await client.search_vehicles_relaxed({"marca": "Toyota", "limit": 3})
+
+    assert 0 < len(results) <= 3
+    assert all(v["marca"] == "Toyota" for v in results)
+    assert relaxed["relaxed"] == []
+
+
+@pytest.mark.asyncio
+async def test_in_process_client_maps_app_errors_to_http_status(monkeypatch):
+    from app.controllers.vehicle_controller import VehicleController
+
+    async def broken(*args, **kwargs):
+        raise RuntimeError("banco indisponível")
+
+    monkeypatch.setattr(VehicleController, "asearch_vehicles", broken)
+    async with MCPClient.in_process() as client:
+        with pytest.raises(httpx.HTTPStatusError) as error:
+            await client.search_vehicles({"marca": "Marca Sem Cache"})
+
+    assert error.value.response.status_code == 500
+
+
+@pytest.mark.asyncio
+async def test_in_process_stream_yields_rows_before_app_finishes():
+    release = asyncio.Event()
+
+    async def app(scope, receive, send):
+        await receive()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b'{"id": 1}\n', "more_body": True})
+        await release.wait()
+        await send({"type": "http.response.body", "body": b'{"id": 2}\n'})
+
+    async with MCPClient.in_process(app=app) as client:
+        rows = client.stream_vehicles({})
+        assert await asyncio.wait_for(rows.__anext__(), timeout=1) == {"id": 1}
+        release.set()
+        assert [row async for row in rows] == [{"id": 2}]
+
+
+@pytest.mark.asyncio
+async def test_in_process_stream_from_server():
+    async with MCPClient.in_process() as client:
+        rows = [row async for row in client.stream_vehicles({"marca": "Toyota"}, max_results=5, batch_size=2)]
+
+    assert 0 < len(rows) <= 5
+    assert all(v["marca"] == "Toyota" for v in rows)
+
+
+@pytest.mark.asyncio
+async def test_wait_until_ready_polls_health_until_server_answers():
+    attempts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(request.url.path)
+        if len(attempts) < 3:
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={"status": "healthy"})
+
+    async with MCPClient(transport=httpx.MockTransport(handler)) as client:
+        waited = await client.wait_until_ready(timeout=5)
+
+    assert attempts == ["/health"] * 3
+    assert waited < 0.5
+
+
+@pytest.mark.asyncio
+async def test_wait_until_ready_gives_up_when_server_dies():
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("connection refused", request=request)
+
+    async with MCPClient(transport=httpx.MockTransport(handler)) as client:
+        with pytest.raises(TimeoutError):
+            await client.wait_until_ready(timeout=0.05)
+        with pytest.raises(TimeoutError, match="encerrou"):
+            await client.wait_until_ready(timeout=5, alive=lambda: False)
+
+
+@pytest.mark.asyncio
+async def test_embedded_http_server_starts_as_soon_as_health_answers(monkeypatch):
+    import main
+    from benchmarks.server import free_port
+
+    port = free_port()
+    monkeypatch.setattr(main, "MCP_TRANSPORT", "http")
+    monkeypatch.setattr(main, "MCP_SERVER_HOST", "127.0.0.1")
+    monkeypatch.setattr(main, "MCP_SERVER_PORT", port)
+
+    started = time.perf_counter()
+    async with main.create_mcp_client() as client:
+        await main.start_mcp_server(client)
+        assert await client.health_check() == {"status": "healthy"}
+
+    assert time.perf_counter() - started < 3
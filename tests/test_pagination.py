@@ -0,0 +1,84 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from app.controllers.vehicle_controller import VehicleController
+from app.database import SessionLocal
+from app.models.vehicle import Vehicle
+from mcp_server.pagination import encode_cursor
+from mcp_server.schemas import VehicleSearchPageRequest
+from mcp_server.server import app
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def db_session():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def _all_ids(db_session, **filters):
+    query = VehicleController.build_query(db_session, **filters)
+    return [v.id for v in query.order_by(Vehicle.id)]
+
+
+def test_page_walk_returns_every_match_once(client, db_session):
+    filters = {"combustivel": "Flex", "limit": 7}
+    seen, cursor = [], None
+    while True:
+        body = dict(filters, cursor=cursor) if cursor else filters
+        response = client.post("/search/page", json=body)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["results"]) <= 7
+        seen.extend(v["id"] for v in page["results"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == _all_ids(db_session, combustivel="Flex")
+
+
+def test_page_rejects_malformed_cursor(client):
+    response = client.post("/search/page", json={"cursor": "não-é-cursor"})
+    assert response.status_code == 400
+
+
+def test_page_rejects_cursor_from_other_filters(client):
+    first = client.post("/search/page", json={"marca": "Toyota", "limit": 1}).json()
+    assert first["next_cursor"]
+    response = client.post("/search/page", json={"marca": "Honda", "cursor": first["next_cursor"]})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("body, key", [
+    ({"marca": "Toyota"}, (1, 2)),
+    ({"marca": "Toyota", "sort": "preco_asc"}, (1,)),
+    ({"marca": "Toyota", "sort": "preco_asc"}, (50000, [1])),
+])
+def test_page_rejects_cursor_with_wrong_key(client, body, key):
+    filters = VehicleSearchPageRequest(**body).model_dump(exclude={"cursor", "limit"})
+    response = client.post("/search/page", json=dict(body, cursor=encode_cursor(key, filters)))
+    assert response.status_code == 400
+
+
+def test_stream_returns_all_matches_beyond_limit_cap(client, db_session):
+    with client.stream("POST", "/search/stream", json={"batch_size": 16}) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.iter_lines() if line]
+
+    expected = _all_ids(db_session)
+    assert len(expected) > 100
+    assert [r["id"] for r in rows] == expected
+
+
+def test_stream_respects_filters_and_max_results(client):
+    with client.stream("POST", "/search/stream", json={"ano_min": 2018, "max_results": 5}) as response:
+        rows = [json.loads(line) for line in response.iter_lines() if line]
+    assert len(rows) == 5
+    assert all(r["ano"] >= 2018 for r in rows)
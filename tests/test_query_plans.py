@@ -0,0 +1,132 @@
+"""Regressão de plano: nenhuma combinação de filtros do VehicleController varre a tabela.
+
+Captura o SQL que o controller realmente executa e roda `EXPLAIN QUERY
+PLAN` com os mesmos parâmetros, no esquema criado por `scripts/init_db.py`
+(índices do modelo + índice de texto + cubo de facetas).
+"""
+import itertools
+import re
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.controllers.vehicle_controller import VehicleController
+from app.database import Base
+from app.index.facets import create_facet_index
+from app.index.text import create_text_index
+from app.models.vehicle import FuelType, TransmissionType
+from app.ranking import SORT_OPTIONS
+from scripts.seed_database import generate_vehicle
+
+FILTERS = dict(
+    marca="toy", modelo="cor", ano_min=2015, ano_max=2020, combustivel=FuelType.FLEX,
+    preco_min=30000, preco_max=90000, transmissao=TransmissionType.AUTOMATICA,
+)
+COMBINATIONS = [
+    dict((name, FILTERS[name]) for name in names)
+    for size in range(1, len(FILTERS) + 1)
+    for names in itertools.combinations(FILTERS, size)
+]
+# Tabela inteira sem índice; "SCAN vehicles USING [COVERING] INDEX" percorre um índice em ordem
+FULL_SCAN = re.compile(r"^SCAN (TABLE )?vehicles( AS \w+)?$")
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('plans') / 'vehicles.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    plates = set()
+    session.add_all(generate_vehicle(plates) for _ in range(300))
+    session.commit()
+    session.close()
+    create_text_index(engine)
+    create_facet_index(engine)
+    yield engine
+    engine.dispose()
+
+
+@contextmanager
+def _captured(engine):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+def _full_scans(engine, run):
+    """Linhas do plano com varredura completa de `vehicles` nas queries de `run(session)`."""
+    session = sessionmaker(bind=engine)()
+    try:
+        with _captured(engine) as statements:
+            run(session)
+    finally:
+        session.close()
+
+    scans = []
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters):
+                if FULL_SCAN.match(row[-1]):
+                    scans.append(f"{row[-1]} <- {' '.join(statement.split())[:200]}")
+    return scans
+
+
+def _describe(filters, sort=None):
+    return f"{sorted(filters)} sort={sort}"
+
+
+def test_every_filter_combination_uses_an_index(engine):
+    failures = {}
+    for filters in COMBINATIONS:
+        scans = _full_scans(engine, lambda db: VehicleController.search_vehicles(db, **filters))
+        if scans:
+            failures[_describe(filters)] = scans
+
+    assert failures == {}
+
+
+@pytest.mark.parametrize("sort", SORT_OPTIONS)
+def test_sorted_searches_use_an_index(engine, sort):
+    cases = [{}] if sort != "relevancia" else []
+    cases += [dict([item]) for item in FILTERS.items()]
+    cases.append(dict(marca="toy", ano_min=2015, preco_max=90000))
+    failures = {}
+    for filters in cases:
+        scans = _full_scans(engine, lambda db: VehicleController.search_vehicles(db, sort=sort, **filters))
+        if scans:
+            failures[_describe(filters, sort)] = scans
+
+    assert failures == {}
+
+
+def test_relevance_without_filters_reads_only_a_covering_index(engine):
+    session = sessionmaker(bind=engine)()
+    with _captured(engine) as statements:
+        VehicleController.search_vehicles(session, sort="relevancia")
+    session.close()
+
+    with engine.connect() as conn:
+        plan = [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statements[0][0]}", statements[0][1])]
+    assert any("COVERING INDEX ix_vehicles_ano_preco_quilometragem" in step for step in plan)
+
+
+def test_page_and_count_queries_use_an_index(engine):
+    filters = dict(marca="toy", ano_min=2015, preco_max=90000)
+
+    def run(db):
+        page, _ = VehicleController.search_vehicles_page(db, limit=5, sort="preco_asc", **filters)
+        VehicleController.search_vehicles_page(db, after=(page[-1].preco, page[-1].id), sort="preco_asc", **filters)
+        VehicleController.search_vehicles_page(db, after=(10,), **dict(combustivel=FuelType.FLEX))
+        VehicleController.count_vehicles(db, limit=1, transmissao=TransmissionType.CVT)
+        VehicleController.count_vehicles(db, **filters)
+
+    assert _full_scans(engine, run) == []
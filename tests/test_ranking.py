@@ -0,0 +1,83 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.controllers.vehicle_controller import VehicleController
+from app.database import SessionLocal
+from app.index.columnar import ColumnarIndex
+from app.ranking import SORT_OPTIONS, sort_key
+from app.views.vehicle_view import VehicleView
+from mcp_server.schemas import VehicleResponse
+from mcp_server.server import app, search_cache
+
+
+@pytest.fixture
+def db_session():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def _dump(vehicles):
+    return [VehicleResponse.model_validate(v).model_dump() for v in vehicles]
+
+
+def _expected(db_session, sort, limit, **filters):
+    """Ordenação de referência: todos os resultados ordenados em Python."""
+    everything = _dump(VehicleController.build_query(db_session, **filters).all())
+    return [v["id"] for v in sorted(everything, key=sort_key(sort))[:limit]]
+
+
+@pytest.mark.parametrize("sort", SORT_OPTIONS)
+def test_sql_sort_returns_top_k(db_session, sort):
+    results = VehicleController.search_vehicles(db_session, sort=sort, limit=15)
+    assert [v.id for v in results] == _expected(db_session, sort, 15)
+
+
+@pytest.mark.parametrize("sort", SORT_OPTIONS)
+def test_sort_with_filters(db_session, sort):
+    results = VehicleController.search_vehicles(db_session, ano_min=2018, sort=sort, limit=5)
+    assert [v.id for v in results] == _expected(db_session, sort, 5, ano_min=2018)
+
+
+@pytest.mark.parametrize("sort", SORT_OPTIONS)
+def test_columnar_sort_matches_sql(db_session, sort):
+    expected = VehicleController.search_vehicles(db_session, combustivel="Flex", sort=sort, limit=7)
+    got = ColumnarIndex().search(db_session, combustivel="Flex", sort=sort, limit=7)
+    assert [v.id for v in got] == [v.id for v in expected]
+
+
+def test_invalid_sort_raises(db_session):
+    with pytest.raises(ValueError, match="sort inválido"):
+        VehicleController.search_vehicles(db_session, sort="aleatorio")
+
+
+def test_search_endpoint_sorts_and_validates():
+    search_cache.clear()
+    client = TestClient(app)
+    response = client.post("/search", json={"sort": "preco_asc", "limit": 10})
+    precos = [v["preco"] for v in response.json()]
+    assert precos == sorted(precos)
+    assert client.post("/search", json={"sort": "aleatorio"}).status_code == 422
+
+
+def test_sorted_page_walk(db_session):
+    client = TestClient(app)
+    seen, cursor = [], None
+    while True:
+        body = {"sort": "preco_desc", "limit": 20, "ano_min": 2015}
+        if cursor:
+            body["cursor"] = cursor
+        page = client.post("/search/page", json=body).json()
+        seen.extend(v["id"] for v in page["results"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert seen == _expected(db_session, "preco_desc", 10_000, ano_min=2015)
+
+
+def test_view_shows_ordering():
+    vehicles = [{
+        "marca": "Toyota", "modelo": "Corolla", "ano": 2020, "cor": "Prata",
+        "quilometragem": 1000, "preco": 90000.0, "combustivel": "Flex", "transmissao": "CVT"
+    }]
+    assert "Ordenados por: menor preço" in VehicleView.format_results(vehicles, sort="preco_asc")
+    assert "Ordenados por" not in VehicleView.format_results(vehicles)
@@ -0,0 +1,168 @@
+import asyncio
+import itertools
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from app.controllers.vehicle_controller import VehicleController
+from app.database import SessionLocal
+from app.filters import matches_filters
+from app.views.vehicle_view import VehicleView
+from agent.search import run_search
+from mcp_client.client import MCPClient
+from mcp_server.relaxation import _apply, _levels, relax
+from mcp_server.server import app, search_cache
+
+STOCK = [
+    {"marca": "Toyota", "modelo": "Corolla", "ano": 2017, "preco": 85000.0,
+     "combustivel": "Flex", "transmissao": "Automática"},
+    {"marca": "Toyota", "modelo": "Corolla", "ano": 2022, "preco": 120000.0,
+     "combustivel": "Flex", "transmissao": "Manual"},
+    {"marca": "Honda", "modelo": "Civic", "ano": 2020, "preco": 70000.0,
+     "combustivel": "Diesel", "transmissao": "Manual"},
+]
+
+
+@pytest.fixture
+def client():
+    search_cache.clear()
+    return TestClient(app)
+
+
+@pytest.fixture
+def db_session():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def _probe(calls):
+    def probe(filters):
+        calls.append(filters)
+        return any(matches_filters(v, filters) for v in STOCK)
+    return probe
+
+
+def test_relax_finds_smallest_combination():
+    filters = {"marca": "Toyota", "ano_min": 2020, "ano_max": 2020, "preco_max": 80000, "combustivel": "Flex"}
+    calls = []
+
+    relaxed, relaxations = relax(filters, _probe(calls))
+
+    assert relaxed == {"marca": "Toyota", "ano_min": 2017, "ano_max": 2023,
+                       "preco_max": 88000.0, "combustivel": "Flex"}
+    assert [r.constraint for r in relaxations] == ["ano", "preco"]
+    assert relaxations[1].original == {"preco_max": 80000}
+
+    # Nenhuma combinação de custo menor encontra veículos
+    constraints = _levels(filters)
+    cost = 3 + 1
+    for combination in itertools.product(*(range(len(levels) + 1) for _, levels in constraints)):
+        if sum(combination) < cost:
+            assert not any(matches_filters(v, _apply(filters, constraints, combination)) for v in STOCK)
+    # Combinações contidas em uma que falhou não são sondadas
+    assert len(calls) < len(list(itertools.product(*(range(len(l) + 1) for _, l in constraints))))
+
+
+def test_relax_drops_enum_when_needed():
+    relaxed, relaxations = relax({"marca": "Honda", "combustivel": "Flex"}, _probe([]))
+
+    assert relaxed == {"marca": "Honda"}
+    assert relaxations[0].relaxed == {"combustivel": None}
+
+
+def test_relax_never_touches_marca_and_modelo():
+    assert relax({"marca": "Fiat", "ano_min": 2020, "ano_max": 2020}, _probe([])) is None
+    assert relax({"marca": "Toyota", "modelo": "Corolla"}, _probe([])) is None
+
+
+def test_count_vehicles_matches_query(db_session):
+    filters = {"marca": "Toyota", "ano_min": 2015}
+    expected = VehicleController.build_query(db_session, **filters).count()
+
+    assert VehicleController.count_vehicles(db_session, **filters) == expected
+    assert VehicleController.count_vehicles(db_session, limit=1, **filters) == min(expected, 1)
+
+
+def test_count_vehicles_with_columnar_engine(db_session, monkeypatch):
+    from app.controllers import vehicle_controller
+    filters = {"marca": "Toyota", "combustivel": "Flex"}
+    expected = VehicleController.count_vehicles(db_session, **filters)
+
+    monkeypatch.setattr(vehicle_controller, "SEARCH_ENGINE", "columnar")
+    assert VehicleController.count_vehicles(db_session, **filters) == expected
+    assert VehicleController.count_vehicles(db_session, limit=1, **filters) == min(expected, 1)
+
+
+def test_endpoint_returns_exact_results_without_relaxing(client):
+    response = client.post("/search/relaxed", json={"marca": "Toyota", "limit": 5})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["relaxed"] == []
+    assert body["filters"] == {"marca": "Toyota"}
+    assert 0 < len(body["results"]) <= 5
+
+
+def test_endpoint_relaxes_in_one_request(client):
+    response = client.post("/search/relaxed", json={
+        "marca": "Toyota", "ano_min": 2020, "ano_max": 2020, "preco_max": 1000, "limit": 5
+    })
+
+    body = response.json()
+    assert body["results"]
+    assert "preco" in [r["constraint"] for r in body["relaxed"]]
+    assert all(matches_filters(v, body["filters"]) for v in body["results"])
+    assert all(v["marca"] == "Toyota" for v in body["results"])
+
+
+def test_endpoint_swaps_inverted_ranges_before_relaxing(client, caplog):
+    response = client.post("/search/relaxed", json={
+        "marca": "Toyota", "ano_min": 2020, "ano_max": 2015, "preco_min": 2000, "preco_max": 1000, "limit": 5
+    })
+
+    body = response.json()
+    assert body["results"]
+    # Relaxamento a partir de 2015..2020 e 1000..2000: só amplia
+    assert body["filters"]["ano_min"] <= 2015 and body["filters"].get("ano_max", 2020) >= 2020
+    assert "preco" in [r["constraint"] for r in body["relaxed"]]
+    assert all(matches_filters(v, body["filters"]) for v in body["results"])
+    assert sum("Corrigindo automaticamente" in r.message for r in caplog.records) == 2
+
+
+def test_format_relaxation():
+    text = VehicleView.format_relaxation([
+        {"constraint": "ano", "original": {"ano_min": 2020, "ano_max": 2020},
+         "relaxed": {"ano_min": 2017, "ano_max": 2023}},
+        {"constraint": "preco", "original": {"preco_max": 80000}, "relaxed": {"preco_max": 88000.0}},
+        {"constraint": "combustivel", "original": {"combustivel": "Diesel"}, "relaxed": {"combustivel": None}},
+    ])
+
+    assert "ano entre 2017 e 2023" in text
+    assert "preço até R$ 88,000.00" in text
+    assert "qualquer combustível (em vez de Diesel)" in text
+
+
+@pytest.mark.asyncio
+async def test_run_search_applies_relaxation_from_single_request():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        return httpx.Response(200, json={
+            "results": [{"id": 1}],
+            "filters": {"marca": "Honda"},
+            "relaxed": [{"constraint": "combustivel", "original": {"combustivel": "Flex"},
+                         "relaxed": {"combustivel": None}}],
+        })
+
+    async def filters():
+        return {"marca": "Honda", "combustivel": "Flex", "sort": "preco_asc"}
+
+    async with MCPClient(transport=httpx.MockTransport(handler)) as client:
+        vehicles, used, notices = await run_search(client, asyncio.ensure_future(filters()))
+
+    assert requests == ["/search/relaxed"]
+    assert vehicles == [{"id": 1}]
+    assert used == {"marca": "Honda", "sort": "preco_asc"}
+    assert "qualquer combustível" in notices[0]
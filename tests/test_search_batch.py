@@ -0,0 +1,94 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.controllers.vehicle_controller import VehicleController
+from app.database import SessionLocal
+from mcp_server.batch import run_batch, subsumes
+from mcp_server.cache import canonical_key
+from mcp_server.schemas import VehicleSearchRequest, VehicleResponse
+from mcp_server.server import app, search_cache
+
+
+@pytest.fixture
+def client():
+    search_cache.clear()
+    return TestClient(app)
+
+
+@pytest.fixture
+def db_session():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def _filters(**kwargs):
+    return dict(canonical_key(VehicleSearchRequest(**kwargs)))
+
+
+def test_subsumes_narrower_filters():
+    broad = _filters(marca="Toyota", preco_max=100000)
+    assert subsumes(broad, _filters(marca="Toyota", modelo="Corolla", preco_max=80000))
+    assert subsumes(_filters(marca="toy"), _filters(marca="Toyota"))
+    assert not subsumes(broad, _filters(marca="Toyota", preco_max=120000))
+    assert not subsumes(broad, _filters(marca="Honda", preco_max=80000))
+    assert not subsumes(_filters(marca="t_y"), _filters(marca="toyota"))
+
+
+def test_run_batch_derives_narrow_searches(db_session):
+    requests = [
+        VehicleSearchRequest(marca="Toyota", ano_min=2018, limit=100),
+        VehicleSearchRequest(marca="Toyota", limit=100),
+        VehicleSearchRequest(marca="Toyota", combustivel="Flex", limit=100),
+        VehicleSearchRequest(marca="Toyota", limit=100),
+    ]
+    executed = []
+
+    def search(request):
+        executed.append(request)
+        vehicles = VehicleController.search_vehicles(db_session, **request.model_dump())
+        return [VehicleResponse.model_validate(v).model_dump() for v in vehicles]
+
+    results = run_batch(requests, search)
+
+    assert len(executed) == 1
+    assert results[1] == results[3]
+    for request, rows in zip(requests, results):
+        expected = search(request)
+        assert {v["id"] for v in rows} == {v["id"] for v in expected}
+
+
+def test_run_batch_keeps_sql_order_of_unsorted_narrow_search(db_session):
+    requests = [
+        VehicleSearchRequest(marca="Toyota", sort="preco_desc", limit=100),
+        VehicleSearchRequest(marca="Toyota", combustivel="Flex", limit=100),
+    ]
+
+    def search(request):
+        vehicles = VehicleController.search_vehicles(db_session, **request.model_dump())
+        return [VehicleResponse.model_validate(v).model_dump() for v in vehicles]
+
+    results = run_batch(requests, search)
+
+    assert results[1]
+    assert [v["id"] for v in results[1]] == [v["id"] for v in search(requests[1])]
+
+
+def test_batch_endpoint_returns_results_in_order(client):
+    searches = [
+        {"marca": "Honda", "limit": 5},
+        {"marca": "Toyota", "preco_max": 90000},
+        {"combustivel": "Flex", "limit": 3},
+    ]
+    response = client.post("/search/batch", json={"searches": searches})
+    assert response.status_code == 200
+
+    results = response.json()
+    assert len(results) == 3
+    assert all(v["marca"] == "Honda" for v in results[0])
+    assert all(v["marca"] == "Toyota" and v["preco"] <= 90000 for v in results[1])
+    assert len(results[2]) <= 3
+
+
+def test_batch_endpoint_rejects_empty_batch(client):
+    response = client.post("/search/batch", json={"searches": []})
+    assert response.status_code == 422
@@ -0,0 +1,120 @@
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, get_read_db, notify_inventory_changed
+from app.models.vehicle import Vehicle  # noqa: F401 - registra a tabela no Base
+from mcp_server.cache import SearchCache, canonical_key
+from mcp_server.schemas import VehicleSearchRequest
+from mcp_server.server import app, search_cache
+
+
+@pytest.fixture
+def client():
+    search_cache.clear()
+    search_cache.hits = search_cache.misses = 0
+    return TestClient(app)
+
+
+def test_canonical_key_normalizes_equivalent_requests():
+    a = VehicleSearchRequest(marca="Toyota", ano_min=2020, ano_max=2015, limit=500)
+    b = VehicleSearchRequest(ano_min=2015, ano_max=2020, marca="toyota", limit=100)
+    assert canonical_key(a) == canonical_key(b)
+
+
+def test_canonical_key_distinguishes_filters():
+    a = VehicleSearchRequest(marca="Toyota", preco_max=100000)
+    b = VehicleSearchRequest(marca="Toyota", preco_max=90000)
+    assert canonical_key(a) != canonical_key(b)
+
+
+def test_cache_lru_eviction():
+    cache = SearchCache(max_entries=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.evictions == 1
+
+
+def test_cache_ttl_expiry(monkeypatch):
+    cache = SearchCache(max_entries=10, ttl=5)
+    now = [1000.0]
+    monkeypatch.setattr("mcp_server.cache.time.monotonic", lambda: now[0])
+    cache.put("a", 1)
+    now[0] += 6
+    assert cache.get("a") is None
+
+
+def test_cache_rejects_results_from_old_inventory_version():
+    cache = SearchCache(max_entries=10, ttl=60)
+    version = notify_inventory_changed()
+    notify_inventory_changed()
+    cache.put("a", 1, version=version)
+    assert cache.get("a") is None
+
+
+def test_cache_get_drops_entries_from_another_version():
+    cache = SearchCache(max_entries=10, ttl=60)
+    version = notify_inventory_changed()
+    cache.put("a", 1, version=version)
+
+    assert cache.get("a", version=version) == 1
+    assert cache.get("a", version=version + 1) is None
+    assert cache.get("a", version=version) is None
+
+
+def test_search_sees_writes_from_another_process(client, tmp_path):
+    path = tmp_path / "vehicles.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    def tmp_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_read_db] = tmp_db
+    try:
+        payload = {"marca": "Toyota", "limit": 5}
+        assert client.post("/search", json=payload).json() == []
+
+        # Como o scripts/import_inventory.py rodando em outro processo
+        external = sqlite3.connect(path)
+        external.execute(
+            "INSERT INTO vehicles (marca, modelo, ano, motorizacao, combustivel, cor, quilometragem, "
+            "portas, transmissao, preco, proprietarios, placa) "
+            "VALUES ('Toyota', 'Corolla', 2020, '2.0', 'FLEX', 'Prata', 30000, 4, 'CVT', 95000, 1, 'EXT-0002')"
+        )
+        external.commit()
+        external.close()
+
+        assert [v["modelo"] for v in client.post("/search", json=payload).json()] == ["Corolla"]
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+
+def test_search_endpoint_hits_cache(client):
+    first = client.post("/search", json={"marca": "Toyota", "limit": 5})
+    second = client.post("/search", json={"marca": "toyota", "limit": 5})
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    stats = client.get("/cache/stats").json()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_search_cache_invalidated_on_inventory_change(client):
+    client.post("/search", json={"marca": "Toyota"})
+    notify_inventory_changed()
+    assert search_cache.stats()["entries"] == 0
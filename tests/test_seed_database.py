@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models.vehicle import Vehicle
+from scripts.seed_database import SEED_PLATE_PREFIX, generate_vehicle, plate_for, seed_database_bulk
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'vehicles.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def _rows(engine):
+    with engine.connect() as conn:
+        return conn.exec_driver_sql("SELECT * FROM vehicles ORDER BY id").fetchall()
+
+
+def test_bulk_seed_is_deterministic_regardless_of_workers(tmp_path):
+    engines = [create_engine(f"sqlite:///{tmp_path / f'{n}.db'}") for n in ("one", "many")]
+    for engine in engines:
+        Base.metadata.create_all(bind=engine)
+
+    assert seed_database_bulk(2_500, chunk_size=400, workers=1, seed=7, engine=engines[0]) == 2_500
+    seed_database_bulk(2_500, chunk_size=400, workers=3, seed=7, engine=engines[1])
+
+    rows = _rows(engines[0])
+    assert len(rows) == 2_500
+    assert rows == _rows(engines[1])
+    for engine in engines:
+        engine.dispose()
+
+
+def test_bulk_seed_appends_after_existing_rows_with_unique_plates(engine):
+    session = sessionmaker(bind=engine)()
+    plates = set()
+    session.add_all(generate_vehicle(plates) for _ in range(50))
+    session.commit()
+
+    seed_database_bulk(1_000, chunk_size=300, workers=2, engine=engine)
+
+    assert session.query(Vehicle).count() == 1_050
+    assert len({v.placa for v in session.query(Vehicle)}) == 1_050
+    # Enums gravados pelo nome: o ORM lê as linhas do modo em massa
+    vehicle = session.get(Vehicle, 51)
+    assert vehicle.placa == plate_for(51)
+    assert vehicle.combustivel.value in {"Gasolina", "Etanol", "Flex", "Diesel", "Elétrico", "Híbrido"}
+    session.close()
+
+
+def test_plate_for_is_unique_and_never_looks_like_a_real_plate():
+    plates = [plate_for(n) for n in range(0, 2_000_000, 997)] + [plate_for(26 ** 3 * 10_000)]
+
+    assert len(set(plates)) == len(plates)
+    # Placas reais e do Faker (AAA-0000, AAA0A00) começam com três letras
+    assert all(p.startswith(SEED_PLATE_PREFIX) and not p[:3].isalpha() for p in plates)
+    assert max(len(p) for p in plates) <= 10  # String(10) em Vehicle.placa
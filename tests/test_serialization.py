@@ -0,0 +1,106 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.database import SessionLocal
+from app.models.vehicle import Vehicle
+from mcp_server import server
+from mcp_server.schemas import VehicleResponse
+from mcp_server.serialization import VEHICLE_COLUMNS, vehicle_dict
+from mcp_server.server import app, search_cache
+
+
+@pytest.fixture
+def client():
+    search_cache.clear()
+    return TestClient(app)
+
+
+def _set_mode(monkeypatch, fast: bool):
+    search_cache.clear()
+    monkeypatch.setattr(server, "SEARCH_FAST_SERIALIZATION", fast)
+    monkeypatch.setattr(server, "_COLUMNS", VEHICLE_COLUMNS if fast else None)
+
+
+def _both_modes(client, monkeypatch, method, path, payload):
+    """Corpo da resposta no modo padrão e no rápido."""
+    bodies = []
+    for fast in (False, True):
+        _set_mode(monkeypatch, fast)
+        response = getattr(client, method)(path, json=payload)
+        assert response.status_code == 200
+        bodies.append(response.content)
+    return bodies
+
+
+@pytest.mark.parametrize("payload", [
+    {"marca": "Toyota", "limit": 20},
+    {"preco_max": 60000, "ano_min": 2018, "sort": "preco_asc", "limit": 100},
+    {"combustivel": "Elétrico", "transmissao": "Automática", "sort": "relevancia"},
+    {"marca": "Inexistente"},
+])
+def test_search_json_is_byte_identical(client, monkeypatch, payload):
+    slow, fast = _both_modes(client, monkeypatch, "post", "/search", payload)
+    assert fast == slow
+
+
+def test_other_search_endpoints_are_byte_identical(client, monkeypatch):
+    searches = [{"marca": "Honda", "limit": 5}, {"combustivel": "Diesel", "sort": "ano_desc"}]
+    cases = [
+        ("/search/batch", {"searches": searches}),
+        ("/search/relaxed", {"marca": "Toyota", "ano_min": 2020, "ano_max": 2020, "preco_max": 1000}),
+        ("/search/page", {"marca": "Fiat", "sort": "preco_desc", "limit": 7}),
+        ("/search/stream", {"marca": "Jeep", "max_results": 50, "batch_size": 20}),
+    ]
+    for path, payload in cases:
+        slow, fast = _both_modes(client, monkeypatch, "post", path, payload)
+        assert fast == slow, path
+
+
+def test_page_cursor_from_tuples_continues_like_orm(client, monkeypatch):
+    payload = {"ano_min": 2020, "sort": "quilometragem_asc", "limit": 5}
+    pages = []
+    for fast in (False, True):
+        _set_mode(monkeypatch, fast)
+        first = client.post("/search/page", json=payload).json()
+        second = client.post("/search/page", json={**payload, "cursor": first["next_cursor"]}).json()
+        pages.append((first, second))
+
+    assert pages[0] == pages[1]
+
+
+def test_vehicle_dict_matches_pydantic_dump():
+    db = SessionLocal()
+    try:
+        vehicles = db.query(Vehicle).order_by(Vehicle.id).limit(200).all()
+        rows = db.query(*VEHICLE_COLUMNS).order_by(Vehicle.id).limit(200).all()
+    finally:
+        db.close()
+
+    expected = [VehicleResponse.model_validate(v).model_dump() for v in vehicles]
+    assert [vehicle_dict(row) for row in rows] == expected
+    assert all(type(d["combustivel"]) is str for d in expected)
+
+
+def test_columnar_engine_returns_same_tuples(monkeypatch):
+    from app.controllers import vehicle_controller
+    from app.controllers.vehicle_controller import VehicleController
+
+    filters = dict(marca="Toyota", sort="preco_asc", limit=30)
+    db = SessionLocal()
+    try:
+        expected = [vehicle_dict(r) for r in VehicleController.search_vehicles(db, columns=VEHICLE_COLUMNS, **filters)]
+        monkeypatch.setattr(vehicle_controller, "SEARCH_ENGINE", "columnar")
+        got = [vehicle_dict(r) for r in VehicleController.search_vehicles(db, columns=VEHICLE_COLUMNS, **filters)]
+    finally:
+        db.close()
+
+    assert got == expected
+
+
+def test_stdlib_fallback_encodes_same_bytes(monkeypatch):
+    from mcp_server import serialization
+
+    content = {"results": [{"id": 1, "marca": "Citroën", "preco": 31551.31}], "next_cursor": None}
+    fast = serialization.dumps(content)
+    monkeypatch.setattr(serialization, "orjson", None)
+
+    assert serialization.dumps(content) == fast
@@ -0,0 +1,104 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from langchain.schema import AIMessage
+from agent.agent import VehicleAgent
+from agent.search import SpeculativeSearch, run_search
+from agent_server.server import AgentService, create_app
+from benchmarks.fake_llm import fake_llm
+from mcp_client.client import MCPClient
+
+COROLLA = {"marca": "Toyota", "modelo": "Corolla", "preco_max": 80000}
+
+
+def _client(searches, delay=0.0):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        filters = json.loads(request.content)
+        searches.append(filters)
+        await asyncio.sleep(delay)
+        return httpx.Response(200, json={
+            "results": [{"id": len(searches), **filters}], "filters": filters, "relaxed": []
+        })
+
+    return MCPClient(transport=httpx.MockTransport(handler))
+
+
+async def _filters(value, delay=0.0):
+    await asyncio.sleep(delay)
+    return value
+
+
+@pytest.mark.asyncio
+async def test_hit_reuses_prefetched_results():
+    searches = []
+    speculator = SpeculativeSearch(_client(searches, delay=0.05))
+
+    speculation = speculator.start("Corolla até 80 mil")
+    pending = asyncio.create_task(_filters(dict(COROLLA), delay=0.05))
+    vehicles, filters, _ = await run_search(speculator.mcp_client, pending, speculation)
+
+    assert filters == COROLLA
+    assert vehicles == [{"id": 1, **COROLLA}]
+    assert len(searches) == 1
+    stats = speculator.stats()
+    assert stats["hits"] == 1 and stats["hit_rate"] == 1.0
+    assert stats["saved_ms_total"] > 20
+
+
+@pytest.mark.asyncio
+async def test_miss_discards_prefetch_and_searches_final_filters():
+    searches = []
+    speculator = SpeculativeSearch(_client(searches))
+
+    speculation = speculator.start("Corolla até 80 mil")
+    final = {"marca": "Toyota", "modelo": "Corolla", "preco_max": 90000}
+    vehicles, _, _ = await run_search(speculator.mcp_client, asyncio.create_task(_filters(final)), speculation)
+
+    assert vehicles[0]["preco_max"] == 90000
+    assert speculator.stats()["misses"] == 1
+    assert speculator.stats()["hit_rate"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_low_confidence_message_is_not_speculated():
+    speculator = SpeculativeSearch(_client([]))
+
+    assert speculator.start("quero um carro bom para a família") is None
+    assert speculator.start("E se for diesel?") is None
+    assert speculator.stats()["speculative_searches"] == 0
+
+
+@pytest.mark.asyncio
+async def test_discard_counts_wasted_speculation():
+    speculator = SpeculativeSearch(_client([], delay=1.0))
+
+    speculation = speculator.start("HB20 flex até 70 mil")
+    speculation.discard()
+    await asyncio.sleep(0)
+
+    assert speculation.task.cancelled() or speculation.task.done()
+    assert speculator.stats()["discarded"] == 1
+    assert speculator.stats()["hit_rate"] is None
+
+
+def test_agent_service_reports_speculation_stats():
+    searches = []
+    service = AgentService(
+        agent_factory=lambda: VehicleAgent(api_key="fake", llm=fake_llm(
+            AIMessage(content="Vou buscar um Toyota Corolla. Um momento...")
+        )),
+        mcp_client=_client(searches),
+        speculative_search=True
+    )
+    client = TestClient(create_app(service))
+
+    session_id = client.post("/sessions").json()["session_id"]
+    client.post(f"/sessions/{session_id}/messages", json={"message": "Corolla até 80 mil"})
+
+    assert searches == [COROLLA]
+    speculation = client.get("/stats").json()["speculation"]
+    assert speculation["hits"] == 1
+    assert speculation["hit_rate"] == 1.0
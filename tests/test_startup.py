@@ -0,0 +1,30 @@
+import pytest
+from agent.agent import VehicleAgent
+from benchmarks.bench_startup import ENTRY_POINTS, profile_import
+
+# Dependências pesadas que cada ponto de entrada pode carregar no import
+ALLOWED = {
+    "main": {"langchain_core", "httpx"},
+    "mcp_server.server": {"sqlalchemy", "fastapi"},
+    "agent_server.server": {"langchain_core", "fastapi", "httpx"},
+    "scripts.import_inventory": {"sqlalchemy", "numpy"},
+    "scripts.init_db": {"sqlalchemy"},
+    "scripts.seed_database": {"sqlalchemy", "faker"},
+}
+
+
+def test_every_entry_point_is_covered():
+    assert set(ALLOWED) == set(ENTRY_POINTS)
+
+
+@pytest.mark.parametrize("module", ENTRY_POINTS)
+def test_entry_point_imports_without_api_key_and_only_what_it_uses(module):
+    profile = profile_import(module)
+
+    assert profile.total_ms > 0
+    assert set(profile.heavy) <= ALLOWED[module], f"{module} carregou {profile.heavy}"
+
+
+def test_agent_requires_api_key_only_for_openai_client():
+    with pytest.raises(ValueError, match="OPENAI_API_KEY"):
+        VehicleAgent(api_key="")
@@ -0,0 +1,81 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+from app.database import Base, create_db_engine, create_writer_engine
+from app.models.vehicle import Vehicle  # noqa: F401 - registra a tabela no Base
+
+
+@pytest.fixture
+def url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'vehicles.db'}"
+    engine = create_db_engine(url, profile="default")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO vehicles (marca, modelo, ano, motorizacao, combustivel, cor, quilometragem, "
+            "portas, transmissao, preco, proprietarios, placa) "
+            "VALUES ('Fiat', 'Uno', 2015, '1.0', 'FLEX', 'Branco', 80000, 4, 'MANUAL', 25000, 1, 'STO-0001')"
+        )
+    engine.dispose()
+    return url
+
+
+def _pragma(conn, name):
+    return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+def test_read_heavy_profile_applies_pragmas(url):
+    engine = create_db_engine(url, profile="read_heavy")
+    with engine.connect() as conn:
+        assert _pragma(conn, "journal_mode") == "wal"
+        assert _pragma(conn, "synchronous") == 1  # NORMAL
+        assert _pragma(conn, "mmap_size") == 256 * 1024 * 1024
+        assert _pragma(conn, "cache_size") == -64_000
+        assert _pragma(conn, "temp_store") == 2  # MEMORY
+    engine.dispose()
+
+
+def test_default_profile_keeps_journal_mode_of_the_file(url):
+    engine = create_db_engine(url, profile="default")
+    with engine.connect() as conn:
+        assert _pragma(conn, "journal_mode") == "delete"
+    engine.dispose()
+
+    wal = create_db_engine(url, profile="read_heavy")
+    with wal.connect():
+        pass
+    wal.dispose()
+    engine = create_db_engine(url, profile="default", read_only=True)
+    with engine.connect() as conn:
+        assert _pragma(conn, "journal_mode") == "wal"
+    engine.dispose()
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError, match="read_heavy"):
+        create_db_engine("sqlite://", profile="turbo")
+
+
+def test_read_only_engine_rejects_writes(url):
+    engine = create_db_engine(url, profile="read_heavy", read_only=True)
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT COUNT(*) FROM vehicles").scalar() == 1
+        with pytest.raises(OperationalError, match="readonly"):
+            conn.exec_driver_sql("UPDATE vehicles SET preco = 1")
+    engine.dispose()
+
+
+def test_wal_reader_does_not_block_writer(url):
+    reader = create_db_engine(url, profile="read_heavy", read_only=True)
+    writer = create_writer_engine(url)
+    with reader.connect() as conn:
+        conn.exec_driver_sql("BEGIN")
+        assert conn.exec_driver_sql("SELECT preco FROM vehicles").scalar() == 25000
+        # Com journal de rollback o commit esperaria o leitor terminar
+        with writer.begin() as write:
+            write.exec_driver_sql("UPDATE vehicles SET preco = 24000")
+        assert conn.exec_driver_sql("SELECT preco FROM vehicles").scalar() == 25000  # snapshot do leitor
+        conn.exec_driver_sql("COMMIT")
+        assert conn.exec_driver_sql("SELECT preco FROM vehicles").scalar() == 24000
+    assert writer.pool.size() == 1
+    reader.dispose()
+    writer.dispose()
@@ -0,0 +1,86 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.controllers.vehicle_controller import VehicleController
+from app.database import Base
+from app.index.text import create_text_index, has_text_index, text_conditions
+from app.models.vehicle import Vehicle
+from scripts.seed_database import generate_vehicle
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'vehicles.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    plates = set()
+    session.add_all(generate_vehicle(plates) for _ in range(200))
+    session.commit()
+    session.close()
+    yield engine
+    engine.dispose()
+
+
+def _search_ids(engine, **filters):
+    session = sessionmaker(bind=engine)()
+    try:
+        return [v.id for v in VehicleController.search_vehicles(session, limit=100, **filters)]
+    finally:
+        session.close()
+
+
+@pytest.mark.parametrize("filters", [
+    dict(marca="toy"),
+    dict(marca="TOYOTA"),
+    dict(marca="benz"),
+    dict(modelo="cor"),
+    dict(marca="to", modelo="co"),
+    dict(marca="ford", modelo="eco", ano_min=2015),
+    dict(marca="t%ta"),
+    dict(marca="xyz"),
+])
+def test_text_index_keeps_results(engine, filters):
+    """Com ou sem índice de texto, a busca retorna as mesmas linhas."""
+    before = set(_search_ids(engine, **filters))
+    create_text_index(engine)
+    after = set(_search_ids(engine, **filters))
+    assert after == before
+
+
+def test_text_index_query_uses_btree_index(engine):
+    """Busca parcial por marca deixa de ser full scan."""
+    create_text_index(engine)
+    session = sessionmaker(bind=engine)()
+    query = session.query(Vehicle).filter(*text_conditions(session, marca="toy"))
+    compiled = query.statement.compile(compile_kwargs={"literal_binds": True})
+    plan = session.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).fetchall()
+    session.close()
+
+    assert any("ix_vehicles_marca" in row[-1] for row in plan)
+
+
+def test_text_index_follows_writes(engine):
+    create_text_index(engine)
+    session = sessionmaker(bind=engine)()
+    vehicle = session.query(Vehicle).first()
+    vehicle.modelo = "Zzyzx"
+    session.commit()
+    assert _search_ids(engine, modelo="zzy") == [vehicle.id]
+
+    session.delete(vehicle)
+    session.commit()
+    assert _search_ids(engine, modelo="zzy") == []
+    session.close()
+
+
+def test_missing_text_index_is_rechecked_after_external_build(engine):
+    """Índice criado por outro processo (init_db) passa a ser usado sem reiniciar."""
+    session = sessionmaker(bind=engine)()
+    assert has_text_index(session) is False
+
+    other = create_engine(engine.url)
+    create_text_index(other)
+    other.dispose()
+
+    assert has_text_index(session) is True
+    session.close()